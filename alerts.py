@@ -0,0 +1,311 @@
+import os
+import re
+import json
+import logging
+import threading
+import urllib.request
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from forecast import fit_trend, right_align
+from indicators import MA_LONG, MA_SHORT, RSI_PERIOD
+from price_store import STORE_DIR
+
+# Universe-wide alerts. Rules such as "close crosses above ma50" are parsed
+# once into index/op arrays, then evaluated for all rules and all symbols
+# with new bars in a few array operations per update.
+
+log = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("MARKETSENSE_ALERTS", "1") != "0"
+# Optional rules file ("name = expression" per line) and local webhook URL
+RULES_FILE = os.environ.get("MARKETSENSE_ALERT_RULES")
+WEBHOOK_URL = os.environ.get("MARKETSENSE_ALERT_WEBHOOK")
+ALERT_LOG = os.path.join(STORE_DIR, "alerts.jsonl")
+
+# Per-symbol values a rule can compare, for the newest bar and the one before
+FEATURES = ("close", "change_pct", "ma10", "ma50", "rsi", "pred_pct")
+PREDICT_DAYS = 30  # horizon of pred_pct, as on the analysis page
+OPS = (">", "<", ">=", "<=", "crosses above", "crosses below")
+CROSS_OPS = (4, 5)
+RECENT_ALERTS = 500
+
+# The signals the analysis page shows, as rules
+DEFAULT_RULES = {
+    "Price crossed above MA10": "close crosses above ma10",
+    "Price crossed below MA10": "close crosses below ma10",
+    "Price crossed above MA50": "close crosses above ma50",
+    "Price crossed below MA50": "close crosses below ma50",
+    "Prediction above +5% (STRONG BUY)": "pred_pct crosses above 5",
+    "Prediction below -5% (SELL)": "pred_pct crosses below -5",
+    "RSI overbought": "rsi crosses above 70",
+    "RSI oversold": "rsi crosses below 30",
+}
+
+_RULE_RE = re.compile(r"^\s*(\w+)\s+(crosses\s+above|crosses\s+below|>=|<=|>|<)\s+(\S+)\s*$", re.IGNORECASE)
+
+
+def _operand(token):
+    """(feature index, constant) for one side of a rule"""
+    name = token.lower()
+    if name in FEATURES:
+        return FEATURES.index(name), np.nan
+    try:
+        return -1, float(token.rstrip("%"))
+    except ValueError:
+        raise ValueError(f"Unknown value '{token}' (use a number or one of: {', '.join(FEATURES)})") from None
+
+
+class RuleSet:
+    """Rules compiled into arrays, evaluated for many symbols at once"""
+
+    def __init__(self, rules):
+        self.names = list(rules)
+        self.expressions = [rules[n] for n in self.names]
+        left, op, right, const = [], [], [], []
+        for name, text in rules.items():
+            match = _RULE_RE.match(text)
+            if match is None:
+                raise ValueError(f"Rule '{name}': expected '<value> <op> <value>' with op one of "
+                                 f"{', '.join(OPS)}")
+            lhs, operator, rhs = match.groups()
+            index, _ = _operand(lhs)
+            if index < 0:
+                raise ValueError(f"Rule '{name}': the left side must be one of {', '.join(FEATURES)}")
+            r_index, r_const = _operand(rhs)
+            left.append(index)
+            op.append(OPS.index(" ".join(operator.lower().split())))
+            right.append(r_index)
+            const.append(r_const)
+        self.left = np.array(left, dtype=np.intp)
+        self.op = np.array(op, dtype=np.intp)
+        self.right = np.array(right, dtype=np.intp)
+        self.const = np.array(const, dtype=np.float64)
+        self.is_cross = np.isin(self.op, CROSS_OPS)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _sides(self, values):
+        right = np.where(self.right >= 0, values[:, np.maximum(self.right, 0)], self.const)
+        return values[:, self.left], right
+
+    def evaluate(self, current, previous):
+        """(hits, left values, right values), each (symbols, rules)
+
+        `current` and `previous` hold FEATURES for the newest and the prior
+        bar, one row per symbol. NaN on either side never matches.
+        """
+        lhs, rhs = self._sides(current)
+        prev_lhs, prev_rhs = self._sides(previous)
+        with np.errstate(invalid="ignore"):
+            hits = np.choose(self.op, [
+                lhs > rhs,
+                lhs < rhs,
+                lhs >= rhs,
+                lhs <= rhs,
+                (prev_lhs <= prev_rhs) & (lhs > rhs),
+                (prev_lhs >= prev_rhs) & (lhs < rhs),
+            ])
+        return hits, lhs, rhs
+
+
+def load_rules(path=None):
+    """{name: expression} from a rules file, or DEFAULT_RULES without one"""
+    path = path or RULES_FILE
+    if not path:
+        return dict(DEFAULT_RULES)
+    rules = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                name, sep, expression = line.partition("=")
+                if not sep:
+                    raise ValueError(f"Expected 'name = expression', got '{line}'")
+                rules[name.strip()] = expression.strip()
+    return rules
+
+
+def _wilder(values, period):
+    """Wilder-smoothed last and previous values of each row (NaN-padded left)"""
+    alpha = 1.0 / period
+    avg = np.full(values.shape[0], np.nan)
+    prev = avg
+    for column in values.T:
+        prev = avg
+        avg = np.where(np.isnan(avg), column, avg + alpha * (column - avg))
+        avg = np.where(np.isnan(column), prev, avg)
+    return avg, prev
+
+
+def features(closes):
+    """FEATURES for the last and the previous bar of a right-aligned close matrix
+
+    Same definitions as the analysis page: simple MAs, Wilder RSI and the
+    linear-trend prediction over the whole window, each computed for all
+    rows at once.
+    """
+    n, width = closes.shape
+    current = np.full((n, len(FEATURES)), np.nan)
+    previous = np.full((n, len(FEATURES)), np.nan)
+    if width < 3:
+        return current, previous
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for out, end in ((current, width), (previous, width - 1)):
+            close = closes[:, end - 1]
+            out[:, 0] = close
+            out[:, 1] = (close / closes[:, end - 2] - 1) * 100
+            if end >= MA_SHORT:
+                out[:, 2] = closes[:, end - MA_SHORT:end].mean(axis=1)
+            if end >= MA_LONG:
+                out[:, 3] = closes[:, end - MA_LONG:end].mean(axis=1)
+            out[:, 5] = (fit_trend(closes[:, :end]).predict(PREDICT_DAYS) / close - 1) * 100
+
+        change = np.diff(closes, axis=1)
+        gain, prev_gain = _wilder(np.clip(change, 0, None), RSI_PERIOD)
+        loss, prev_loss = _wilder(np.clip(-change, 0, None), RSI_PERIOD)
+        bars = np.isfinite(closes).sum(axis=1)
+        for out, g, l, enough in ((current, gain, loss, bars > RSI_PERIOD),
+                                  (previous, prev_gain, prev_loss, bars > RSI_PERIOD + 1)):
+            rsi = np.where(l == 0, np.where(g == 0, 50.0, 100.0), 100 - 100 / (1 + g / l))
+            out[:, 4] = np.where(enough, rsi, np.nan)
+    return current, previous
+
+
+class Alert(NamedTuple):
+    rule: str
+    expression: str
+    symbol: str
+    bar: pd.Timestamp
+    value: float
+    threshold: float
+
+    def to_dict(self):
+        return {"rule": self.rule, "expression": self.expression, "symbol": self.symbol,
+                "bar": self.bar.isoformat(), "value": self.value, "threshold": self.threshold}
+
+    def __str__(self):
+        return f"{self.symbol}: {self.rule} ({self.expression}; {self.value:.2f} vs {self.threshold:.2f})"
+
+
+class LogSink:
+    """Alerts to the `alerts` logger and, optionally, a JSON-lines file"""
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def __call__(self, alerts):
+        for alert in alerts:
+            log.warning("ALERT %s", alert)
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.writelines(json.dumps(a.to_dict()) + "\n" for a in alerts)
+
+
+class WebhookSink:
+    """One JSON POST per batch of alerts to a local webhook"""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, alerts):
+        body = json.dumps({"alerts": [a.to_dict() for a in alerts]}).encode()
+        request = urllib.request.Request(self.url, body, {"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class AlertEngine:
+    """Evaluates a RuleSet over every symbol it is fed, one new bar at a time
+
+    `update(frames)` only looks at symbols whose newest bar (or its close)
+    changed since the previous update. A rule fires at most once per symbol
+    per bar, and a level rule (">", "<", ...) only when it turns true; the
+    first update that sees a symbol only records its state.
+    """
+
+    def __init__(self, rules=None, sinks=None):
+        self.rules = RuleSet(rules if rules is not None else load_rules())
+        self.sinks = list(sinks or [])
+        self.recent = deque(maxlen=RECENT_ALERTS)
+        self._rows = {}  # symbol -> row in the state arrays
+        self._stamps = []
+        self._active = np.zeros((0, len(self.rules)), dtype=bool)
+        self._fired = np.zeros((0, len(self.rules)), dtype=np.int64)  # bar (ns) last fired
+        self._lock = threading.Lock()
+
+    def _grow(self, symbols):
+        new = [s for s in symbols if s not in self._rows]
+        for symbol in new:
+            self._rows[symbol] = len(self._stamps)
+            self._stamps.append(None)
+        if new:
+            pad = (len(new), len(self.rules))
+            self._active = np.vstack([self._active, np.zeros(pad, dtype=bool)])
+            self._fired = np.vstack([self._fired, np.full(pad, -1, dtype=np.int64)])
+
+    def update(self, frames):
+        """Evaluate {symbol: daily OHLCV frame}; returns the alerts raised"""
+        with self._lock, metrics.span("alerts.evaluate"):
+            changed = []
+            for symbol, df in frames.items():
+                if df is None or df.empty:
+                    continue
+                close = df['Close'].to_numpy(dtype=np.float64)
+                stamp = (df.index.asi8[-1], close[-1])
+                row = self._rows.get(symbol)
+                if row is None or self._stamps[row] != stamp:
+                    changed.append((symbol, df.index[-1], close, stamp))
+            if not changed:
+                return []
+            self._grow([c[0] for c in changed])
+
+            rows = np.array([self._rows[c[0]] for c in changed])
+            primed = np.array([self._stamps[r] is not None for r in rows])
+            bars = np.array([c[1].value for c in changed], dtype=np.int64)
+            closes = right_align([c[2] for c in changed])
+            hits, lhs, rhs = self.rules.evaluate(*features(closes))
+
+            fresh = hits & (self._fired[rows] != bars[:, None]) & (self.rules.is_cross | ~self._active[rows])
+            fresh &= primed[:, None]
+            self._active[rows] = hits
+            self._fired[rows] = np.where(fresh, bars[:, None], self._fired[rows])
+            for c, r in zip(changed, rows):
+                self._stamps[r] = c[3]
+
+            alerts = [Alert(self.rules.names[j], self.rules.expressions[j], changed[i][0], changed[i][1],
+                            float(lhs[i, j]), float(rhs[i, j])) for i, j in zip(*np.nonzero(fresh))]
+            metrics.inc("alerts_evaluated_total", len(changed) * len(self.rules))
+        if alerts:
+            self.recent.extend(alerts)
+            metrics.inc("alerts_fired_total", len(alerts))
+            for sink in self.sinks:
+                try:
+                    sink(alerts)
+                except Exception:
+                    metrics.inc("errors_total", where=f"alerts.{type(sink).__name__}")
+                    log.exception("alert sink %s failed", type(sink).__name__)
+        return alerts
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The process-wide engine with the configured rules and sinks"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            sinks = [LogSink(ALERT_LOG)]
+            if WEBHOOK_URL:
+                sinks.append(WebhookSink(WEBHOOK_URL))
+            _engine = AlertEngine(load_rules(), sinks)
+        return _engine
@@ -0,0 +1,172 @@
+import time
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import metrics
+from forecast import recommendation
+from models import LinearTrend, get_model
+from montecarlo import fan_chart
+from indicators import latest_indicators
+from price_store import read_pyramid
+from rollups import YEAR_WEEKS, locate, window_stats, window_trend, year_start
+
+# Derived analytics for the single-stock page, cached per
+# (symbol, period, last bar) so widget reruns reuse them instead of
+# recomputing from the raw frame.
+
+# Fixed seed so a forecast fan is reproducible for the same data
+FAN_SEED = 0
+
+
+class StageCache:
+    """LRU cache that tracks hits, misses, evictions and time saved per stage"""
+
+    def __init__(self, maxsize=256, name="analysis"):
+        self.maxsize = maxsize
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved = {}  # stage -> seconds of recomputation avoided
+
+    def get(self, stage, key, compute):
+        full_key = (stage, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                self.saved[stage] = self.saved.get(stage, 0.0) + entry[1]
+                metrics.inc("cache_hits_total", cache=self.name, stage=stage)
+                return entry[0]
+            self.misses += 1
+        metrics.inc("cache_misses_total", cache=self.name, stage=stage)
+
+        started = time.perf_counter()
+        value = compute()
+        cost = time.perf_counter() - started
+        metrics.record(f"{self.name}.{stage}", cost)
+
+        evicted = 0
+        with self._lock:
+            self._entries[full_key] = (value, cost)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            metrics.inc("cache_evictions_total", evicted, cache=self.name)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": dict(self.saved),
+            }
+
+
+cache = StageCache()
+
+
+def _metrics(df, pyramid=None, span=None):
+    close = df['Close']
+    current = close.iloc[-1]
+    previous = close.iloc[-2]
+    result = {
+        "current": current,
+        "previous": previous,
+        "change": current - previous,
+        "pct_change": (current - previous) / previous * 100,
+        "day_high": df['High'].iloc[-1],
+        "day_low": df['Low'].iloc[-1],
+    }
+    if span is None:
+        # Not a range of the store: scan the frame itself
+        last_year = df[df.index > df.index[-1] - pd.Timedelta(weeks=YEAR_WEEKS)]
+        result.update(high_52w=last_year['High'].max(), low_52w=last_year['Low'].min(),
+                      avg_vol=df['Volume'].mean())
+        return result
+    # Summed from whole months/weeks of the rollups plus the days at the
+    # edges, whatever the length of the history
+    lo, hi = span
+    year = window_stats(pyramid, year_start(pyramid, lo, hi), hi)
+    window = window_stats(pyramid, lo, hi)
+    result.update(high_52w=year["high"], low_52w=year["low"], avg_vol=window["volume"] / window["bars"])
+    return result
+
+
+def _recent(df):
+    recent_df = df.tail(10)[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+    recent_df['Date'] = recent_df.index.strftime('%d-%m-%Y')
+    recent_df = recent_df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+    for col in ['Open', 'High', 'Low', 'Close']:
+        recent_df[col] = recent_df[col].round(2)
+    return recent_df
+
+
+def analyze(symbol, period, df):
+    """Metrics, indicators, trend model and recent-data table for one frame
+
+    Each stage is cached separately under (symbol, period, last bar), where
+    the last bar includes its close so a revised in-progress bar misses.
+    When `df` is a range of the price store, the 52-week range, average
+    volume and the linear trend come from its weekly/monthly rollups.
+    """
+    key = (symbol, period, df.index[-1], float(df['Close'].iloc[-1]), len(df))
+    pyramid = read_pyramid(symbol)
+    span = locate(pyramid, df) if pyramid is not None else None
+    result = {"key": key, "df": df, "close": df['Close'], "pyramid": pyramid, "span": span}
+    result.update(cache.get("metrics", key, lambda: _metrics(df, pyramid, span)))
+    if span is None:
+        indicators = lambda: latest_indicators((symbol, period), df)
+    else:
+        # Over the symbol's whole stored history up to the window's last bar:
+        # its first bar only moves when older history is fetched, so each new
+        # daily bar is an incremental update rather than a rebuild
+        indicators = lambda: latest_indicators(symbol, pyramid.daily.iloc[:span[1]])
+    result["indicators"] = cache.get("indicators", key, indicators)
+    if span is None:
+        result["trend"] = get_model(symbol, period, "trend", df)
+    else:
+        result["trend"] = cache.get("trend", key, lambda: LinearTrend.from_fit(window_trend(pyramid, *span)))
+    result["recent_df"] = cache.get("recent", key, lambda: _recent(df))
+    return result
+
+
+def prediction(a, predict_days, method="gbm", model="trend"):
+    """Model prediction `predict_days` ahead from an `analyze` result
+
+    `model` names one of models.MODELS; fitted models come from the
+    persisted model cache. The Monte Carlo fan (`method` "gbm" or
+    "bootstrap") is cached per horizon; confidence is the share of
+    simulated paths that end on the side of the current price the model
+    predicts.
+    """
+    symbol, period = a['key'][:2]
+    forecaster = a['trend'] if model == "trend" else get_model(symbol, period, model, a['df'])
+    predicted_price = forecaster.predict(predict_days)
+    pred_change = predicted_price - a['current']
+    pred_pct = (pred_change / a['current']) * 100
+    fan = cache.get("fan", (a['key'], predict_days, method),
+                    lambda: fan_chart(a['close'].to_numpy(), predict_days, method=method, seed=FAN_SEED))
+    prob_side = fan.prob_up if pred_pct >= 0 else 1 - fan.prob_up
+    return {
+        "predicted_price": predicted_price,
+        "pred_change": pred_change,
+        "pred_pct": pred_pct,
+        "confidence": prob_side * 100,
+        "prob_up": fan.prob_up * 100,
+        "signal": recommendation(pred_pct),
+        "fan": fan,
+        "forecaster": forecaster,
+    }
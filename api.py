@@ -0,0 +1,258 @@
+import math
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from aiohttp import web
+
+import metrics
+import price_store
+from analysis import analyze, prediction
+from company_info import get_company_info
+from models import MODELS
+from montecarlo import PERCENTILES
+from export import FORMATS, iter_zip
+from price_store import PERIODS
+from stocks import ALL_STOCKS, NIFTY_50
+
+# Headless JSON API over the same store, metadata cache and analysis code as
+# the Streamlit app:
+#   GET  /analyze?symbol=TCS.NS&period=1y&predict_days=30&model=trend|ridge|holt
+#   GET  /batch?symbols=TCS.NS,INFY.NS&period=1y&predict_days=30&info=1
+#   POST /batch  {"symbols": [...], "period": "1y", "predict_days": 30, "model": "trend", "info": true}
+# /batch leaves out company metadata unless info is asked for: on a cold
+# cache it costs one upstream request per symbol.
+#   GET  /export?symbols=TCS.NS,INFY.NS|universe=all|nifty50&period=5y&format=csv|parquet
+#   GET  /metrics  (Prometheus text format)
+
+MAX_BATCH_SYMBOLS = 1000
+# Blocking loads (disk reads, yfinance calls) run on this many threads
+FETCH_WORKERS = 16
+
+PROVIDER_KEY = web.AppKey("provider", dict)
+EXECUTOR_KEY = web.AppKey("executor", ThreadPoolExecutor)
+
+
+def _clean(value):
+    """JSON-safe scalar: numpy types unwrapped, NaN/inf mapped to null"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def summarize(symbol, period, predict_days, df, info=None, model="trend"):
+    """JSON-ready analysis of one symbol, mirroring the analysis page"""
+    a = analyze(symbol, period, df)
+    p = prediction(a, predict_days, model=model)
+    fan = p.pop("fan")
+    p["model"] = p.pop("forecaster").name
+    return {
+        "symbol": symbol,
+        "period": period,
+        "bars": len(df),
+        "last_date": df.index[-1].date().isoformat(),
+        "company": info or {},
+        "metrics": {k: _clean(a[k]) for k in ("current", "previous", "change", "pct_change",
+                                              "day_high", "day_low", "high_52w", "low_52w", "avg_vol")},
+        "indicators": {k: _clean(v) for k, v in a["indicators"].items()},
+        "prediction": {"predict_days": predict_days, **{k: _clean(v) for k, v in p.items()}},
+        "forecast_bands": {f"p{pct}": [round(float(v), 2) for v in band]
+                           for pct, band in zip(PERCENTILES, fan.bands)},
+    }
+
+
+def _params(query):
+    period = query.get("period", "1y")
+    if period not in PERIODS:
+        raise web.HTTPBadRequest(reason=f"period must be one of {', '.join(PERIODS)}")
+    try:
+        predict_days = int(query.get("predict_days", 30))
+    except (TypeError, ValueError):
+        raise web.HTTPBadRequest(reason="predict_days must be an integer")
+    if not 1 <= predict_days <= 365:
+        raise web.HTTPBadRequest(reason="predict_days must be between 1 and 365")
+    return period, predict_days
+
+
+def _model(query):
+    model = query.get("model", "trend")
+    if model not in MODELS:
+        raise web.HTTPBadRequest(reason=f"model must be one of {', '.join(MODELS)}")
+    return model
+
+
+async def _run(request, fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app[EXECUTOR_KEY], fn, *args)
+
+
+async def handle_analyze(request):
+    symbol = request.query.get("symbol", "").strip().upper()
+    if not symbol:
+        raise web.HTTPBadRequest(reason="symbol is required")
+    period, predict_days = _params(request.query)
+    model = _model(request.query)
+    provider = request.app[PROVIDER_KEY]
+
+    try:
+        df = await _run(request, provider["load_history"], symbol, period)
+    except Exception as e:
+        raise web.HTTPBadGateway(reason=f"fetch failed: {e}")
+    if df is None or len(df) < 2:
+        raise web.HTTPNotFound(reason=f"no data found for {symbol}")
+    info = await _run(request, provider["company_info"], symbol)
+    return web.json_response(await _run(request, summarize, symbol, period, predict_days, df, info, model))
+
+
+async def handle_batch(request):
+    if request.method == "POST":
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(reason="body must be JSON")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(reason="body must be a JSON object")
+        symbols = body.get("symbols") or []
+        if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+            raise web.HTTPBadRequest(reason="symbols must be a list of strings")
+        query = {k: body[k] for k in ("period", "predict_days", "model") if k in body}
+        with_info = body.get("info") is True
+    else:
+        symbols = request.query.get("symbols", "").split(",")
+        query = request.query
+        with_info = query.get("info") == "1"
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    if not symbols:
+        raise web.HTTPBadRequest(reason="symbols is required")
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        raise web.HTTPBadRequest(reason=f"at most {MAX_BATCH_SYMBOLS} symbols per batch")
+    period, predict_days = _params(query)
+    model = _model(query)
+    provider = request.app[PROVIDER_KEY]
+
+    # One batched load (fresh symbols from disk, the rest in grouped downloads
+    # on a bounded pool), then the per-symbol analyses fan out concurrently
+    frames = await _run(request, provider["load_many"], symbols, period)
+
+    async def one(symbol):
+        df = frames.get(symbol)
+        if df is None or len(df) < 2:
+            return {"symbol": symbol, "error": "no data"}
+        try:
+            info = await _run(request, provider["company_info"], symbol) if with_info else None
+            return await _run(request, summarize, symbol, period, predict_days, df, info, model)
+        except Exception as e:
+            return {"symbol": symbol, "error": str(e)}
+
+    results = await asyncio.gather(*(one(s) for s in symbols))
+    return web.json_response({"period": period, "predict_days": predict_days, "model": model,
+                              "results": results})
+
+
+async def handle_export(request):
+    fmt = request.query.get("format", "csv")
+    if fmt not in FORMATS:
+        raise web.HTTPBadRequest(reason=f"format must be one of {', '.join(FORMATS)}")
+    period, _ = _params(request.query)
+    universe = request.query.get("universe")
+    if universe == "all":
+        symbols = list(dict.fromkeys(ALL_STOCKS.values()))
+    elif universe == "nifty50":
+        symbols = list(NIFTY_50)
+    else:
+        symbols = [s.strip().upper() for s in request.query.get("symbols", "").split(",") if s.strip()]
+    if not symbols:
+        raise web.HTTPBadRequest(reason="symbols or universe is required")
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "application/zip",
+        "Content-Disposition": f'attachment; filename="marketsense_{period}_{fmt}.zip"',
+    })
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+
+    # The zip generator blocks on disk and network, so each chunk is pulled
+    # on the executor and written out as soon as it is ready
+    chunks = iter_zip(symbols, period, fmt, load=request.app[PROVIDER_KEY]["load_many"])
+    done = object()
+    while True:
+        chunk = await _run(request, next, chunks, done)
+        if chunk is done:
+            break
+        await response.write(chunk)
+    await response.write_eof()
+    return response
+
+
+async def handle_metrics(request):
+    return web.Response(text=metrics.registry.render(), content_type="text/plain",
+                        headers={"X-Content-Type-Options": "nosniff"})
+
+
+@web.middleware
+async def timed(request, handler):
+    """Time each request under its route and count failed ones"""
+    route = request.match_info.route.resource
+    stage = "api." + route.canonical.strip("/") if route is not None else "api.unmatched"
+    try:
+        with metrics.span(stage):
+            return await handler(request)
+    except web.HTTPException as e:
+        if e.status >= 500:
+            metrics.inc("errors_total", where=stage)
+        raise
+    except Exception:
+        metrics.inc("errors_total", where=stage)
+        raise
+
+
+async def handle_memory(request):
+    report = price_store.memory_report()
+    resident, shared = price_store.process_memory()
+    return web.json_response({
+        "process": {"resident_bytes": resident, "shared_bytes": shared},
+        "symbols": report.to_dict(orient="records"),
+    })
+
+
+async def handle_health(request):
+    return web.json_response({"status": "ok"})
+
+
+def create_app(load_history=None, load_many=None, company_info=None):
+    """Build the API application
+
+    The data functions default to the shared on-disk store and metadata
+    cache; pass stubs to run the API offline (e.g. in tests).
+    """
+    app = web.Application(middlewares=[timed])
+    app[PROVIDER_KEY] = {
+        "load_history": load_history or price_store.load_history,
+        "load_many": load_many or price_store.load_many,
+        "company_info": company_info or get_company_info,
+    }
+    app[EXECUTOR_KEY] = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="api")
+
+    async def shutdown(app):
+        app[EXECUTOR_KEY].shutdown(wait=False)
+
+    app.on_cleanup.append(shutdown)
+    app.router.add_get("/analyze", handle_analyze)
+    app.router.add_get("/batch", handle_batch)
+    app.router.add_post("/batch", handle_batch)
+    app.router.add_get("/export", handle_export)
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_get("/memory", handle_memory)
+    app.router.add_get("/health", handle_health)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MarketSense AI headless analysis API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
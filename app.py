@@ -1,9 +1,31 @@
-import streamlit as st
-import yfinance as yf
-from datetime import datetime, timedelta
+import os
 import time
+import math
+from datetime import datetime
+import streamlit as st
+# Only light modules up here: pandas, numpy, altair and the data/model
+# modules are imported further down, after the header, sidebar and landing
+# page have been sent, so a cold start paints before paying for them
+import metrics
+from stocks import NIFTY_50
+from catalog import get_catalog
+
+# Streamlit re-executes this script on every rerun; this is when this run began
+run_started = time.perf_counter()
 
 st.set_page_config(page_title="MarketSense AI", page_icon="📈", layout="wide")
+metrics.start_trace()
+
+# Dropdown shows at most this many search matches
+MAX_SEARCH_RESULTS = 20
+
+# How often the live section re-reads the shared poller (no upstream call)
+LIVE_REFRESH_SECONDS = 15
+
+HISTORY_PERIODS = ("1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max")
+
+# Timing/counter panel at the bottom of the page, via ?debug=1 or the env var
+DEBUG_PANEL = st.query_params.get("debug") == "1" or os.environ.get("MARKETSENSE_DEBUG") == "1"
 
 # Indian theme CSS
 st.markdown("""
@@ -17,222 +39,67 @@ st.markdown("""
     }
     </style>
     """, unsafe_allow_html=True)
+st.markdown('<p class="big-font">📈 MarketSense AI</p>', unsafe_allow_html=True)
+st.markdown("### Advanced NSE/BSE Stock Analysis & Prediction Platform")
 
-# Comprehensive list of Indian stocks (NSE & BSE)
-# Format: "Company Name" : "SYMBOL.NS"
-ALL_STOCKS = {
-    # Nifty 50 & Popular Stocks
-    "Adani Enterprises Ltd": "ADANIENT.NS",
-    "Adani Ports and Special Economic Zone Ltd": "ADANIPORTS.NS",
-    "Adani Power Ltd": "ADANIPOWER.NS",
-    "Apollo Hospitals Enterprise Ltd": "APOLLOHOSP.NS",
-    "Asian Paints Ltd": "ASIANPAINT.NS",
-    "Axis Bank Ltd": "AXISBANK.NS",
-    "Bajaj Auto Ltd": "BAJAJ-AUTO.NS",
-    "Bajaj Finance Ltd": "BAJFINANCE.NS",
-    "Bajaj Finserv Ltd": "BAJFINSERV.NS",
-    "Bank of Baroda": "BANKBARODA.NS",
-    "Bharat Electronics Ltd": "BEL.NS",
-    "Bharat Petroleum Corporation Ltd": "BPCL.NS",
-    "Bharti Airtel Ltd": "BHARTIARTL.NS",
-    "Britannia Industries Ltd": "BRITANNIA.NS",
-    "Cipla Ltd": "CIPLA.NS",
-    "Coal India Ltd": "COALINDIA.NS",
-    "Dabur India Ltd": "DABUR.NS",
-    "Divi's Laboratories Ltd": "DIVISLAB.NS",
-    "Dr. Reddy's Laboratories Ltd": "DRREDDY.NS",
-    "Eicher Motors Ltd": "EICHERMOT.NS",
-    "Grasim Industries Ltd": "GRASIM.NS",
-    "HCL Technologies Ltd": "HCLTECH.NS",
-    "HDFC Bank Ltd": "HDFCBANK.NS",
-    "HDFC Life Insurance Company Ltd": "HDFCLIFE.NS",
-    "Hero MotoCorp Ltd": "HEROMOTOCO.NS",
-    "Hindalco Industries Ltd": "HINDALCO.NS",
-    "Hindustan Unilever Ltd": "HINDUNILVR.NS",
-    "ICICI Bank Ltd": "ICICIBANK.NS",
-    "Indian Oil Corporation Ltd": "IOC.NS",
-    "IndusInd Bank Ltd": "INDUSINDBK.NS",
-    "Infosys Ltd": "INFY.NS",
-    "ITC Ltd": "ITC.NS",
-    "JSW Steel Ltd": "JSWSTEEL.NS",
-    "Kotak Mahindra Bank Ltd": "KOTAKBANK.NS",
-    "Larsen & Toubro Ltd": "LT.NS",
-    "LTIMindtree Ltd": "LTIM.NS",
-    "Mahindra & Mahindra Ltd": "M&M.NS",
-    "Maruti Suzuki India Ltd": "MARUTI.NS",
-    "Nestle India Ltd": "NESTLEIND.NS",
-    "NTPC Ltd": "NTPC.NS",
-    "Oil & Natural Gas Corporation Ltd": "ONGC.NS",
-    "Power Grid Corporation of India Ltd": "POWERGRID.NS",
-    "Reliance Industries Ltd": "RELIANCE.NS",
-    "SBI Life Insurance Company Ltd": "SBILIFE.NS",
-    "Shriram Finance Ltd": "SHRIRAMFIN.NS",
-    "State Bank of India": "SBIN.NS",
-    "Sun Pharmaceutical Industries Ltd": "SUNPHARMA.NS",
-    "Tata Consultancy Services Ltd": "TCS.NS",
-    "Tata Consumer Products Ltd": "TATACONSUM.NS",
-    "Tata Motors Ltd": "TATAMOTORS.NS",
-    "Tata Steel Ltd": "TATASTEEL.NS",
-    "Tech Mahindra Ltd": "TECHM.NS",
-    "Titan Company Ltd": "TITAN.NS",
-    "UltraTech Cement Ltd": "ULTRACEMCO.NS",
-    "UPL Ltd": "UPL.NS",
-    "Wipro Ltd": "WIPRO.NS",
-    
-    # Additional Popular Stocks (Alphabetically A-Z)
-    "ABB India Ltd": "ABB.NS",
-    "ACC Ltd": "ACC.NS",
-    "Adani Green Energy Ltd": "ADANIGREEN.NS",
-    "Adani Total Gas Ltd": "ATGL.NS",
-    "Adani Transmission Ltd": "ADANITRANS.NS",
-    "Ambuja Cements Ltd": "AMBUJACEM.NS",
-    "Aurobindo Pharma Ltd": "AUROPHARMA.NS",
-    "Avenue Supermarts Ltd (DMart)": "DMART.NS",
-    "Bandhan Bank Ltd": "BANDHANBNK.NS",
-    "Bank of India": "BANKINDIA.NS",
-    "Berger Paints India Ltd": "BERGEPAINT.NS",
-    "Biocon Ltd": "BIOCON.NS",
-    "Bosch Ltd": "BOSCHLTD.NS",
-    "Canara Bank": "CANBK.NS",
-    "Cholamandalam Investment and Finance Company Ltd": "CHOLAFIN.NS",
-    "Colgate-Palmolive (India) Ltd": "COLPAL.NS",
-    "Container Corporation of India Ltd": "CONCOR.NS",
-    "Coromandel International Ltd": "COROMANDEL.NS",
-    "DLF Ltd": "DLF.NS",
-    "Federal Bank Ltd": "FEDERALBNK.NS",
-    "Gail (India) Ltd": "GAIL.NS",
-    "Godrej Consumer Products Ltd": "GODREJCP.NS",
-    "Godrej Properties Ltd": "GODREJPROP.NS",
-    "Havells India Ltd": "HAVELLS.NS",
-    "HDFC Asset Management Company Ltd": "HDFCAMC.NS",
-    "Indian Railway Finance Corporation Ltd": "IRFC.NS",
-    "InterGlobe Aviation Ltd (IndiGo)": "INDIGO.NS",
-    "Jindal Steel & Power Ltd": "JINDALSTEL.NS",
-    "LIC Housing Finance Ltd": "LICHSGFIN.NS",
-    "Lupin Ltd": "LUPIN.NS",
-    "Marico Ltd": "MARICO.NS",
-    "Max Financial Services Ltd": "MFSL.NS",
-    "Motherson Sumi Systems Ltd": "MOTHERSON.NS",
-    "MRF Ltd": "MRF.NS",
-    "Muthoot Finance Ltd": "MUTHOOTFIN.NS",
-    "Persistent Systems Ltd": "PERSISTENT.NS",
-    "Petronet LNG Ltd": "PETRONET.NS",
-    "Pidilite Industries Ltd": "PIDILITIND.NS",
-    "Punjab National Bank": "PNB.NS",
-    "SBI Cards and Payment Services Ltd": "SBICARD.NS",
-    "Shree Cement Ltd": "SHREECEM.NS",
-    "Siemens Ltd": "SIEMENS.NS",
-    "SRF Ltd": "SRF.NS",
-    "Sundaram Finance Ltd": "SUNDARMFIN.NS",
-    "Suzlon Energy Ltd": "SUZLON.NS",
-    "Tata Elxsi Ltd": "TATAELXSI.NS",
-    "Tata Power Company Ltd": "TATAPOWER.NS",
-    "Torrent Pharmaceuticals Ltd": "TORNTPHARM.NS",
-    "TVS Motor Company Ltd": "TVSMOTOR.NS",
-    "Union Bank of India": "UNIONBANK.NS",
-    "United Spirits Ltd": "MCDOWELL-N.NS",
-    "Vedanta Ltd": "VEDL.NS",
-    "Voltas Ltd": "VOLTAS.NS",
-    "Yes Bank Ltd": "YESBANK.NS",
-    "Zomato Ltd": "ZOMATO.NS",
-    "Zydus Lifesciences Ltd": "ZYDUSLIFE.NS",
-    
-    # Mid-cap & Small-cap (Additional)
-    "Aarti Industries Ltd": "AARTIIND.NS",
-    "ABB India Ltd": "ABB.NS",
-    "Aditya Birla Fashion and Retail Ltd": "ABFRL.NS",
-    "Ashok Leyland Ltd": "ASHOKLEY.NS",
-    "Atul Ltd": "ATUL.NS",
-    "BEML Ltd": "BEML.NS",
-    "Bharat Forge Ltd": "BHARATFORG.NS",
-    "BSE Ltd": "BSE.NS",
-    "Cummins India Ltd": "CUMMINSIND.NS",
-    "Dixon Technologies (India) Ltd": "DIXON.NS",
-    "Escorts Kubota Ltd": "ESCORTS.NS",
-    "Exide Industries Ltd": "EXIDEIND.NS",
-    "Fortis Healthcare Ltd": "FORTIS.NS",
-    "Gujarat Gas Ltd": "GUJGASLTD.NS",
-    "ICICI Lombard General Insurance Company Ltd": "ICICIGI.NS",
-    "ICICI Prudential Life Insurance Company Ltd": "ICICIPRULI.NS",
-    "IDFC First Bank Ltd": "IDFCFIRSTB.NS",
-    "Indian Bank": "INDIANB.NS",
-    "Indian Railway Catering and Tourism Corporation Ltd": "IRCTC.NS",
-    "Indraprastha Gas Ltd": "IGL.NS",
-    "Jubilant Foodworks Ltd": "JUBLFOOD.NS",
-    "L&T Technology Services Ltd": "LTTS.NS",
-    "Laurus Labs Ltd": "LAURUSLABS.NS",
-    "Lichsgfin Finance Ltd": "LICHSGFIN.NS",
-    "Linde India Ltd": "LINDEINDIA.NS",
-    "Mankind Pharma Ltd": "MANKIND.NS",
-    "Max Healthcare Institute Ltd": "MAXHEALTH.NS",
-    "NHPC Ltd": "NHPC.NS",
-    "Oberoi Realty Ltd": "OBEROIRLTY.NS",
-    "Oracle Financial Services Software Ltd": "OFSS.NS",
-    "Page Industries Ltd": "PAGEIND.NS",
-    "Paytm (One 97 Communications Ltd)": "PAYTM.NS",
-    "Phoenix Mills Ltd": "PHOENIXLTD.NS",
-    "PI Industries Ltd": "PIIND.NS",
-    "Polycab India Ltd": "POLYCAB.NS",
-    "Prestige Estates Projects Ltd": "PRESTIGE.NS",
-    "REC Ltd": "RECLTD.NS",
-    "Samvardhana Motherson International Ltd": "MOTHERSON.NS",
-    "Schaeffler India Ltd": "SCHAEFFLER.NS",
-    "Shoppers Stop Ltd": "SHOPERSTOP.NS",
-    "Tata Communications Ltd": "TATACOMM.NS",
-    "Tata Chemicals Ltd": "TATACHEM.NS",
-    "Thermax Ltd": "THERMAX.NS",
-    "Torrent Power Ltd": "TORNTPOWER.NS",
-    "Trent Ltd": "TRENT.NS",
-    "Triveni Turbine Ltd": "TRITURBINE.NS",
-    "Varun Beverages Ltd": "VBL.NS",
-    "Whirlpool of India Ltd": "WHIRLPOOL.NS",
-    
-    # Tech & IT
-    "Coforge Ltd": "COFORGE.NS",
-    "eClerx Services Ltd": "ECLERX.NS",
-    "Happiest Minds Technologies Ltd": "HAPPSTMNDS.NS",
-    "Hexaware Technologies Ltd": "HEXAWARE.NS",
-    "Infosys BPM Ltd": "INFY.NS",
-    "Mphasis Ltd": "MPHASIS.NS",
-    "Tata Elxsi Ltd": "TATAELXSI.NS",
-    
-    # Pharma
-    "Alkem Laboratories Ltd": "ALKEM.NS",
-    "Glenmark Pharmaceuticals Ltd": "GLENMARK.NS",
-    "Granules India Ltd": "GRANULES.NS",
-    "Ipca Laboratories Ltd": "IPCALAB.NS",
-    "Natco Pharma Ltd": "NATCOPHARM.NS",
-    "Sanofi India Ltd": "SANOFI.NS",
-    "Strides Pharma Science Ltd": "STAR.NS",
-    "Torrent Pharmaceuticals Ltd": "TORNTPHARM.NS",
-    
-    # Auto & Components
-    "Apollo Tyres Ltd": "APOLLOTYRE.NS",
-    "Balkrishna Industries Ltd": "BALKRISIND.NS",
-    "Bharat Forge Ltd": "BHARATFORG.NS",
-    "Bosch Ltd": "BOSCHLTD.NS",
-    "CEAT Ltd": "CEATLTD.NS",
-    "MRF Ltd": "MRF.NS",
-    "Samvardhana Motherson International Ltd": "MOTHERSON.NS",
-    "Sona BLW Precision Forgings Ltd": "SONACOMS.NS",
-    "Tube Investments of India Ltd": "TIINDIA.NS",
-}
-
-# Cached function to fetch stock data
-@st.cache_data(ttl=600)  # Cache for 10 minutes
+
+@st.cache_resource
+def default_matches():
+    """Nifty 50 (symbol, name) pairs listed until the user searches, built once per process"""
+    catalog = get_catalog()
+    return [(s, catalog.name_of(s) or s) for s in NIFTY_50]
+
+
+@st.cache_resource
+def startup_timings():
+    """Timings of the first (cold) script run in this process, filled in once"""
+    return {}
+
+
+# Cached function to fetch stock data. cache_resource hands every session the
+# same read-only frame (a view of the memory-mapped store) instead of
+# unpickling a private copy per caller like cache_data would.
+@st.cache_resource(ttl=600)  # Cache for 10 minutes
 def get_stock_data(symbol, period):
-    """Fetch stock data with caching to avoid rate limits"""
+    """Fetch stock data with caching to avoid rate limits
+
+    Returns a dict with the frame and error; entries are built with a
+    "miss" mark that the first caller to read them takes (see
+    `cached_stock_data`).
+    """
     try:
-        time.sleep(1)  # Small delay to be respectful to API
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period)
-        info = ticker.info
-        return df, info, None
+        return {"df": load_history(symbol, period), "error": None, "miss": True}
     except Exception as e:
-        return None, None, str(e)
+        metrics.inc("errors_total", where="get_stock_data")
+        return {"df": None, "error": str(e), "miss": True}
 
-st.markdown('<p class="big-font">📈 MarketSense AI</p>', unsafe_allow_html=True)
-st.markdown("### Advanced NSE/BSE Stock Analysis & Prediction Platform")
+
+def cached_stock_data(symbol, period):
+    """`get_stock_data` as (df, error), with cache hits and misses counted"""
+    with metrics.span("app.fetch"):
+        entry = get_stock_data(symbol, period)
+    # dict.pop is atomic, so only one caller counts a freshly built entry
+    # as the miss, even when sessions share it
+    if entry.pop("miss", False):
+        metrics.inc("cache_misses_total", cache="get_stock_data")
+    else:
+        metrics.inc("cache_hits_total", cache="get_stock_data")
+    return entry["df"], entry["error"]
+
+
+def render_company_header(container, info, stock_name, symbol):
+    """Company/sector/industry/exchange metrics, with fallbacks when info is missing"""
+    info = info or {}
+    col1, col2, col3, col4 = container.columns(4)
+    with col1:
+        st.metric("Company", (info.get('longName') or stock_name)[:20])
+    with col2:
+        st.metric("Sector", (info.get('sector') or 'N/A')[:15])
+    with col3:
+        st.metric("Industry", (info.get('industry') or 'N/A')[:15])
+    with col4:
+        exchange = "NSE" if ".NS" in symbol else "BSE" if ".BO" in symbol else "N/A"
+        st.metric("Exchange", exchange)
 
 # Sidebar
 with st.sidebar:
@@ -241,25 +108,39 @@ with st.sidebar:
     # Stock selection with searchable dropdown
     st.subheader("📊 Select Stock")
     
-    # Create a list of options with company name and symbol
-    stock_options = [f"{name} ({symbol})" for name, symbol in sorted(ALL_STOCKS.items())]
+    catalog = get_catalog()
     
-    # Searchable selectbox
-    selected_option = st.selectbox(
-        "Search & Select Stock",
-        options=[""] + stock_options,  # Empty first option
-        help="Start typing to search for stocks (e.g., 'TCS', 'Reliance', 'Infosys')"
+    # Search box backed by the catalog index; only the top matches are sent
+    # to the dropdown instead of the whole symbol list
+    query = st.text_input(
+        "Search Stock",
+        placeholder="e.g., TCS, Reliance, Infosys",
+        help="Type any part of a company name or symbol"
+    )
+    if query:
+        matches = catalog.search(query, limit=MAX_SEARCH_RESULTS)
+    else:
+        matches = default_matches()
+    match_names = dict(matches)
+    
+    selected_symbol = st.selectbox(
+        "Select Stock",
+        options=[""] + [s for s, _ in matches],  # Empty first option
+        format_func=lambda s: f"{match_names[s]} ({s})" if s else "",
+        help="Nifty 50 stocks are listed until you search"
     )
     
     # Extract symbol from selection
-    if selected_option:
-        # Parse the selected option to get the symbol
-        symbol = selected_option.split("(")[-1].replace(")", "")
-        stock_name = selected_option.split(" (")[0]
+    if selected_symbol:
+        symbol = selected_symbol
+        stock_name = match_names[selected_symbol]
     else:
         symbol = None
         stock_name = None
     
+    if query and not matches:
+        st.caption("No matches — try the custom symbol option below")
+    
     st.divider()
     
     # Manual entry option
@@ -278,11 +159,10 @@ with st.sidebar:
     
     st.divider()
     
-    period = st.selectbox("Historical Period", 
-                          ["1mo", "3mo", "6mo", "1y", "2y", "5y"],
-                          index=3)
+    period = st.selectbox("Historical Period", HISTORY_PERIODS, index=3)
     
-    predict_days = st.slider("Predict Days Ahead", 7, 90, 30)
+    live_mode = st.toggle("📡 Live intraday mode", help="Poll intraday bars for the analysed stock during NSE hours")
+    live_interval = st.radio("Bar size", ["1m", "5m"], horizontal=True, disabled=not live_mode)
     
     # Disable button if no stock selected
     analyze_btn = st.button(
@@ -297,219 +177,175 @@ with st.sidebar:
     
     st.divider()
     st.markdown("### 🤖 AI-Powered Analysis")
-    st.caption(f"📊 {len(ALL_STOCKS)} stocks available")
-    st.caption("🔍 Searchable dropdown")
+    st.caption(f"📊 {len(catalog)} stocks available")
+    st.caption("🔍 Instant search by name or symbol")
     st.caption("✅ Data cached for 10 min")
+    st.caption("🔄 Popular stocks refreshed in the background")
+    
+    # Filled in at the end of the run, after the first paint and the analysis
+    cache_panel = st.expander("⚡ Analysis Cache")
 
-# Main content
-if analyze_btn and symbol:
-    with st.spinner(f"📊 Fetching data for {stock_name}..."):
-        # Use cached function
-        df, info, error = get_stock_data(symbol, period)
-        
-        if error:
-            st.error(f"❌ Error: {error}")
-            st.info("Please check the stock symbol and try again. If you see 'Rate limited', wait 1-2 minutes.")
-        elif df is None or df.empty:
-            st.error(f"❌ No data found for {symbol}")
-            st.info("Check symbol format: NSE stocks use .NS (e.g., TCS.NS)")
+def render_fan_chart(a, p, predict_days):
+    """Recent closes, the simulated percentile bands and the model forecast line"""
+    close = a['close']
+    history = close.tail(max(60, predict_days)).rename('Close').reset_index()
+    history.columns = ['Date', 'Close']
+    history['Date'] = history['Date'].dt.tz_localize(None)
+
+    last_date = history['Date'].iloc[-1]
+    future = pd.DataFrame({'Date': pd.bdate_range(last_date + pd.Timedelta(days=1), periods=predict_days)})
+    for pct, band in zip(PERCENTILES, p['fan'].bands):
+        future[f'P{pct}'] = band
+    future['Model'] = p['forecaster'].predict(np.arange(1, predict_days + 1))
+    # Start the fan at the last close so it joins the history line
+    anchor = {'Date': last_date, 'Model': a['current'], **{f'P{pct}': a['current'] for pct in PERCENTILES}}
+    future = pd.concat([pd.DataFrame([anchor]), future], ignore_index=True)
+
+    x = alt.X('Date:T', title=None)
+    y_scale = alt.Scale(zero=False)
+    outer = alt.Chart(future).mark_area(opacity=0.2, color='#138808').encode(
+        x, alt.Y('P5:Q', scale=y_scale, title='Price (₹)'), alt.Y2('P95:Q'), tooltip=['Date:T', 'P5:Q', 'P95:Q'])
+    inner = alt.Chart(future).mark_area(opacity=0.35, color='#138808').encode(
+        x, alt.Y('P25:Q', scale=y_scale), alt.Y2('P75:Q'), tooltip=['Date:T', 'P25:Q', 'P75:Q'])
+    median = alt.Chart(future).mark_line(color='#138808').encode(x, alt.Y('P50:Q', scale=y_scale))
+    model = alt.Chart(future).mark_line(color='#FF9933', strokeDash=[6, 4]).encode(x, alt.Y('Model:Q', scale=y_scale))
+    past = alt.Chart(history).mark_line(color='#1f77b4').encode(x, alt.Y('Close:Q', scale=y_scale))
+    st.altair_chart(outer + inner + median + model + past, use_container_width=True)
+    st.caption(f"Shaded: 5–95% and 25–75% of {N_PATHS:,} simulated paths · green line: median path · "
+               f"orange dashed: {p['forecaster'].label}")
+
+
+@st.fragment
+def render_prediction(a):
+    """Prediction metrics, forecast fan and recommendation for the analysed stock"""
+    # Moving the slider reruns only this fragment: fitted models come from
+    # the model cache, so just the prediction and the simulation are re-evaluated
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        predict_days = st.slider("Predict Days Ahead", 7, 90, 30)
+    with col2:
+        model = st.selectbox("Model", list(MODELS), format_func=lambda m: MODELS[m].label,
+                             help="Fitted once per new bar and cached on disk")
+    with col3:
+        method = st.radio("Simulation", ["gbm", "bootstrap"], horizontal=True,
+                          format_func={"gbm": "GBM", "bootstrap": "Bootstrap"}.get,
+                          help="GBM: normal daily returns with the historical drift and volatility. "
+                               "Bootstrap: resample the stock's own daily returns.")
+
+    # Predict future price from the cached model, with a Monte Carlo fan
+    with metrics.span("app.prediction"):
+        p = prediction(a, predict_days, method, model)
+    predicted_price = p['predicted_price']
+    pred_change = p['pred_change']
+    pred_pct = p['pred_pct']
+
+    # Display prediction
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric(f"Predicted Price ({predict_days}d)", 
+                 f"₹{predicted_price:.2f}",
+                 f"{pred_pct:+.2f}%",
+                 delta_color="normal")
+
+    with col2:
+        st.metric("Expected Change", 
+                 f"₹{pred_change:+.2f}",
+                 f"{pred_pct:+.2f}%")
+
+    with col3:
+        st.metric("Confidence", f"{p['confidence']:.0f}%",
+                  help=f"Share of {N_PATHS:,} simulated paths that end on the side of today's price "
+                       "the model predicts")
+
+    bands = p['fan'].at(predict_days)
+    st.caption(f"Simulated range in {predict_days} days: 90% between ₹{bands[5]:.2f} and ₹{bands[95]:.2f}, "
+               f"50% between ₹{bands[25]:.2f} and ₹{bands[75]:.2f} · "
+               f"{p['prob_up']:.0f}% of paths end higher")
+    render_fan_chart(a, p, predict_days)
+
+    st.divider()
+
+    # Recommendation
+    st.subheader("💡 Investment Recommendation")
+
+    signal = p['signal']
+    if signal == "STRONG BUY":
+        st.success(f"""
+        ### 🟢 STRONG BUY
+        The model predicts a **{pred_pct:.2f}%** increase in {predict_days} days.
+
+        **Target Price:** ₹{predicted_price:.2f}  
+        **Potential Gain:** ₹{pred_change:.2f} per share
+        """)
+    elif signal == "BUY":
+        st.info(f"""
+        ### 🔵 BUY
+        The model predicts a **{pred_pct:.2f}%** increase in {predict_days} days.
+
+        **Target Price:** ₹{predicted_price:.2f}  
+        **Potential Gain:** ₹{pred_change:.2f} per share
+        """)
+    elif signal == "HOLD":
+        st.warning(f"""
+        ### 🟡 HOLD
+        The model predicts a **{pred_pct:.2f}%** change in {predict_days} days.
+
+        **Target Price:** ₹{predicted_price:.2f}  
+        **Expected Change:** ₹{pred_change:.2f} per share
+        """)
+    else:
+        st.error(f"""
+        ### 🔴 SELL
+        The model predicts a **{pred_pct:.2f}%** decrease in {predict_days} days.
+
+        **Target Price:** ₹{predicted_price:.2f}  
+        **Potential Loss:** ₹{pred_change:.2f} per share
+        """)
+
+    st.divider()
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def render_live(symbol, interval):
+    """Live intraday metrics and charts, refreshed in place from the shared poller"""
+    laps = metrics.stopwatch()
+    poller = get_poller(symbol, interval)
+    version, bars, ind = poller.snapshot()
+
+    st.subheader("📡 Live Intraday")
+    if bars is None or bars.empty:
+        if poller.error:
+            st.warning(f"⚠️ Live data unavailable: {poller.error}")
         else:
-            # Display company info
-            st.success(f"✅ Successfully loaded {len(df)} days of data")
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("Company", info.get('longName', stock_name)[:20])
-            with col2:
-                st.metric("Sector", info.get('sector', 'N/A')[:15])
-            with col3:
-                st.metric("Industry", info.get('industry', 'N/A')[:15])
-            with col4:
-                exchange = "NSE" if ".NS" in symbol else "BSE" if ".BO" in symbol else "N/A"
-                st.metric("Exchange", exchange)
-            
-            st.divider()
-            
-            # Calculate metrics
-            current = df['Close'].iloc[-1]
-            previous = df['Close'].iloc[-2]
-            change = current - previous
-            pct_change = (change / previous) * 100
-            
-            high_52w = df['High'].max()
-            low_52w = df['Low'].min()
-            avg_vol = df['Volume'].mean()
-            
-            # Display current metrics
-            st.subheader("📊 Current Metrics")
-            
-            col1, col2, col3, col4, col5 = st.columns(5)
-            
-            with col1:
-                st.metric("Current Price", 
-                         f"₹{current:.2f}",
-                         f"{pct_change:+.2f}%",
-                         delta_color="normal")
-            
-            with col2:
-                st.metric("Day High", f"₹{df['High'].iloc[-1]:.2f}")
-            
-            with col3:
-                st.metric("Day Low", f"₹{df['Low'].iloc[-1]:.2f}")
-            
-            with col4:
-                st.metric("52W High", f"₹{high_52w:.2f}")
-            
-            with col5:
-                st.metric("52W Low", f"₹{low_52w:.2f}")
-            
-            st.divider()
-            
-            # Price chart
-            st.subheader("📈 Price History")
-            st.line_chart(df['Close'], use_container_width=True)
-            
-            # Volume chart
-            st.subheader("📊 Volume")
-            st.bar_chart(df['Volume'], use_container_width=True)
-            
-            st.divider()
-            
-            # Simple Moving Averages
-            st.subheader("📉 Technical Indicators")
-            
-            ma_10 = df['Close'].rolling(window=10).mean().iloc[-1]
-            ma_50 = df['Close'].rolling(window=50).mean().iloc[-1] if len(df) >= 50 else None
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.metric("10-Day MA", f"₹{ma_10:.2f}")
-                if current > ma_10:
-                    st.success("✅ Price above 10-day MA (Bullish)")
-                else:
-                    st.warning("⚠️ Price below 10-day MA (Bearish)")
-            
-            with col2:
-                if ma_50:
-                    st.metric("50-Day MA", f"₹{ma_50:.2f}")
-                    if current > ma_50:
-                        st.success("✅ Price above 50-day MA (Bullish)")
-                    else:
-                        st.warning("⚠️ Price below 50-day MA (Bearish)")
-            
-            st.divider()
-            
-            # Predictions
-            st.subheader("🔮 AI Prediction")
-            
-            # Simple prediction using linear trend
-            prices = df['Close'].values
-            days = list(range(len(prices)))
-            
-            # Calculate linear trend
-            n = len(days)
-            sum_x = sum(days)
-            sum_y = sum(prices)
-            sum_xy = sum(x * y for x, y in zip(days, prices))
-            sum_x2 = sum(x * x for x in days)
-            
-            slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-            intercept = (sum_y - slope * sum_x) / n
-            
-            # Predict future price
-            future_day = len(prices) + predict_days
-            predicted_price = slope * future_day + intercept
-            
-            # Calculate prediction change
-            pred_change = predicted_price - current
-            pred_pct = (pred_change / current) * 100
-            
-            # Display prediction
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric(f"Predicted Price ({predict_days}d)", 
-                         f"₹{predicted_price:.2f}",
-                         f"{pred_pct:+.2f}%",
-                         delta_color="normal")
-            
-            with col2:
-                st.metric("Expected Change", 
-                         f"₹{pred_change:+.2f}",
-                         f"{pred_pct:+.2f}%")
-            
-            with col3:
-                # Calculate confidence based on volatility
-                volatility = df['Close'].pct_change().std()
-                confidence = max(0, min(100, 100 - (volatility * 1000)))
-                st.metric("Confidence", f"{confidence:.0f}%")
-            
-            st.divider()
-            
-            # Recommendation
-            st.subheader("💡 Investment Recommendation")
-            
-            if pred_pct > 5:
-                st.success(f"""
-                ### 🟢 STRONG BUY
-                The model predicts a **{pred_pct:.2f}%** increase in {predict_days} days.
-                
-                **Target Price:** ₹{predicted_price:.2f}  
-                **Potential Gain:** ₹{pred_change:.2f} per share
-                """)
-            elif pred_pct > 0:
-                st.info(f"""
-                ### 🔵 BUY
-                The model predicts a **{pred_pct:.2f}%** increase in {predict_days} days.
-                
-                **Target Price:** ₹{predicted_price:.2f}  
-                **Potential Gain:** ₹{pred_change:.2f} per share
-                """)
-            elif pred_pct > -5:
-                st.warning(f"""
-                ### 🟡 HOLD
-                The model predicts a **{pred_pct:.2f}%** change in {predict_days} days.
-                
-                **Target Price:** ₹{predicted_price:.2f}  
-                **Expected Change:** ₹{pred_change:.2f} per share
-                """)
-            else:
-                st.error(f"""
-                ### 🔴 SELL
-                The model predicts a **{pred_pct:.2f}%** decrease in {predict_days} days.
-                
-                **Target Price:** ₹{predicted_price:.2f}  
-                **Potential Loss:** ₹{pred_change:.2f} per share
-                """)
-            
-            st.divider()
-            
-            # Recent data table
-            st.subheader("📋 Recent Trading Data")
-            recent_df = df.tail(10)[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
-            recent_df['Date'] = recent_df.index.strftime('%d-%m-%Y')
-            recent_df = recent_df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
-            recent_df['Open'] = recent_df['Open'].round(2)
-            recent_df['High'] = recent_df['High'].round(2)
-            recent_df['Low'] = recent_df['Low'].round(2)
-            recent_df['Close'] = recent_df['Close'].round(2)
-            
-            st.dataframe(recent_df, use_container_width=True, hide_index=True)
-            
-            # Download button
-            csv = recent_df.to_csv(index=False)
-            st.download_button(
-                "📥 Download Data (CSV)",
-                csv,
-                f"{stock_name}_data.csv",
-                "text/csv",
-                use_container_width=True
-            )
+            st.info("⏳ Waiting for the first intraday bars...")
+        return
+
+    session, prev_close = last_session(bars)
+    last = session['Close'].iloc[-1]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Last Price", f"₹{last:.2f}", f"{(last / prev_close - 1) * 100:+.2f}%")
+    with col2:
+        st.metric("Session High", f"₹{session['High'].max():.2f}")
+    with col3:
+        st.metric("Session Low", f"₹{session['Low'].min():.2f}")
+    with col4:
+        st.metric("Session Volume", f"{session['Volume'].sum():,.0f}")
+
+    status = "🟢 Market open" if market_is_open(datetime.now(IST)) else "⚪ Market closed"
+    rsi = ind.get('RSI14', math.nan)
+    rsi_text = f" · RSI({interval}) {rsi:.1f}" if not math.isnan(rsi) else ""
+    st.caption(f"{status} · last bar {session.index[-1]:%H:%M} · "
+               f"polled {poller.last_poll:%H:%M:%S}{rsi_text}")
 
-else:
-    # Landing page
+    st.line_chart(downsample(session['Close'], MAX_CHART_POINTS, "lttb"), use_container_width=True)
+    st.bar_chart(downsample(session['Volume'], MAX_CHART_POINTS, "minmax"), use_container_width=True)
+    laps.lap("render.live")
+
+
+def render_landing():
+    """Static landing page shown until a stock is analysed"""
     st.info("👈 Search and select a stock from the sidebar, then click 'ANALYZE & PREDICT' to begin")
     
     col1, col2 = st.columns(2)
@@ -518,7 +354,7 @@ else:
         st.markdown("""
         ### 🎯 Features
         - ✅ **200+ Indian Stocks** (NSE/BSE)
-        - ✅ **Searchable Dropdown** - Type to find
+        - ✅ **Instant Search** - Type to find
         - ✅ Real-time data with AI predictions
         - ✅ Technical analysis & indicators
         - ✅ Buy/Sell/Hold signals
@@ -531,7 +367,7 @@ else:
         - Type any part of company name
         - Type stock symbol (e.g., "TCS", "Reliance")
         - Results appear instantly
-        - Select from dropdown list
+        - Pick from the top matches
         """)
     
     with col2:
@@ -539,14 +375,14 @@ else:
         ### 📖 Quick Start Guide
         
         1. **Search for Stock**
-           - Click on the dropdown in sidebar
+           - Click on the search box in sidebar
            - Start typing company name or symbol
-           - Example: Type "A" to see all "A" stocks
+           - Example: Type "tata" to see all Tata stocks
            - Select your desired stock
         
         2. **Set Parameters**
-           - Choose historical period (1mo to 5y)
-           - Set prediction timeframe (7-90 days)
+           - Choose historical period (1mo to max)
+           - Set prediction timeframe (7-90 days) in the results
         
         3. **Analyze**
            - Click "ANALYZE & PREDICT" button
@@ -573,6 +409,7 @@ else:
     
     # Stock categories showcase
     st.subheader("📊 Featured Stock Categories")
+    st.caption("Live sector returns, correlations and relative strength are on the 🌐 Market page")
     
     tab1, tab2, tab3, tab4 = st.tabs(["🏦 Banking", "💻 IT", "🚗 Auto", "💊 Pharma"])
     
@@ -608,16 +445,332 @@ else:
         - Divi's Laboratories, Biocon, Torrent Pharma
         """)
 
-# Footer
-st.divider()
-st.markdown(f"""
-    <div style='text-align: center; padding: 1rem; background: #f0f2f6; border-radius: 10px;'>
-        <p style='margin: 0;'><b>📈 MarketSense AI</b></p>
-        <p style='margin: 0;'>Advanced Indian Stock Market Analysis Platform</p>
-        <p style='margin: 0; font-size: 0.9em;'>Powered by AI & Real-time Data</p>
-        <p style='margin: 0; font-size: 0.85em;'>📊 {len(ALL_STOCKS)} Stocks Available | 🔍 Searchable Database</p>
-        <p style='margin: 0; font-size: 0.8em; color: #666;'>
-            ⚠️ For Informational Purposes Only | Not Financial Advice
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+
+def render_footer():
+    """Footer below the page; returns the (empty) slot above it for the debug panel"""
+    # Timing panel, filled in at the end of the run so it can report the whole run
+    debug_panel = st.container() if DEBUG_PANEL else None
+    st.divider()
+    st.markdown(f"""
+        <div style='text-align: center; padding: 1rem; background: #f0f2f6; border-radius: 10px;'>
+            <p style='margin: 0;'><b>📈 MarketSense AI</b></p>
+            <p style='margin: 0;'>Advanced Indian Stock Market Analysis Platform</p>
+            <p style='margin: 0; font-size: 0.9em;'>Powered by AI & Real-time Data</p>
+            <p style='margin: 0; font-size: 0.85em;'>📊 {len(get_catalog())} Stocks Available | 🔍 Searchable Database</p>
+            <p style='margin: 0; font-size: 0.8em; color: #666;'>
+                ⚠️ For Informational Purposes Only | Not Financial Advice
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+    return debug_panel
+
+
+# Main content
+# The analysed stock is kept in session state so later widget interactions
+# (e.g. the prediction slider) keep showing it instead of the landing page
+if analyze_btn and symbol:
+    st.session_state['analysis'] = (symbol, period, stock_name)
+
+# The landing page needs none of the heavy modules, so it goes out before
+# they are imported: on a cold start the user sees the whole page while
+# pandas, numpy and the model code load
+landing = 'analysis' not in st.session_state
+if landing:
+    render_landing()
+    debug_panel = render_footer()
+painted = time.perf_counter()
+metrics.record("app.first_paint", painted - run_started)
+
+# Free after the first run in a process (already in sys.modules)
+import altair as alt
+import numpy as np
+import pandas as pd
+from price_store import load_history, memory_report, process_memory
+from company_info import get_company_info
+from analysis import analyze, prediction, cache as analysis_cache
+import prefetch
+from prefetch import IST, market_is_open
+from live import get_poller, last_session
+from export import FORMATS, frame_bytes
+from downsample import MAX_CHART_POINTS, ROLLUP_CHART_POINTS, downsample
+from rollups import chart_level
+from montecarlo import N_PATHS, PERCENTILES
+from models import MODELS
+imported = time.perf_counter()
+metrics.record("app.imports", imported - painted)
+
+# Keep popular stocks warm in the background (one scheduler per process)
+prefetch.ensure_started()
+metrics.ensure_server()
+
+if analyze_btn and symbol:
+    prefetch.note_request(symbol)
+
+if not landing:
+    symbol, period, stock_name = st.session_state['analysis']
+    with st.spinner(f"📊 Fetching data for {stock_name}..."):
+        # Use cached function
+        df, error = cached_stock_data(symbol, period)
+        
+        if error:
+            st.error(f"❌ Error: {error}")
+            st.info("Please check the stock symbol and try again. If you see 'Rate limited', wait 1-2 minutes.")
+        elif df is None or df.empty:
+            st.error(f"❌ No data found for {symbol}")
+            st.info("Check symbol format: NSE stocks use .NS (e.g., TCS.NS)")
+        else:
+            # Display company info (metadata has its own long-lived cache and
+            # is fetched in the background, so prices never wait on it)
+            st.success(f"✅ Successfully loaded {len(df)} days of data")
+            
+            header = st.container()
+            info = get_company_info(symbol)
+            if info is not None:
+                render_company_header(header, info, stock_name, symbol)
+            
+            st.divider()
+            
+            # Live mode polls intraday bars in the background and only
+            # refreshes its own fragment, not the analysis below
+            if live_mode:
+                render_live(symbol, live_interval)
+                st.divider()
+            
+            # Calculate metrics (cached per symbol, period and last bar)
+            laps = metrics.stopwatch()
+            a = analyze(symbol, period, df)
+            laps.lap("app.analyze")
+            current = a['current']
+            pct_change = a['pct_change']
+            high_52w = a['high_52w']
+            low_52w = a['low_52w']
+            
+            # Display current metrics
+            st.subheader("📊 Current Metrics")
+            
+            col1, col2, col3, col4, col5 = st.columns(5)
+            
+            with col1:
+                st.metric("Current Price", 
+                         f"₹{current:.2f}",
+                         f"{pct_change:+.2f}%",
+                         delta_color="normal")
+            
+            with col2:
+                st.metric("Day High", f"₹{a['day_high']:.2f}")
+            
+            with col3:
+                st.metric("Day Low", f"₹{a['day_low']:.2f}")
+            
+            with col4:
+                st.metric("52W High", f"₹{high_52w:.2f}")
+            
+            with col5:
+                st.metric("52W Low", f"₹{low_52w:.2f}")
+            
+            st.divider()
+            laps.lap("render.metrics")
+            
+            # Price chart (downsampled server-side unless the raw series is
+            # requested); long ranges start from the weekly or monthly rollups
+            st.subheader("📈 Price History")
+            show_raw = st.toggle("Show raw series", help="Send every daily bar to the chart instead of a downsampled view")
+            if show_raw:
+                level, bars = "daily", df
+                close_points, volume_points = df['Close'], df['Volume']
+            else:
+                level, bars = "daily", df
+                if a['span'] is not None:
+                    level, bars = chart_level(a['pyramid'], *a['span'], ROLLUP_CHART_POINTS)
+                close_points = downsample(bars['Close'], MAX_CHART_POINTS, "lttb")
+                volume_points = downsample(bars['Volume'], MAX_CHART_POINTS, "minmax")
+            st.line_chart(close_points, use_container_width=True)
+            if level != "daily":
+                st.caption(f"Showing {len(close_points)} {level} bars for {len(df)} trading days"
+                           + (" (LTTB)" if len(close_points) < len(bars) else ""))
+            elif len(close_points) < len(df):
+                st.caption(f"Showing {len(close_points)} of {len(df)} points (LTTB)")
+            
+            # Volume chart
+            st.subheader("📊 Volume")
+            st.bar_chart(volume_points, use_container_width=True)
+            
+            st.divider()
+            laps.lap("render.charts")
+            
+            # Simple Moving Averages
+            st.subheader("📉 Technical Indicators")
+            
+            ind = a['indicators']
+            ma_10 = ind['MA10']
+            ma_50 = ind['MA50'] if len(df) >= 50 else None
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.metric("10-Day MA", f"₹{ma_10:.2f}")
+                if current > ma_10:
+                    st.success("✅ Price above 10-day MA (Bullish)")
+                else:
+                    st.warning("⚠️ Price below 10-day MA (Bearish)")
+            
+            with col2:
+                if ma_50:
+                    st.metric("50-Day MA", f"₹{ma_50:.2f}")
+                    if current > ma_50:
+                        st.success("✅ Price above 50-day MA (Bullish)")
+                    else:
+                        st.warning("⚠️ Price below 50-day MA (Bearish)")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                rsi = ind['RSI14']
+                if not math.isnan(rsi):
+                    st.metric("RSI (14)", f"{rsi:.1f}")
+                    if rsi > 70:
+                        st.warning("⚠️ Overbought (RSI > 70)")
+                    elif rsi < 30:
+                        st.success("✅ Oversold (RSI < 30)")
+                    else:
+                        st.info("➖ Neutral momentum")
+            
+            with col2:
+                st.metric("MACD", f"{ind['MACD']:.2f}", f"{ind['MACD_hist']:+.2f} vs signal")
+                if ind['MACD'] > ind['MACD_signal']:
+                    st.success("✅ MACD above signal (Bullish)")
+                else:
+                    st.warning("⚠️ MACD below signal (Bearish)")
+            
+            with col3:
+                if not math.isnan(ind['BB_mid']):
+                    st.metric("Bollinger Band", f"₹{ind['BB_lower']:.0f} – ₹{ind['BB_upper']:.0f}")
+                    if current > ind['BB_upper']:
+                        st.warning("⚠️ Price above upper band (Overextended)")
+                    elif current < ind['BB_lower']:
+                        st.success("✅ Price below lower band (Oversold)")
+                    else:
+                        st.info("➖ Price inside the bands")
+            
+            with col4:
+                if not math.isnan(ind['ATR14']):
+                    st.metric("ATR (14)", f"₹{ind['ATR14']:.2f}", f"{ind['ATR14'] / current * 100:.2f}% of price",
+                              delta_color="off")
+            
+            st.divider()
+            
+            laps.lap("render.indicators")
+            
+            # Predictions
+            st.subheader("🔮 AI Prediction")
+            render_prediction(a)
+            laps.lap("render.prediction")
+            
+            # Recent data table
+            st.subheader("📋 Recent Trading Data")
+            recent_df = a['recent_df']
+            
+            st.dataframe(recent_df, use_container_width=True, hide_index=True)
+            
+            # Download buttons: the full period, built only when clicked
+            csv_col, parquet_col = st.columns(2)
+            with csv_col:
+                st.download_button(
+                    f"📥 Download {period} History (CSV)",
+                    lambda: frame_bytes(df, "csv"),
+                    f"{stock_name}_{period}.csv",
+                    FORMATS["csv"],
+                    use_container_width=True
+                )
+            with parquet_col:
+                st.download_button(
+                    f"📥 Download {period} History (Parquet)",
+                    lambda: frame_bytes(df, "parquet"),
+                    f"{stock_name}_{period}.parquet",
+                    FORMATS["parquet"],
+                    use_container_width=True
+                )
+            st.caption("Exporting a whole watchlist? Use the 📦 Export page, or the API's `/export` for very large exports.")
+            laps.lap("render.table")
+            
+            # Fill in the company header once the background metadata fetch lands
+            if info is None:
+                with metrics.span("app.company_info"):
+                    info = get_company_info(symbol, timeout=5)
+                render_company_header(header, info, stock_name, symbol)
+
+# Filled in after this run's analysis stages, so it includes them
+with cache_panel:
+    stats = analysis_cache.stats()
+    st.caption(f"Hit ratio: {stats['hit_ratio']:.0%} "
+               f"({stats['hits']} hits / {stats['misses']} misses, {stats['evictions']} evictions)")
+    for stage, seconds in sorted(stats['saved_seconds'].items()):
+        st.caption(f"{stage}: {seconds * 1000:.1f} ms saved")
+
+if not landing:
+    debug_panel = render_footer()
+
+run_seconds = time.perf_counter() - run_started
+metrics.record("app.run", run_seconds)
+# The first run in the process pays for the imports; later landing-page
+# reruns should do next to nothing
+cold = startup_timings()
+cold_run = not cold
+if cold_run:
+    cold.update(first_paint=painted - run_started, imports=imported - painted, run=run_seconds)
+elif landing:
+    metrics.record("app.idle_rerun", run_seconds)
+
+if DEBUG_PANEL:
+    with debug_panel.expander("🛠️ Debug: Timings & Counters", expanded=True):
+        paint_ms = cold['first_paint'] * 1000
+        st.caption(f"⏱️ This {'cold start' if cold_run else 'rerun'}: first paint "
+                   f"{(painted - run_started) * 1000:.0f} ms, imports {(imported - painted) * 1000:.0f} ms, "
+                   f"whole run {run_seconds * 1000:.0f} ms")
+        st.caption(f"{'✅' if paint_ms <= metrics.FIRST_PAINT_BUDGET_MS else '⚠️'} Cold start: first paint "
+                   f"{paint_ms:.0f} ms (budget {metrics.FIRST_PAINT_BUDGET_MS:.0f} ms), then "
+                   f"{cold['imports'] * 1000:.0f} ms of imports, {cold['run'] * 1000:.0f} ms in all")
+        if not metrics.ENABLED:
+            st.info("Instrumentation is off (MARKETSENSE_METRICS=0)")
+        else:
+            spans = metrics.current_trace()
+            st.caption(f"This run: {sum(s for _, s in spans) * 1000:.1f} ms in {len(spans)} spans "
+                       "(nested spans overlap)")
+            st.dataframe(
+                [{"Stage": stage, "ms": round(seconds * 1000, 2)} for stage, seconds in spans],
+                use_container_width=True, hide_index=True,
+            )
+            counters, timings = metrics.registry.snapshot()
+            idle = timings.get("app.idle_rerun")
+            if idle:
+                idle_ms = idle[1] / idle[0] * 1000
+                st.caption(f"{'✅' if idle_ms <= metrics.IDLE_RERUN_BUDGET_MS else '⚠️'} Idle reruns: "
+                           f"{idle_ms:.1f} ms on average over {idle[0]} (budget "
+                           f"{metrics.IDLE_RERUN_BUDGET_MS:.0f} ms)")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.caption("Process totals per stage")
+                st.dataframe(
+                    [{"Stage": stage, "Count": count, "Avg ms": round(total / count * 1000, 2),
+                      "Total s": round(total, 3)} for stage, (count, total) in sorted(timings.items())],
+                    use_container_width=True, hide_index=True,
+                )
+            with col2:
+                st.caption("Counters")
+                st.dataframe(
+                    [{"Counter": name + "".join(f" {k}={v}" for k, v in labels), "Value": value}
+                     for (name, labels), value in sorted(counters.items())],
+                    use_container_width=True, hide_index=True,
+                )
+            if metrics.METRICS_PORT:
+                st.caption(f"Prometheus: http://<host>:{metrics.METRICS_PORT}/metrics")
+
+        report = memory_report()
+        resident, shared = process_memory()
+        mapped = report["Mapped KB"].sum() / 1024
+        copied = report["Copied KB"].sum() / 1024
+        summary = f"🧠 Price store: {report['Symbol'].nunique()} symbols, {mapped:.1f} MB mapped (shared), {copied:.1f} MB copied"
+        if resident is not None:
+            summary += f" · process RSS {resident / 2**20:.0f} MB, of which {shared / 2**20:.0f} MB shared"
+        st.caption(summary)
+        st.dataframe(report, use_container_width=True, hide_index=True)
@@ -0,0 +1,128 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from forecast import SIGNALS, SIGNAL_THRESHOLDS, signal_codes
+from price_store import resolve, share
+
+BACKTEST_COLUMNS = ["Signal", "Signals", "Hit Rate %", "Avg Forward Return %",
+                    "Strategy Return %", "Max Drawdown %"]
+
+
+def rolling_trend_pct(close, lookback, predict_days):
+    """Walk-forward linear-trend prediction for every bar, as % change
+
+    Entry t uses the same fit as the analysis page would over bars
+    t-lookback+1..t, predicting `predict_days` past the window. Fits come from
+    rolling sums (cumsum differences), so the whole series costs O(n).
+    """
+    y = np.asarray(close, dtype=np.float64)
+    n = len(y)
+    pred_pct = np.full(n, np.nan)
+    if n < lookback or lookback < 2:
+        return pred_pct
+
+    # Scale to ~1 so the cumulative sums stay well inside float64 precision
+    y = y / y[0]
+    j = np.arange(n, dtype=np.float64)
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    cum_jy = np.concatenate(([0.0], np.cumsum(j * y)))
+
+    end = np.arange(lookback - 1, n)
+    start = end - lookback + 1
+    sum_y = cum_y[end + 1] - cum_y[start]
+    # x restarts at 0 inside each window: sum(x*y) = sum(j*y) - start*sum(y)
+    sum_xy = cum_jy[end + 1] - cum_jy[start] - start * sum_y
+
+    L = float(lookback)
+    sum_x = L * (L - 1) / 2
+    sum_x2 = (L - 1) * L * (2 * L - 1) / 6
+    slope = (L * sum_xy - sum_x * sum_y) / (L * sum_x2 - sum_x * sum_x)
+    intercept = (sum_y - slope * sum_x) / L
+    predicted = slope * (L + predict_days) + intercept
+    pred_pct[end] = (predicted / y[end] - 1) * 100
+    return pred_pct
+
+
+def walk_forward(close, lookback, predict_days):
+    """Per-bar signal code, next-bar return and forward return for one symbol"""
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    codes = signal_codes(rolling_trend_pct(close, lookback, predict_days))
+    next_ret = np.full(n, np.nan)
+    next_ret[:-1] = close[1:] / close[:-1] - 1
+    fwd_ret = np.full(n, np.nan)
+    if n > predict_days:
+        fwd_ret[:-predict_days] = close[predict_days:] / close[:-predict_days] - 1
+    return codes, next_ret, fwd_ret
+
+
+def _walk_forward_job(job):
+    frame, lookback, predict_days = job
+    return walk_forward(resolve(frame)["Close"].to_numpy(), lookback, predict_days)
+
+
+def _max_drawdown(equity):
+    peak = np.maximum.accumulate(equity)
+    return ((equity / peak) - 1).min() if len(equity) else np.nan
+
+
+def backtest(frames, lookback=250, predict_days=30, workers=None):
+    """Replay the Buy/Hold/Sell rule over every date of every symbol
+
+    `frames` maps symbol -> daily OHLCV frame. Symbols are spread over a
+    process pool (`workers=1` runs in-process). Returns (summary, equity):
+    per-signal hit rate, average forward return, total return and max
+    drawdown of an equal-weight daily strategy holding every symbol while it
+    carries that signal (short for SELL), and that strategy's equity curves.
+    """
+    symbols = list(frames)
+    # Store-backed frames travel as handles and are re-mapped by the workers
+    jobs = [(share(s, frames[s]), lookback, predict_days) for s in symbols]
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers > 1 and len(jobs) > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            results = list(pool.map(_walk_forward_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        results = [_walk_forward_job(job) for job in jobs]
+
+    parts = []
+    for symbol, (codes, next_ret, fwd_ret) in zip(symbols, results):
+        dates = frames[symbol].index
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        parts.append(pd.DataFrame({"date": dates.normalize(), "code": codes,
+                                   "next_ret": next_ret, "fwd_ret": fwd_ret}))
+    panel = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+        columns=["date", "code", "next_ret", "fwd_ret"])
+    panel = panel[panel["code"] >= 0]
+
+    rows, curves = [], {}
+    for code, label in enumerate(SIGNALS):
+        bucket = panel[panel["code"] == code]
+        side = -1.0 if label == "SELL" else 1.0
+        fwd = bucket["fwd_ret"].dropna()
+        if label == "HOLD":
+            hits = fwd.abs() * 100 < SIGNAL_THRESHOLDS[0]
+        else:
+            hits = side * fwd > 0
+        daily = bucket.dropna(subset=["next_ret"]).groupby("date")["next_ret"].mean() * side
+        equity = (1 + daily).cumprod()
+        curves[label] = equity
+        rows.append({
+            "Signal": label,
+            "Signals": len(bucket),
+            "Hit Rate %": hits.mean() * 100 if len(fwd) else np.nan,
+            "Avg Forward Return %": fwd.mean() * 100 if len(fwd) else np.nan,
+            "Strategy Return %": (equity.iloc[-1] - 1) * 100 if len(equity) else np.nan,
+            "Max Drawdown %": _max_drawdown(equity.to_numpy()) * 100,
+        })
+
+    summary = pd.DataFrame(rows, columns=BACKTEST_COLUMNS)
+    equity = pd.DataFrame(curves).sort_index().ffill().fillna(1.0)
+    return summary, equity
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+# Offline benchmark of the data path, stage by stage, over a grid of symbol
+# counts and periods. Runs against a throwaway store and (by default) the
+# synthetic provider, so results don't depend on the network or Yahoo's
+# rate limits, and writes JSON that can be compared between releases:
+#
+#   python bench.py --output bench.json
+#   python bench.py --symbols 1,1000,5000 --periods 1mo,max --compare bench.json
+#
+# `--startup` instead times the main page itself: a cold start in a fresh
+# interpreter and a run of idle reruns, checked against the budgets in
+# metrics.py.
+
+SYMBOL_COUNTS = (1, 10, 100)
+PERIODS = ("1mo", "1y", "5y", "max")
+STAGES = ("fetch", "cache", "indicators", "regression", "render_prep", "export")
+MAX_SYMBOLS = 5000
+STARTUP_RERUNS = 20
+SCHEMA_VERSION = 1
+
+# Runs in a fresh interpreter so the cold start pays for every import; the
+# app's spans land in the same metrics registry
+_STARTUP_PROBE = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+import metrics
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.run()
+_, cold = metrics.registry.snapshot()
+for _ in range(int(sys.argv[2])):
+    app.run()
+_, after = metrics.registry.snapshot()
+print(json.dumps({"exception": [str(e.value) for e in app.exception], "cold": cold, "after": after}))
+"""
+
+
+def universe(n):
+    """`n` symbols: the real catalog first, then synthetic names"""
+    from stocks import ALL_STOCKS
+    symbols = list(dict.fromkeys(ALL_STOCKS.values()))[:n]
+    return symbols + [f"SYN{i:04d}.NS" for i in range(n - len(symbols))]
+
+
+def _git_version():
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _timed(fn, repeats):
+    """(result of the last run, list of wall times)"""
+    times = []
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return result, times
+
+
+def run_case(symbols, period, repeats=3, fmt="csv"):
+    """Time every stage for one (symbols, period) cell; returns result rows"""
+    import numpy as np
+    import price_store
+    from downsample import MAX_CHART_POINTS, downsample
+    from export import frame_bytes
+    from forecast import fit_trend, right_align
+    from indicators import compute_indicators
+
+    def fetch():
+        # Cold: empty store, every symbol comes from the provider
+        shutil.rmtree(price_store.PRICE_DIR, ignore_errors=True)
+        with price_store._views_lock:
+            price_store._views.clear()
+        return price_store.load_many(symbols, period)
+
+    def cache():
+        # Warm store in a fresh process: files are re-read and re-mapped
+        with price_store._views_lock:
+            price_store._views.clear()
+        return price_store.load_many(symbols, period)
+
+    frames, fetch_times = _timed(fetch, repeats)
+    frames, cache_times = _timed(cache, repeats)
+    frames = list(frames.values())
+    stages = {
+        "fetch": fetch_times,
+        "cache": cache_times,
+        "indicators": _timed(lambda: [compute_indicators(df) for df in frames], repeats)[1],
+        "regression": _timed(lambda: fit_trend(right_align(
+            [df['Close'].to_numpy(dtype=np.float64) for df in frames])).predict(30), repeats)[1],
+        "render_prep": _timed(lambda: [(downsample(df['Close'], MAX_CHART_POINTS, "lttb"),
+                                        downsample(df['Volume'], MAX_CHART_POINTS, "minmax"))
+                                       for df in frames], repeats)[1],
+        "export": _timed(lambda: [frame_bytes(df, fmt) for df in frames], repeats)[1],
+    }
+
+    bars = sum(len(df) for df in frames)
+    rows = []
+    for stage in STAGES:
+        times = sorted(stages[stage])
+        best = times[0]
+        rows.append({
+            "stage": stage,
+            "symbols": len(symbols),
+            "loaded": len(frames),
+            "period": period,
+            "bars": bars,
+            "repeats": repeats,
+            "min_s": round(best, 6),
+            "median_s": round(times[len(times) // 2], 6),
+            "per_symbol_ms": round(best / max(len(frames), 1) * 1000, 4),
+            "bars_per_s": round(bars / best) if best > 0 else None,
+        })
+    return rows
+
+
+def startup(reruns=STARTUP_RERUNS):
+    """Cold-start and idle-rerun timings of app.py, with the budget verdicts"""
+    import metrics
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "MARKETSENSE_PREFETCH": "0", "MARKETSENSE_METRICS": "1"}
+    out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE, os.path.join(root, "app.py"), str(reruns)],
+                         capture_output=True, text=True, cwd=root, env=env, timeout=600)
+    if out.returncode != 0:
+        raise RuntimeError(f"startup probe failed:\n{out.stderr[-2000:]}")
+    probe = json.loads(out.stdout.strip().splitlines()[-1])
+    if probe["exception"]:
+        raise RuntimeError(f"app.py raised: {probe['exception'][0]}")
+
+    cold = {stage: total for stage, (count, total) in probe["cold"].items()}
+    idle_count, idle_total = probe["after"].get("app.idle_rerun", (0, 0.0))
+    first_paint_ms = cold["app.first_paint"] * 1000
+    idle_ms = idle_total / idle_count * 1000 if idle_count else None
+    return {
+        "first_paint_ms": round(first_paint_ms, 2),
+        "imports_ms": round(cold["app.imports"] * 1000, 2),
+        "cold_run_ms": round(cold["app.run"] * 1000, 2),
+        "idle_reruns": idle_count,
+        "idle_rerun_ms": round(idle_ms, 3) if idle_ms is not None else None,
+        "first_paint_budget_ms": metrics.FIRST_PAINT_BUDGET_MS,
+        "idle_rerun_budget_ms": metrics.IDLE_RERUN_BUDGET_MS,
+        "within_budget": first_paint_ms <= metrics.FIRST_PAINT_BUDGET_MS
+                         and idle_ms is not None and idle_ms <= metrics.IDLE_RERUN_BUDGET_MS,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Rows of `results` whose best time is over `tolerance` x the baseline's"""
+    key = lambda r: (r["stage"], r["symbols"], r["period"])
+    before = {key(r): r for r in baseline["results"]}
+    slower = []
+    for row in results["results"]:
+        old = before.get(key(row))
+        if old and old["min_s"] > 0 and row["min_s"] > old["min_s"] * tolerance:
+            slower.append({**row, "baseline_s": old["min_s"], "ratio": round(row["min_s"] / old["min_s"], 2)})
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline MarketSense AI benchmark (JSON output)")
+    parser.add_argument("--symbols", default=",".join(map(str, SYMBOL_COUNTS)),
+                        help=f"comma-separated symbol counts, 1-{MAX_SYMBOLS}")
+    parser.add_argument("--periods", default=",".join(PERIODS), help="comma-separated periods, 1mo-max")
+    parser.add_argument("--provider", default="synthetic",
+                        help="synthetic[:seed], replay:<directory> or yahoo (network, rate limited)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet"], help="export stage format")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON; exits 1 if any stage got slower")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown vs the baseline")
+    parser.add_argument("--startup", action="store_true",
+                        help="time the main page's cold start and idle reruns instead; exits 1 over budget")
+    parser.add_argument("--reruns", type=int, default=STARTUP_RERUNS, help="idle reruns timed by --startup")
+    args = parser.parse_args(argv)
+
+    counts = [int(n) for n in args.symbols.split(",")]
+    if not all(1 <= n <= MAX_SYMBOLS for n in counts):
+        parser.error(f"symbol counts must be between 1 and {MAX_SYMBOLS}")
+    periods = args.periods.split(",")
+
+    # The store location is read at import time, so point it at a scratch
+    # directory before the app modules are imported
+    store = tempfile.mkdtemp(prefix="marketsense-bench-")
+    os.environ["MARKETSENSE_STORE"] = store
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import price_store
+    from providers import provider_from_spec, set_provider
+
+    unknown = [p for p in periods if p not in price_store.PERIODS]
+    if unknown:
+        shutil.rmtree(store, ignore_errors=True)
+        parser.error(f"unknown period(s): {', '.join(unknown)}")
+    provider = provider_from_spec(args.provider)
+    set_provider(provider)
+
+    results = {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "version": _git_version(),
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "provider": args.provider,
+            "repeats": args.repeats,
+            "export_format": args.format,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "pyarrow": pa.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": [],
+    }
+    try:
+        if args.startup:
+            os.environ["MARKETSENSE_PROVIDER"] = args.provider
+            results["startup"] = startup(args.reruns)
+            print("startup: " + "  ".join(f"{k} {v}" for k, v in results["startup"].items()), file=sys.stderr)
+        else:
+            for n in counts:
+                symbols = universe(n)
+                for period in periods:
+                    rows = run_case(symbols, period, args.repeats, args.format)
+                    results["results"].extend(rows)
+                    print(f"{n:>5} symbols {period:>4}: " + "  ".join(
+                        f"{r['stage']} {r['min_s'] * 1000:.1f}ms" for r in rows), file=sys.stderr)
+    finally:
+        shutil.rmtree(store, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(results, json.load(f), args.tolerance)
+        for row in slower:
+            print(f"SLOWER {row['stage']} {row['symbols']}x{row['period']}: "
+                  f"{row['min_s']:.4f}s vs {row['baseline_s']:.4f}s ({row['ratio']}x)", file=sys.stderr)
+        return 1 if slower else 0
+    if args.startup and not results["startup"]["within_budget"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
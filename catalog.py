@@ -0,0 +1,243 @@
+import io
+import os
+import csv
+import gzip
+import json
+import sys
+import time
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from urllib.request import Request, urlopen
+
+# Searchable NSE/BSE symbol catalog, loaded lazily from a gzipped CSV
+# (symbol,name,exchange) and indexed once per process. The bundled file only
+# holds the curated stocks; on first run the full exchange listings are
+# downloaded in the background and cached in the store, then refreshed weekly.
+CATALOG_PATH = os.environ.get(
+    "MARKETSENSE_CATALOG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbols.csv.gz"),
+)
+CACHE_PATH = os.path.join(
+    os.environ.get("MARKETSENSE_STORE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "store")),
+    "symbols.csv.gz",
+)
+CACHE_MAX_AGE = 7 * 24 * 3600  # seconds
+
+# NSE's equity list (CSV) and BSE's active equity scrips (JSON)
+LISTING_URLS = (
+    "https://nsearchives.nseindia.com/content/equities/EQUITY_L.csv",
+    "https://api.bseindia.com/BseIndiaAPI/api/ListofScripData/w"
+    "?Group=&Scripcode=&industry=&segment=Equity&status=Active",
+)
+# Offline providers never reach the exchanges; MARKETSENSE_CATALOG_FETCH=0
+# keeps the bundled catalog even with Yahoo
+FETCH_LISTINGS = (os.environ.get("MARKETSENSE_CATALOG_FETCH", "1") != "0"
+                  and os.environ.get("MARKETSENSE_PROVIDER", "yahoo") == "yahoo")
+
+
+def _normalize(text):
+    return "".join(c if c.isalnum() else " " for c in text.lower()).split()
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolCatalog:
+    """Symbols deduplicated by ticker, with a prefix and trigram index"""
+
+    def __init__(self, entries):
+        seen = {}
+        for symbol, name, exchange in entries:
+            seen.setdefault(symbol.upper(), (name, exchange))
+        self.symbols = list(seen)
+        self.names = [seen[s][0] for s in self.symbols]
+        self.exchanges = [seen[s][1] for s in self.symbols]
+
+        # Prefix index: sorted (token, id) pairs searched with bisect
+        tokens = []
+        trigrams = defaultdict(set)
+        self._by_base = defaultdict(list)
+        for i, (symbol, name) in enumerate(zip(self.symbols, self.names)):
+            base = symbol.rsplit(".", 1)[0].lower()
+            self._by_base[base].append(i)
+            words = set(_normalize(name)) | {base}
+            for word in words:
+                tokens.append((word, i))
+                for gram in _trigrams(word):
+                    trigrams[gram].add(i)
+        tokens.sort()
+        self._tokens = tokens
+        self._token_keys = [t for t, _ in tokens]
+        self._trigrams = {g: frozenset(ids) for g, ids in trigrams.items()}
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def name_of(self, symbol):
+        i = self._index.get(symbol)
+        return self.names[i] if i is not None else None
+
+    def _prefix_ids(self, word):
+        ids = set()
+        pos = bisect_left(self._token_keys, word)
+        while pos < len(self._tokens) and self._token_keys[pos].startswith(word):
+            ids.add(self._tokens[pos][1])
+            pos += 1
+        return ids
+
+    def search(self, query, limit=20):
+        """Best matches for a name or ticker query as (symbol, name) pairs
+
+        Every query word must prefix-match a word of the name or the ticker;
+        when that finds nothing, trigram overlap catches typos and
+        mid-word fragments.
+        """
+        words = _normalize(query)
+        if not words:
+            return []
+
+        scores = defaultdict(float)
+        # Exact ticker (e.g. "M&M", "TCS.NS") always comes first
+        raw = query.strip().lower()
+        if raw.endswith((".ns", ".bo")):
+            raw = raw[:-3]
+        for i in self._by_base.get(raw, ()):
+            scores[i] += 100.0
+        matched = None
+        for word in words:
+            ids = self._prefix_ids(word)
+            matched = ids if matched is None else matched & ids
+        for i in matched or ():
+            base = self.symbols[i].rsplit(".", 1)[0].lower()
+            scores[i] += 10.0
+            if base == words[0]:
+                scores[i] += 20.0
+            elif base.startswith(words[0]):
+                scores[i] += 5.0
+
+        if not scores:
+            grams = set().union(*(_trigrams(w) for w in words))
+            for gram in grams:
+                for i in self._trigrams.get(gram, ()):
+                    scores[i] += 1.0 / len(grams)
+            scores = {i: s for i, s in scores.items() if s >= 0.3}
+
+        ranked = sorted(scores, key=lambda i: (-scores[i], len(self.names[i]), self.names[i]))
+        return [(self.symbols[i], self.names[i]) for i in ranked[:limit]]
+
+
+def read_catalog(path=CATALOG_PATH):
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as f:
+        return [(row["symbol"], row["name"], row["exchange"]) for row in csv.DictReader(f)]
+
+
+def _listing_entries(rows):
+    """(symbol, name, exchange) from NSE or BSE listing rows
+
+    NSE's EQUITY_L.csv has SYMBOL and NAME OF COMPANY, BSE's equity list
+    export Security Id and Security Name, and BSE's scrip API scrip_id and
+    Scrip_Name.
+    """
+    for row in rows:
+        row = {k.strip(): str(v or "").strip() for k, v in row.items() if k}
+        if row.get("SYMBOL"):
+            yield row["SYMBOL"] + ".NS", row["NAME OF COMPANY"], "NSE"
+        elif row.get("Security Id"):
+            yield row["Security Id"] + ".BO", row["Security Name"], "BSE"
+        elif row.get("scrip_id"):
+            yield row["scrip_id"] + ".BO", row.get("Scrip_Name") or row["scrip_id"], "BSE"
+
+
+def _write_catalog(catalog, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["symbol", "name", "exchange"])
+        for row in sorted(zip(catalog.symbols, catalog.names, catalog.exchanges)):
+            writer.writerow(row)
+    os.replace(tmp, path)
+
+
+def download_listings(urls=LISTING_URLS, timeout=20):
+    """Listing entries from every URL that answers; failed ones are skipped"""
+    entries = []
+    for url in urls:
+        request = Request(url, headers={"User-Agent": "Mozilla/5.0", "Accept": "*/*",
+                                        "Referer": "https://www.bseindia.com/"})
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                text = response.read().decode("utf-8-sig")
+            rows = json.loads(text) if text.lstrip().startswith("[") else csv.DictReader(io.StringIO(text))
+            entries.extend(_listing_entries(rows))
+        except (OSError, ValueError):
+            continue
+    return entries
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def _refresh():
+    """Replace the catalog with the downloaded listings and cache them"""
+    global _catalog
+    entries = download_listings()
+    if not entries:
+        return
+    # Bundled entries first, so the curated names win for duplicate symbols
+    catalog = SymbolCatalog(read_catalog() + entries)
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        _write_catalog(catalog, CACHE_PATH)
+    except OSError:
+        pass
+    with _catalog_lock:
+        _catalog = catalog
+
+
+def get_catalog():
+    """The process-wide catalog, loaded and indexed on first use
+
+    Serves the cached full listings when there are any, else the bundled
+    catalog while the listings download in the background.
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            try:
+                age = time.time() - os.path.getmtime(CACHE_PATH)
+                _catalog = SymbolCatalog(read_catalog(CACHE_PATH))
+            except (OSError, ValueError):
+                age = None
+                _catalog = SymbolCatalog(read_catalog())
+            if FETCH_LISTINGS and (age is None or age > CACHE_MAX_AGE):
+                threading.Thread(target=_refresh, name="catalog", daemon=True).start()
+        return _catalog
+
+
+def build_catalog(sources, path=CATALOG_PATH):
+    """Write the catalog file from exchange listings plus the curated stocks
+
+    Accepts NSE's EQUITY_L.csv and BSE's equity list export; rows are
+    deduplicated by Yahoo symbol.
+    """
+    from stocks import ALL_STOCKS
+
+    entries = [(symbol, name, "NSE" if symbol.endswith(".NS") else "BSE")
+               for name, symbol in ALL_STOCKS.items()]
+    for source in sources:
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            entries.extend(_listing_entries(csv.DictReader(f)))
+
+    catalog = SymbolCatalog(entries)
+    _write_catalog(catalog, path)
+    return len(catalog)
+
+
+if __name__ == "__main__":
+    # python catalog.py EQUITY_L.csv Equity.csv
+    print(f"Wrote {build_catalog(sys.argv[1:])} symbols to {CATALOG_PATH}")
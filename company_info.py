@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from price_store import STORE_DIR
+import metrics
+from providers import get_provider
+from upstream import call
+
+# Company metadata (name, sector, industry) is cached on disk separately from
+# prices: `ticker.info` is the slowest Yahoo endpoint and rarely changes.
+INFO_DIR = os.path.join(STORE_DIR, "info")
+INFO_TTL = 7 * 24 * 3600  # seconds
+
+# Only the fields the app shows are kept
+INFO_FIELDS = ("longName", "shortName", "sector", "industry", "exchange", "currency")
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="company-info")
+_pending = {}
+_pending_lock = threading.Lock()
+
+# Parsed entries shared by every caller in the process, keyed by file mtime
+_entries = {}
+_entries_lock = threading.Lock()
+
+
+def _path(symbol):
+    return os.path.join(INFO_DIR, f"{quote(symbol, safe='')}.json")
+
+
+def _read(symbol):
+    try:
+        mtime = os.stat(_path(symbol)).st_mtime_ns
+        with _entries_lock:
+            cached = _entries.get(symbol)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(_path(symbol)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    with _entries_lock:
+        _entries[symbol] = (mtime, entry)
+    return entry
+
+
+def _refresh(symbol):
+    try:
+        provider = get_provider()
+        raw = call(("info", symbol), lambda: provider.info(symbol), timeout=60,
+                   limited=provider.rate_limited) or {}
+        info = {k: raw[k] for k in INFO_FIELDS if raw.get(k)}
+        entry = {"fetched": time.time(), "info": info}
+        os.makedirs(INFO_DIR, exist_ok=True)
+        tmp = _path(symbol) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, _path(symbol))
+        return info
+    finally:
+        with _pending_lock:
+            _pending.pop(symbol, None)
+
+
+def _schedule(symbol):
+    with _pending_lock:
+        future = _pending.get(symbol)
+        if future is None:
+            future = _pending[symbol] = _executor.submit(_refresh, symbol)
+        return future
+
+
+def get_company_info(symbol, timeout=0):
+    """Cached company metadata; refreshed in the background when stale
+
+    Returns the stored dict (even if stale) straight away. When nothing is
+    stored yet, waits up to `timeout` seconds for the background fetch and
+    returns None if it has not finished or failed. The dict is shared by
+    every caller in the process and must not be modified.
+    """
+    entry = _read(symbol)
+    if entry is None or time.time() - entry["fetched"] > INFO_TTL:
+        metrics.inc("cache_misses_total", cache="company_info")
+        future = _schedule(symbol)
+        if entry is None:
+            if timeout <= 0:
+                return None
+            try:
+                return future.result(timeout=timeout)
+            except Exception:
+                return None
+    else:
+        metrics.inc("cache_hits_total", cache="company_info")
+    return entry["info"]
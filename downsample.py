@@ -0,0 +1,74 @@
+import numpy as np
+
+# Server-side chart downsampling: long series are reduced to roughly one
+# point per horizontal pixel before they are sent to the browser.
+
+MAX_CHART_POINTS = 1000
+# Long ranges are drawn from weekly or monthly bars once those alone give
+# at least this many points
+ROLLUP_CHART_POINTS = MAX_CHART_POINTS // 2
+
+
+def lttb_indices(y, n_out):
+    """Indices kept by Largest-Triangle-Three-Buckets
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point
+    and the average of the next bucket, which preserves peaks and troughs.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    edges = np.append(edges, n)  # the "next bucket" of the last one is the final point
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2]
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax_indices(y, n_out):
+    """Indices of each bucket's minimum and maximum, in original order"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    buckets = n_out // 2
+    if n <= n_out or buckets < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    kept = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        chunk = y[lo:hi]
+        i_min, i_max = lo + int(np.argmin(chunk)), lo + int(np.argmax(chunk))
+        kept.extend(sorted({i_min, i_max}))
+    return np.asarray(kept, dtype=np.int64)
+
+
+def downsample(series, max_points=MAX_CHART_POINTS, method="lttb"):
+    """Reduce a pandas Series to at most `max_points` for charting
+
+    `method` is "lttb" for prices and "minmax" for bar-like data such as
+    volume. NaNs are dropped first.
+    """
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    if method == "minmax":
+        kept = minmax_indices(series.to_numpy(), max_points)
+    else:
+        kept = lttb_indices(series.to_numpy(), max_points)
+    return series.iloc[kept]
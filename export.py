@@ -0,0 +1,102 @@
+import io
+import zipfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from price_store import BATCH_SIZE, load_many
+
+# Streaming exports: frames are written a chunk of rows at a time, and
+# multi-symbol zips hold only one batch of symbols in memory at once.
+
+EXPORT_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+CHUNK_ROWS = 2000
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+def export_frame(df):
+    """Date + OHLCV columns in the layout every export uses"""
+    out = df[['Open', 'High', 'Low', 'Close', 'Volume']].reset_index(drop=True)
+    out.insert(0, 'Date', df.index.strftime('%Y-%m-%d'))
+    return out
+
+
+def _write_chunks(df, f, fmt, chunk_rows=CHUNK_ROWS):
+    """Write `df` to file `f` chunk by chunk, yielding after each chunk"""
+    out = export_frame(df)
+    if fmt == "parquet":
+        schema = pa.Schema.from_pandas(out, preserve_index=False)
+        with pq.ParquetWriter(f, schema) as writer:
+            for start in range(0, len(out), chunk_rows):
+                chunk = out.iloc[start:start + chunk_rows]
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield
+    else:
+        f.write(",".join(out.columns).encode() + b"\n")
+        for start in range(0, len(out), chunk_rows):
+            f.write(out.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode())
+            yield
+
+
+def frame_bytes(df, fmt="csv"):
+    """A whole single-symbol export as bytes"""
+    buf = io.BytesIO()
+    for _ in _write_chunks(df, buf, fmt):
+        pass
+    return buf.getvalue()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable buffer that a zip streams into and we drain"""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._buf += b
+        return len(b)
+
+    def drain(self):
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+def iter_zip(symbols, period, fmt="csv", group_size=BATCH_SIZE, load=None):
+    """Yield a zip archive with one file per symbol as a stream of byte chunks
+
+    Symbols are loaded `group_size` at a time through `load` (default the
+    shared store's `load_many`, with batched downloads for anything missing)
+    and released once written, so memory stays flat however many symbols
+    are exported.
+    """
+    load = load or load_many
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    symbols = list(dict.fromkeys(symbols))
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(0, len(symbols), group_size):
+            frames = load(symbols[i:i + group_size], period)
+            for symbol in symbols[i:i + group_size]:
+                df = frames.pop(symbol, None)
+                if df is None or df.empty:
+                    continue
+                with zf.open(f"{symbol.replace('/', '_')}.{fmt}", "w", force_zip64=True) as f:
+                    for _ in _write_chunks(df, f, fmt):
+                        chunk = sink.drain()
+                        if chunk:
+                            yield chunk
+            del frames
+    yield sink.drain()
+
+
+def zip_bytes(symbols, period, fmt="csv"):
+    """The whole `iter_zip` archive as bytes, for st.download_button
+
+    Streamlit keeps download data in memory and only accepts bytes, str or
+    in-memory buffers, so there is nothing to gain from spooling to disk.
+    """
+    return b"".join(iter_zip(symbols, period, fmt))
@@ -0,0 +1,92 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# Recommendation buckets on predicted % change: a prediction falls in the
+# first bucket whose threshold it exceeds, SELL otherwise
+SIGNALS = ["STRONG BUY", "BUY", "HOLD", "SELL"]
+SIGNAL_THRESHOLDS = [5.0, 0.0, -5.0]
+
+
+class TrendFit(NamedTuple):
+    """Least-squares linear trend over bar positions 0..n-1
+
+    Fields are scalars for a single series, or arrays with one entry per row
+    when several series were fitted at once.
+    """
+    slope: np.ndarray
+    intercept: np.ndarray
+    stderr: np.ndarray  # residual standard error
+    n: int
+
+    def predict(self, predict_days):
+        """Trend value `predict_days` bars past the end of the fitted window
+
+        `predict_days` may be a scalar or a 1-D array of horizons; for a
+        multi-series fit the result then has shape (series, horizons).
+        """
+        x = self.n + np.asarray(predict_days, dtype=np.float64)
+        if x.ndim and np.ndim(self.slope):
+            return np.multiply.outer(self.slope, x) + np.asarray(self.intercept)[:, None]
+        return self.slope * x + self.intercept
+
+
+def fit_trend(prices):
+    """Fit a linear trend to a price series or a (symbols x bars) matrix
+
+    NaN marks a missing bar (e.g. a symbol listed after the first column),
+    so ragged histories can be stacked by right-aligning them. x and y are
+    centred before forming the sums, which keeps float64 accurate on long
+    histories and large prices.
+    """
+    y = np.asarray(prices, dtype=np.float64)
+    single = y.ndim == 1
+    y = np.atleast_2d(y)
+    n = y.shape[1]
+
+    mask = np.isfinite(y)
+    count = mask.sum(axis=1)
+    x = np.arange(n, dtype=np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = (mask * x).sum(axis=1) / count
+        y_mean = np.where(mask, y, 0.0).sum(axis=1) / count
+        dx = np.where(mask, x - x_mean[:, None], 0.0)
+        dy = np.where(mask, y - y_mean[:, None], 0.0)
+
+        slope = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+        intercept = y_mean - slope * x_mean
+        resid = dy - slope[:, None] * dx
+        stderr = np.sqrt((resid * resid).sum(axis=1) / (count - 2))
+
+    if single:
+        return TrendFit(slope[0], intercept[0], stderr[0], n)
+    return TrendFit(slope, intercept, stderr, n)
+
+
+def right_align(series_list):
+    """Stack 1-D series of different lengths into a NaN-padded matrix
+
+    Each row ends at the last column, so position offsets from the latest bar
+    line up across symbols and `fit_trend` gives the same per-row result as
+    fitting each series on its own.
+    """
+    width = max((len(s) for s in series_list), default=0)
+    matrix = np.full((len(series_list), width), np.nan)
+    for i, s in enumerate(series_list):
+        if len(s):
+            matrix[i, width - len(s):] = s
+    return matrix
+
+
+def signal_codes(pred_pct):
+    """Index into SIGNALS for each predicted % change (-1 where it is NaN)"""
+    pred = np.asarray(pred_pct, dtype=np.float64)
+    codes = np.select([pred > t for t in SIGNAL_THRESHOLDS], list(range(len(SIGNAL_THRESHOLDS))),
+                      len(SIGNAL_THRESHOLDS))
+    return np.where(np.isnan(pred), -1, codes)
+
+
+def recommendation(pred_pct):
+    """Signal label for a single predicted % change"""
+    return SIGNALS[int(signal_codes(pred_pct))]
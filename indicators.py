@@ -0,0 +1,233 @@
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+# Indicator parameters (classic defaults)
+MA_SHORT, MA_LONG = 10, 50
+EMA_FAST, EMA_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_PERIOD = 14
+BB_PERIOD, BB_WIDTH = 20, 2.0
+ATR_PERIOD = 14
+
+INDICATOR_COLUMNS = ["MA10", "MA50", "EMA12", "EMA26", "RSI14", "MACD", "MACD_signal",
+                     "MACD_hist", "BB_mid", "BB_upper", "BB_lower", "ATR14"]
+
+
+def _alpha(span):
+    return 2.0 / (span + 1)
+
+
+def _raw(df):
+    """Vectorized pass returning the public columns plus the recursion state"""
+    close = df["Close"].astype(float)
+    high = df["High"].astype(float)
+    low = df["Low"].astype(float)
+    prev_close = close.shift(1)
+
+    out = pd.DataFrame(index=df.index)
+    out["MA10"] = close.rolling(MA_SHORT).mean()
+    out["MA50"] = close.rolling(MA_LONG).mean()
+    out["EMA12"] = close.ewm(alpha=_alpha(EMA_FAST), adjust=False).mean()
+    out["EMA26"] = close.ewm(alpha=_alpha(EMA_SLOW), adjust=False).mean()
+    out["MACD"] = out["EMA12"] - out["EMA26"]
+    out["MACD_signal"] = out["MACD"].ewm(alpha=_alpha(MACD_SIGNAL), adjust=False).mean()
+    out["MACD_hist"] = out["MACD"] - out["MACD_signal"]
+
+    # Wilder smoothing for RSI and ATR
+    change = close.diff()
+    out["_gain"] = change.clip(lower=0).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean()
+    out["_loss"] = (-change).clip(lower=0).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean()
+    out["RSI14"] = _rsi(out["_gain"], out["_loss"])
+    out.loc[out.index[:RSI_PERIOD], "RSI14"] = np.nan
+
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()],
+                           axis=1).max(axis=1)
+    out["_atr"] = true_range.ewm(alpha=1 / ATR_PERIOD, adjust=False).mean()
+    out["ATR14"] = out["_atr"]
+    out.loc[out.index[:ATR_PERIOD - 1], "ATR14"] = np.nan
+
+    out["BB_mid"] = close.rolling(BB_PERIOD).mean()
+    band = BB_WIDTH * close.rolling(BB_PERIOD).std(ddof=0)
+    out["BB_upper"] = out["BB_mid"] + band
+    out["BB_lower"] = out["BB_mid"] - band
+    return out
+
+
+def _rsi(gain, loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = gain / loss
+        return np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), 100 - 100 / (1 + rs))
+
+
+def compute_indicators(df):
+    """All indicators for every bar of an OHLC frame, in one vectorized pass"""
+    return _raw(df)[INDICATOR_COLUMNS]
+
+
+class IndicatorState:
+    """Rolling indicator state that absorbs one bar at a time in O(1)
+
+    Produces the same values as `compute_indicators` for the last bar. A bar
+    with the same timestamp as the previous one replaces it, which is how a
+    still-forming daily or intraday bar gets revised.
+    """
+
+    def __init__(self):
+        self.first_ts = None
+        self.last_ts = None
+        self.n = 0
+        self.closes = deque(maxlen=MA_LONG)
+        self.prev_close = math.nan
+        self.ema_fast = self.ema_slow = self.macd_signal = math.nan
+        self.gain = self.loss = self.atr = math.nan
+        self._before_last = None
+
+    def _snapshot(self):
+        snap = dict(self.__dict__)
+        snap["closes"] = deque(self.closes, maxlen=MA_LONG)
+        snap.pop("_before_last")
+        return snap
+
+    @classmethod
+    def from_history(cls, df):
+        """Seed state from a frame with one vectorized pass over its bars"""
+        state = cls()
+        if len(df) == 0:
+            return state
+        raw = _raw(df)
+        closes = df["Close"].to_numpy(dtype=float)
+        if len(df) > 1:
+            i = len(df) - 2
+            state.first_ts = df.index[0]
+            state.last_ts = df.index[i]
+            state.n = i + 1
+            state.closes.extend(closes[max(0, i + 1 - MA_LONG):i + 1])
+            state.prev_close = closes[i]
+            row = raw.iloc[i]
+            state.ema_fast, state.ema_slow = row["EMA12"], row["EMA26"]
+            state.macd_signal = row["MACD_signal"]
+            state.gain, state.loss, state.atr = row["_gain"], row["_loss"], row["_atr"]
+        last = df.iloc[-1]
+        state.update(df.index[-1], last["High"], last["Low"], last["Close"])
+        state.first_ts = df.index[0]
+        return state
+
+    def update(self, ts, high, low, close):
+        """Absorb one bar (or revise the latest one if `ts` repeats)"""
+        if self.last_ts is not None and ts == self.last_ts:
+            self.__dict__.update(self._before_last)
+            self.closes = deque(self._before_last["closes"], maxlen=MA_LONG)
+        elif self.last_ts is not None and ts < self.last_ts:
+            raise ValueError(f"bar at {ts} is older than the latest bar {self.last_ts}")
+        before = self._snapshot()
+
+        high, low, close = float(high), float(low), float(close)
+        prev = self.prev_close
+        if self.n == 0:
+            self.first_ts = ts
+            self.ema_fast = self.ema_slow = close
+            self.macd_signal = 0.0
+            self.atr = high - low
+        else:
+            a_fast, a_slow, a_sig = _alpha(EMA_FAST), _alpha(EMA_SLOW), _alpha(MACD_SIGNAL)
+            self.ema_fast += a_fast * (close - self.ema_fast)
+            self.ema_slow += a_slow * (close - self.ema_slow)
+            self.macd_signal += a_sig * ((self.ema_fast - self.ema_slow) - self.macd_signal)
+
+            change = close - prev
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            if self.n == 1:
+                self.gain, self.loss = gain, loss
+            else:
+                self.gain += (gain - self.gain) / RSI_PERIOD
+                self.loss += (loss - self.loss) / RSI_PERIOD
+
+            true_range = max(high - low, abs(high - prev), abs(low - prev))
+            self.atr += (true_range - self.atr) / ATR_PERIOD
+
+        self.closes.append(close)
+        self.prev_close = close
+        self.n += 1
+        self.last_ts = ts
+        self._before_last = before
+
+    def values(self):
+        """Latest indicator values, NaN where there is not enough history yet"""
+        closes = self.closes
+        n = self.n
+        nan = math.nan
+
+        def sma(window):
+            if n < window:
+                return nan
+            return sum(closes[i] for i in range(len(closes) - window, len(closes))) / window
+
+        bb_mid = sma(BB_PERIOD)
+        if n >= BB_PERIOD:
+            window = [closes[i] for i in range(len(closes) - BB_PERIOD, len(closes))]
+            std = math.sqrt(sum((c - bb_mid) ** 2 for c in window) / BB_PERIOD)
+        else:
+            std = nan
+        macd = self.ema_fast - self.ema_slow if n else nan
+        if n > RSI_PERIOD:
+            rsi = float(_rsi(np.float64(self.gain), np.float64(self.loss)))
+        else:
+            rsi = nan
+        return {
+            "MA10": sma(MA_SHORT),
+            "MA50": sma(MA_LONG),
+            "EMA12": self.ema_fast if n else nan,
+            "EMA26": self.ema_slow if n else nan,
+            "RSI14": rsi,
+            "MACD": macd,
+            "MACD_signal": self.macd_signal if n else nan,
+            "MACD_hist": macd - self.macd_signal if n else nan,
+            "BB_mid": bb_mid,
+            "BB_upper": bb_mid + BB_WIDTH * std,
+            "BB_lower": bb_mid - BB_WIDTH * std,
+            "ATR14": self.atr if n >= ATR_PERIOD else nan,
+        }
+
+
+# Per-key state shared by every session in the process, least recently
+# used first; the oldest is dropped beyond MAX_STATES
+MAX_STATES = 512
+_states = OrderedDict()
+_states_lock = threading.Lock()
+
+
+def latest_indicators(key, df):
+    """Indicator values for the last bar of `df`, updating `key`'s state
+
+    Only bars at or after the state's latest timestamp are applied, found
+    by binary search, so a rerun or a new bar costs O(1). The state is
+    rebuilt with one vectorized pass when `df` starts at a different bar
+    than the state (the EMAs and averages are seeded from the first bar) or
+    does not continue it. Pass a frame whose first bar stays put, like a
+    symbol's whole stored history, so daily updates stay incremental.
+    """
+    with _states_lock:
+        state = _states.get(key)
+        if state is not None and state.n and len(df):
+            resume = df.index.searchsorted(state.last_ts)
+        rebuild = (
+            state is None
+            or state.n == 0
+            or len(df) == 0
+            or df.index[0] != state.first_ts
+            or resume == len(df)
+            or df.index[resume] != state.last_ts
+        )
+        if rebuild:
+            state = _states[key] = IndicatorState.from_history(df)
+            while len(_states) > MAX_STATES:
+                _states.popitem(last=False)
+        else:
+            newer = df.iloc[resume:]
+            for ts, high, low, close in zip(newer.index, newer["High"], newer["Low"], newer["Close"]):
+                state.update(ts, high, low, close)
+        _states.move_to_end(key)
+        return state.values()
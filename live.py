@@ -0,0 +1,110 @@
+import time
+import threading
+from datetime import datetime
+
+from indicators import latest_indicators
+from prefetch import IST, market_is_open
+from price_store import merge_bars
+from providers import get_provider
+from upstream import RateLimited, call
+
+# Intraday polling for live mode. One poller thread per (symbol, interval) is
+# shared by every session watching it, so 50 viewers cost one upstream poll.
+
+POLL_SECONDS = {"1m": 30, "5m": 60}
+# Pollers with no viewer for this long stop and release their bars
+IDLE_TIMEOUT = 300
+# Enough history to show the previous session's close on the first poll
+INITIAL_PERIOD = "5d"
+
+
+class LivePoller(threading.Thread):
+    """Polls one symbol's intraday bars, fetching only bars newer than the last"""
+
+    def __init__(self, symbol, interval):
+        super().__init__(name=f"live-{symbol}-{interval}", daemon=True)
+        self.symbol = symbol
+        self.interval = interval
+        self.bars = None
+        self.indicators = {}
+        self.version = 0
+        self.error = None
+        self.last_poll = None
+        self.last_viewed = time.time()
+        self._lock = threading.Lock()
+
+    def poll(self):
+        provider = get_provider()
+        if self.bars is None or self.bars.empty:
+            new = call(("intraday", self.symbol, self.interval, INITIAL_PERIOD),
+                       lambda: provider.history(self.symbol, period=INITIAL_PERIOD, interval=self.interval),
+                       limited=provider.rate_limited)
+        else:
+            # Re-request from the last bar so a still-forming bar is revised
+            since = self.bars.index[-1]
+            new = call(("intraday", self.symbol, self.interval, str(since)),
+                       lambda: provider.history(self.symbol, start=since, interval=self.interval),
+                       limited=provider.rate_limited)
+            new = new[new.index >= since]
+        self.last_poll = datetime.now(IST)
+        if new.empty:
+            return
+        bars = merge_bars(self.bars, new)
+        indicators = latest_indicators((self.symbol, self.interval), bars)
+        with self._lock:
+            self.bars = bars
+            self.indicators = indicators
+            self.version += 1
+            self.error = None
+
+    def run(self):
+        first = True
+        while time.time() - self.last_viewed < IDLE_TIMEOUT:
+            if first or market_is_open(datetime.now(IST)):
+                try:
+                    self.poll()
+                    first = False
+                except RateLimited as e:
+                    self.error = str(e)
+                except Exception as e:
+                    self.error = str(e)
+                    first = False
+            time.sleep(POLL_SECONDS[self.interval])
+        _forget(self)
+
+    def snapshot(self):
+        """(version, bars, indicators) for a viewer; also keeps the poller alive"""
+        self.last_viewed = time.time()
+        with self._lock:
+            return self.version, self.bars, self.indicators
+
+
+_pollers = {}
+_pollers_lock = threading.Lock()
+
+
+def _forget(poller):
+    with _pollers_lock:
+        if _pollers.get((poller.symbol, poller.interval)) is poller:
+            del _pollers[(poller.symbol, poller.interval)]
+
+
+def get_poller(symbol, interval="1m"):
+    """The shared poller for a symbol and interval, started on first use"""
+    with _pollers_lock:
+        poller = _pollers.get((symbol, interval))
+        if poller is None or not poller.is_alive():
+            poller = _pollers[(symbol, interval)] = LivePoller(symbol, interval)
+            poller.start()
+        poller.last_viewed = time.time()
+        return poller
+
+
+def last_session(bars):
+    """Split intraday bars into (latest session, previous session close)"""
+    days = bars.index.normalize()
+    latest = days[-1]
+    session = bars[days == latest]
+    earlier = bars[days < latest]
+    prev_close = earlier['Close'].iloc[-1] if len(earlier) else session['Open'].iloc[0]
+    return session, prev_close
@@ -0,0 +1,205 @@
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from stocks import SECTOR_OF
+
+# Cross-sectional market view over one aligned date x symbol panel of
+# float32 closes: rolling correlations, sector returns and relative strength.
+
+# Return horizons in trading days
+HORIZONS = {"1W": 5, "1M": 21, "3M": 63, "6M": 126, "1Y": 250}
+# Relative strength is measured over this horizon
+RS_HORIZON = "3M"
+UNKNOWN_SECTOR = "Other"
+
+
+class Panel(NamedTuple):
+    """Closes aligned on the union of trading dates, forward-filled"""
+    dates: pd.DatetimeIndex
+    symbols: list
+    close: np.ndarray  # (dates, symbols) float32, NaN before a listing
+
+    def returns(self):
+        """Daily log returns, 0 where a symbol has no bar yet"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = np.diff(np.log(self.close), axis=0)
+        return np.nan_to_num(r, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def build_panel(frames):
+    """One float32 panel from {symbol: daily OHLCV frame}"""
+    closes = {symbol: df['Close'] for symbol, df in frames.items() if df is not None and not df.empty}
+    if not closes:
+        return Panel(pd.DatetimeIndex([]), [], np.empty((0, 0), dtype=np.float32))
+    # One concat aligns every column; dates are normalised once afterwards
+    aligned = pd.concat(closes.values(), axis=1, keys=list(closes))
+    if aligned.index.tz is not None:
+        aligned.index = aligned.index.tz_localize(None)
+    aligned.index = aligned.index.normalize()
+    aligned = aligned.sort_index().ffill()
+    close = aligned.to_numpy(dtype=np.float32)
+    close.flags.writeable = False  # panels are shared between sessions
+    return Panel(aligned.index, list(closes), close)
+
+
+class RollingCorrelation:
+    """Correlation of the last `window` return rows, updated one bar at a time
+
+    Keeps the column sums and the Gram matrix of the rows in the window, so a
+    new bar costs one rank-1 update and one downdate (O(symbols^2)) instead
+    of recomputing over the whole window. Sums are re-derived from the
+    buffered rows every `window` updates to stop float drift.
+    """
+
+    def __init__(self, rows):
+        self.window = len(rows)
+        self._rows = np.array(rows, dtype=np.float32)
+        self._head = 0  # index of the oldest row in the ring buffer
+        self._updates = 0
+        self._recompute()
+
+    def _recompute(self):
+        rows = self._rows.astype(np.float64)
+        self._sum = rows.sum(axis=0)
+        self._gram = rows.T @ rows
+        self._updates = 0
+
+    def push(self, row):
+        """Slide the window forward by one bar"""
+        row = np.asarray(row, dtype=np.float32)
+        old = self._rows[self._head].astype(np.float64)
+        new = row.astype(np.float64)
+        self._rows[self._head] = row
+        self._head = (self._head + 1) % self.window
+        self._sum += new - old
+        self._gram += np.outer(new, new) - np.outer(old, old)
+        self._bump()
+
+    def revise_last(self, row):
+        """Replace the newest row (a revised in-progress bar)"""
+        last = (self._head - 1) % self.window
+        row = np.asarray(row, dtype=np.float32)
+        old = self._rows[last].astype(np.float64)
+        new = row.astype(np.float64)
+        self._rows[last] = row
+        self._sum += new - old
+        self._gram += np.outer(new, new) - np.outer(old, old)
+        self._bump()
+
+    def last_row(self):
+        return self._rows[(self._head - 1) % self.window]
+
+    def _bump(self):
+        self._updates += 1
+        if self._updates >= self.window:
+            self._recompute()
+
+    def matrix(self):
+        """Pearson correlation matrix (NaN for flat columns) as float32"""
+        n = self.window
+        mean = self._sum / n
+        cov = self._gram / n - np.outer(mean, mean)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, 1.0)
+        return np.clip(corr, -1, 1).astype(np.float32)
+
+
+_states = {}  # (symbols, window) -> (last date, RollingCorrelation)
+_states_lock = threading.Lock()
+
+
+def rolling_correlation(panel, window):
+    """Correlation over the last `window` bars of `panel`, updated incrementally
+
+    The process keeps one RollingCorrelation per (symbols, window): when the
+    panel has grown by a few bars since the last call only those bars are
+    pushed, and a changed last bar is revised in place. Anything else (a new
+    symbol set, a gap longer than the window) rebuilds from the panel.
+    """
+    returns = panel.returns()
+    window = min(window, len(returns))
+    if window < 2:
+        return np.full((len(panel.symbols),) * 2, np.nan, dtype=np.float32)
+    key = (tuple(panel.symbols), window)
+
+    with _states_lock:
+        state = _states.get(key)
+        rolling = None
+        if state is not None:
+            last_date, rolling = state
+            pos = panel.dates.get_indexer([last_date])[0] - 1  # row of last_date in returns
+            if pos < 0 or len(returns) - 1 - pos > window:
+                rolling = None
+            else:
+                with metrics.span("market.correlation.update"):
+                    if not np.array_equal(returns[pos], rolling.last_row()):
+                        rolling.revise_last(returns[pos])
+                    for row in returns[pos + 1:]:
+                        rolling.push(row)
+        if rolling is None:
+            with metrics.span("market.correlation.rebuild"):
+                rolling = RollingCorrelation(returns[-window:])
+        _states[key] = (panel.dates[-1], rolling)
+        return rolling.matrix()
+
+
+def window_return(panel, bars):
+    """Log return of each symbol over the last `bars` bars (NaN if not listed then)"""
+    if len(panel.dates) <= bars:
+        return np.full(len(panel.symbols), np.nan, dtype=np.float32)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.log(panel.close[-1] / panel.close[-1 - bars])
+
+
+def sector_returns(panel):
+    """Equal-weight % return of each sector over every horizon in HORIZONS"""
+    sectors = [SECTOR_OF.get(s, UNKNOWN_SECTOR) for s in panel.symbols]
+    table = {}
+    for label, bars in HORIZONS.items():
+        pct = np.expm1(window_return(panel, bars)) * 100
+        table[label] = pd.Series(pct, index=panel.symbols).groupby(sectors).mean()
+    out = pd.DataFrame(table)
+    out.index.name = "Sector"
+    out["Stocks"] = pd.Series(sectors).value_counts()
+    return out.sort_values(RS_HORIZON, ascending=False)
+
+
+def relative_strength(panel, horizon=RS_HORIZON):
+    """Each stock's return against the median stock of the universe, ranked
+
+    RS is (1 + stock return) / (1 + median stock return) - 1 over `horizon`;
+    Percentile is the stock's rank within the universe.
+    """
+    log_ret = window_return(panel, HORIZONS[horizon])
+    pct = np.expm1(log_ret) * 100
+    benchmark = np.nanmedian(pct)
+    out = pd.DataFrame({
+        "Symbol": panel.symbols,
+        "Sector": [SECTOR_OF.get(s, UNKNOWN_SECTOR) for s in panel.symbols],
+        f"Return {horizon} %": pct,
+        "RS %": ((1 + pct / 100) / (1 + benchmark / 100) - 1) * 100,
+    }).dropna()
+    out["Percentile"] = out["RS %"].rank(pct=True) * 100
+    return out.sort_values("RS %", ascending=False).reset_index(drop=True)
+
+
+def sector_correlation(corr, symbols):
+    """Average pairwise correlation between (and within) sectors"""
+    sectors = np.array([SECTOR_OF.get(s, UNKNOWN_SECTOR) for s in symbols])
+    names = sorted(set(sectors))
+    # One-hot membership turns the block averages into two matrix products
+    member = (sectors[:, None] == np.array(names)[None, :]).astype(np.float32)
+    c = np.nan_to_num(corr, nan=0.0)
+    np.fill_diagonal(c, 0.0)
+    sums = member.T @ c @ member
+    counts = member.sum(axis=0)
+    pairs = np.outer(counts, counts) - np.diag(counts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg = sums / pairs
+    return pd.DataFrame(avg, index=names, columns=names)
@@ -0,0 +1,211 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Process-wide timing spans and counters, rendered in the Prometheus text
+# format. Every Streamlit session shares one registry, like the limiter.
+# Set MARKETSENSE_METRICS=0 to turn all of it into no-ops.
+ENABLED = os.environ.get("MARKETSENSE_METRICS", "1") != "0"
+# When set, the Streamlit process also serves /metrics on this port
+METRICS_PORT = os.environ.get("MARKETSENSE_METRICS_PORT")
+# Loopback only by default, like api.py --host; 0.0.0.0 exposes it to the network
+METRICS_HOST = os.environ.get("MARKETSENSE_METRICS_HOST", "127.0.0.1")
+
+PREFIX = "marketsense_"
+# Histogram buckets for span durations, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Spans kept per thread for the in-app debug panel
+TRACE_LIMIT = 200
+# Main-page latency budgets, from the start of the script run: the first
+# paint of a cold start and a whole landing-page rerun. Checked by the debug
+# panel and `bench.py --startup`.
+FIRST_PAINT_BUDGET_MS = float(os.environ.get("MARKETSENSE_FIRST_PAINT_BUDGET_MS", 300))
+IDLE_RERUN_BUDGET_MS = float(os.environ.get("MARKETSENSE_IDLE_RERUN_BUDGET_MS", 50))
+
+HELP = {
+    "stage_seconds": "Time spent in each instrumented stage",
+    "cache_hits_total": "Cache lookups served from the cache",
+    "cache_misses_total": "Cache lookups that had to compute or fetch",
+    "cache_evictions_total": "Entries evicted from a bounded cache",
+    "upstream_calls_total": "Requests sent to Yahoo",
+    "upstream_rate_limited_total": "Yahoo calls refused by the limiter or answered with HTTP 429",
+    "errors_total": "Failures by where they happened",
+}
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Registry:
+    """Counters and span-duration histograms keyed by name and labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.timings = {}   # stage -> [bucket counts..., +Inf count, sum]
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            series = self.timings.get(stage)
+            if series is None:
+                series = self.timings[stage] = [0] * (len(BUCKETS) + 1) + [0.0]
+            series[bisect_left(BUCKETS, seconds)] += 1
+            series[-1] += seconds
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def snapshot(self):
+        """Copies of the counters and per-stage (count, total seconds)"""
+        with self._lock:
+            counters = dict(self.counters)
+            timings = {stage: (sum(s[:-1]), s[-1]) for stage, s in self.timings.items()}
+        return counters, timings
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            timings = sorted((stage, list(s)) for stage, s in self.timings.items())
+
+        lines = []
+        name = PREFIX + "stage_seconds"
+        lines += [f"# HELP {name} {HELP['stage_seconds']}", f"# TYPE {name} histogram"]
+        for stage, series in timings:
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {series[-1]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+
+        seen = set()
+        for (short, labels), value in counters:
+            name = PREFIX + short
+            if name not in seen:
+                seen.add(name)
+                if short in HELP:
+                    lines.append(f"# HELP {name} {HELP[short]}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_label_text(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+_local = threading.local()
+
+
+class _Span:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+_NOOP = nullcontext()
+
+
+class Stopwatch:
+    """Sequential spans: each `lap(stage)` records the time since the last lap"""
+
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        record(stage, now - self._last)
+        self._last = now
+
+
+class _NoopStopwatch:
+    def lap(self, stage):
+        pass
+
+
+_NOOP_STOPWATCH = _NoopStopwatch()
+
+
+def stopwatch():
+    return Stopwatch() if ENABLED else _NOOP_STOPWATCH
+
+
+def span(stage):
+    """Context manager timing one stage into the `stage_seconds` histogram"""
+    return _Span(stage) if ENABLED else _NOOP
+
+
+def record(stage, seconds):
+    """Record an already measured duration as if it were a span"""
+    if not ENABLED:
+        return
+    registry.observe(stage, seconds)
+    trace = getattr(_local, "trace", None)
+    if trace is not None and len(trace) < TRACE_LIMIT:
+        trace.append((stage, seconds))
+
+
+def inc(name, value=1, **labels):
+    if ENABLED:
+        registry.inc(name, value, **labels)
+
+
+def start_trace():
+    """Start collecting this thread's spans (one Streamlit script run)"""
+    _local.trace = [] if ENABLED else None
+
+
+def current_trace():
+    """(stage, seconds) spans recorded on this thread since `start_trace`"""
+    return list(getattr(_local, "trace", None) or ())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def ensure_server():
+    """Serve /metrics on METRICS_HOST from this process if MARKETSENSE_METRICS_PORT is set"""
+    global _server
+    if not (ENABLED and METRICS_PORT):
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((METRICS_HOST, int(METRICS_PORT)), _Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
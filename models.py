@@ -0,0 +1,266 @@
+import os
+import pickle
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from forecast import fit_trend
+from indicators import compute_indicators
+from price_store import STORE_DIR, resolve, share
+
+# Pluggable price forecasters. Fitted models are pickled per
+# (period, model, symbol) together with the bar they were trained through
+# and reused until a new or revised bar arrives, so serving a prediction is
+# a cache lookup rather than a refit.
+MODEL_DIR = os.path.join(STORE_DIR, "models")
+
+
+class Forecaster:
+    """A price model fitted on one daily OHLCV frame
+
+    Subclasses set `name` and `label` and implement `fit(df)`, returning
+    self, and `predict(predict_days)`, which takes a horizon in trading days
+    (scalar or 1-D array) and returns the forecast price(s).
+    """
+    name = None
+    label = None
+
+    def fit(self, df):
+        raise NotImplementedError
+
+    def predict(self, predict_days):
+        raise NotImplementedError
+
+
+class LinearTrend(Forecaster):
+    """Least-squares line through the closes of the whole window"""
+    name = "trend"
+    label = "Linear Trend"
+
+    def fit(self, df):
+        self.trend = fit_trend(df['Close'].to_numpy())
+        return self
+
+    @classmethod
+    def from_fit(cls, trend):
+        """A fitted model around an existing forecast.TrendFit"""
+        model = cls()
+        model.trend = trend
+        return model
+
+    def predict(self, predict_days):
+        return self.trend.predict(predict_days)
+
+
+# Ridge is fitted directly for each of these horizons (trading days) and
+# interpolated in between
+RIDGE_HORIZONS = (1, 5, 10, 21, 42, 63, 90)
+RIDGE_ALPHA = 10.0
+
+
+def ridge_features(df):
+    """Lagged log returns and indicator features, one row per bar"""
+    close = df['Close']
+    log_close = np.log(close)
+    ind = compute_indicators(df)
+    features = {f"ret{k}": log_close.diff(k) for k in (1, 2, 5, 10, 21)}
+    features["rsi"] = ind['RSI14'] / 100 - 0.5
+    features["macd"] = ind['MACD_hist'] / close
+    features["ma50"] = close / ind['MA50'] - 1
+    features["bb"] = (close - ind['BB_mid']) / (ind['BB_upper'] - ind['BB_lower'])
+    features["atr"] = ind['ATR14'] / close
+    return pd.DataFrame(features, index=df.index)
+
+
+class RidgeReturns(Forecaster):
+    """Ridge regression of forward log returns on lagged returns and indicators
+
+    One closed-form ridge solve per horizon in RIDGE_HORIZONS; features with
+    too little history for the window (e.g. MA50 on 1mo) are dropped.
+    """
+    name = "ridge"
+    label = "Ridge (returns + indicators)"
+
+    def fit(self, df):
+        x = ridge_features(df).to_numpy()
+        y = np.log(df['Close'].to_numpy())
+        self.last_close = float(df['Close'].iloc[-1])
+        self.columns = np.isfinite(x).sum(axis=0) >= 30
+        x = x[:, self.columns]
+        rows = np.isfinite(x).all(axis=1)
+        self.horizons, self.returns = [0], [0.0]
+        if not self.columns.any() or rows.sum() < 2:
+            return self
+
+        self.mean = x[rows].mean(axis=0)
+        self.std = x[rows].std(axis=0)
+        self.std[self.std == 0] = 1.0
+        z = (x - self.mean) / self.std
+        last = np.nan_to_num(z[-1])  # NaN feature on the last bar -> its mean
+
+        n, k = z.shape
+        for h in RIDGE_HORIZONS:
+            train = rows[:n - h].copy()
+            if train.sum() < 3 * k:
+                break
+            zh = z[:n - h][train]
+            target = (y[h:] - y[:n - h])[train]
+            intercept = target.mean()
+            w = np.linalg.solve(zh.T @ zh + RIDGE_ALPHA * np.eye(k), zh.T @ (target - intercept))
+            self.horizons.append(h)
+            self.returns.append(float(intercept + last @ w))
+        return self
+
+    def predict(self, predict_days):
+        days = np.asarray(predict_days, dtype=np.float64)
+        longest = self.horizons[-1]
+        log_return = np.interp(days, self.horizons, self.returns)
+        if longest:
+            # Past the longest fitted horizon, extend its per-day drift
+            log_return = np.where(days > longest, self.returns[-1] * days / longest, log_return)
+        price = self.last_close * np.exp(log_return)
+        return price if price.ndim else float(price)
+
+
+# Damped Holt smoothing: grid of level/trend weights, best one-step SSE wins
+HOLT_ALPHAS = np.linspace(0.05, 0.95, 10)
+HOLT_BETAS = np.linspace(0.02, 0.5, 8)
+HOLT_PHI = 0.98
+
+
+class HoltSmoothing(Forecaster):
+    """Exponential smoothing with a damped trend on log prices"""
+    name = "holt"
+    label = "Exponential Smoothing (Holt)"
+
+    def fit(self, df):
+        y = np.log(df['Close'].to_numpy(dtype=np.float64))
+        alpha, beta = (g.ravel() for g in np.meshgrid(HOLT_ALPHAS, HOLT_BETAS))
+        if len(y) < 3:
+            self.level, self.trend, self.alpha, self.beta = y[-1], 0.0, np.nan, np.nan
+            return self
+
+        # All parameter pairs run through the series together, one vector per step
+        level = np.full(alpha.shape, y[0])
+        trend = np.full(alpha.shape, y[1] - y[0])
+        sse = np.zeros(alpha.shape)
+        for value in y[1:]:
+            forecast = level + HOLT_PHI * trend
+            err = value - forecast
+            sse += err * err
+            level = forecast + alpha * err
+            trend = HOLT_PHI * trend + alpha * beta * err
+
+        best = int(np.argmin(sse))
+        self.level, self.trend = float(level[best]), float(trend[best])
+        self.alpha, self.beta = float(alpha[best]), float(beta[best])
+        return self
+
+    def predict(self, predict_days):
+        days = np.asarray(predict_days, dtype=np.float64)
+        damped = HOLT_PHI * (1 - HOLT_PHI ** days) / (1 - HOLT_PHI)
+        price = np.exp(self.level + self.trend * damped)
+        return price if price.ndim else float(price)
+
+
+MODELS = {cls.name: cls for cls in (LinearTrend, RidgeReturns, HoltSmoothing)}
+
+
+def data_stamp(df):
+    """Identity of the bars a model is trained on: last bar, its close, count"""
+    return (df.index[-1].isoformat(), float(df['Close'].iloc[-1]), len(df))
+
+
+def _path(symbol, period, name):
+    return os.path.join(MODEL_DIR, period, name, f"{quote(symbol, safe='')}.pkl")
+
+
+def _read(symbol, period, name):
+    try:
+        with open(_path(symbol, period, name), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def _write(symbol, period, name, stamp, model):
+    path = _path(symbol, period, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((stamp, model), f)
+    os.replace(tmp, path)
+
+
+_memory = {}  # (symbol, period, name) -> (stamp, model)
+_memory_lock = threading.Lock()
+
+
+def get_model(symbol, period, name, df):
+    """The `name` model fitted on `df`, from memory or disk unless a new bar arrived"""
+    stamp = data_stamp(df)
+    key = (symbol, period, name)
+    with _memory_lock:
+        entry = _memory.get(key)
+    if entry is not None and entry[0] == stamp:
+        metrics.inc("cache_hits_total", cache="models", tier="memory")
+        return entry[1]
+
+    entry = _read(symbol, period, name)
+    if entry is not None and entry[0] == stamp:
+        metrics.inc("cache_hits_total", cache="models", tier="disk")
+    else:
+        metrics.inc("cache_misses_total", cache="models")
+        with metrics.span(f"models.fit.{name}"):
+            entry = (stamp, MODELS[name]().fit(df))
+        _write(symbol, period, name, *entry)
+    with _memory_lock:
+        _memory[key] = entry
+    return entry[1]
+
+
+def _retrain_job(job):
+    symbol, period, frame, names = job
+    df = resolve(frame)
+    stamp = data_stamp(df)
+    for name in names:
+        _write(symbol, period, name, stamp, MODELS[name]().fit(df))
+    return symbol
+
+
+def retrain(frames, period, names=None, workers=None):
+    """Refit every model for each {symbol: df} frame that has new bars
+
+    Fits run across a spawn-context process pool (`workers=1` runs
+    in-process) and are written to disk, where `get_model` picks them up.
+    Returns the number of symbols refitted.
+    """
+    names = list(names or MODELS)
+    jobs = []
+    for symbol, df in frames.items():
+        if df is None or len(df) < 2:
+            continue
+        stamp = data_stamp(df)
+        stale = [n for n in names if (_read(symbol, period, n) or (None,))[0] != stamp]
+        if stale:
+            jobs.append((symbol, period, share(symbol, df), stale))
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    with metrics.span("models.retrain"):
+        if workers > 1 and len(jobs) > 1:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                done = list(pool.map(_retrain_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        else:
+            done = [_retrain_job(job) for job in jobs]
+
+    with _memory_lock:
+        for symbol in done:
+            for name in names:
+                _memory.pop((symbol, period, name), None)
+    return len(done)
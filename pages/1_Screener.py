@@ -0,0 +1,63 @@
+import time
+
+import streamlit as st
+
+from screener import screen
+from stocks import ALL_STOCKS
+import metrics
+import prefetch
+
+st.set_page_config(page_title="Screener · MarketSense AI", page_icon="📈", layout="wide")
+prefetch.ensure_started()
+metrics.ensure_server()
+
+
+@st.cache_data(ttl=600)  # Cache for 10 minutes
+def get_screener_table(symbols, period, predict_days):
+    """Screener table for a tuple of symbols, cached like single-stock data"""
+    return screen(list(symbols), period, predict_days)
+
+
+st.title("📋 Stock Screener")
+st.caption("Every stock in the catalog, side by side. Click a column header to sort.")
+
+with st.sidebar:
+    st.header("⚙️ Settings")
+    period = st.selectbox("Historical Period",
+                          ["1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"],
+                          index=3)
+    predict_days = st.slider("Predict Days Ahead", 7, 90, 30)
+    run_btn = st.button("🔎 RUN SCREENER", type="primary", use_container_width=True)
+
+names = {}
+for name, symbol in ALL_STOCKS.items():
+    names.setdefault(symbol, name)
+symbols = tuple(sorted(names))
+
+if run_btn:
+    started = time.perf_counter()
+    with st.spinner(f"📊 Screening {len(symbols)} stocks..."):
+        table = get_screener_table(symbols, period, predict_days)
+    elapsed = time.perf_counter() - started
+
+    table.insert(0, "Company", table["Symbol"].map(names))
+    st.success(f"✅ Screened {len(table)} of {len(symbols)} stocks in {elapsed:.1f}s")
+    st.dataframe(
+        table,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Price": st.column_config.NumberColumn(format="₹%.2f"),
+            "52W High": st.column_config.NumberColumn(format="₹%.2f"),
+            "52W Low": st.column_config.NumberColumn(format="₹%.2f"),
+            "Change %": st.column_config.NumberColumn(format="%+.2f%%"),
+            "vs MA10 %": st.column_config.NumberColumn(format="%+.2f%%"),
+            "vs MA50 %": st.column_config.NumberColumn(format="%+.2f%%"),
+            "Predicted %": st.column_config.NumberColumn(format="%+.2f%%"),
+        },
+    )
+    missing = sorted(set(symbols) - set(table["Symbol"]))
+    if missing:
+        st.warning(f"⚠️ No data for {len(missing)} symbols: {', '.join(missing)}")
+else:
+    st.info("👈 Choose a period and click 'RUN SCREENER' to rank all stocks")
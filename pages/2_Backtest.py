@@ -0,0 +1,65 @@
+import time
+
+import streamlit as st
+
+from backtest import backtest
+from price_store import load_many
+from stocks import ALL_STOCKS
+import metrics
+import prefetch
+
+st.set_page_config(page_title="Backtest · MarketSense AI", page_icon="📈", layout="wide")
+prefetch.ensure_started()
+metrics.ensure_server()
+
+
+@st.cache_data(ttl=600)  # Cache for 10 minutes
+def run_backtest(symbols, period, lookback, predict_days):
+    """Walk-forward backtest of the recommendation rule over a tuple of symbols"""
+    frames = load_many(list(symbols), period)
+    summary, equity = backtest(frames, lookback, predict_days)
+    return summary, equity, len(frames)
+
+
+st.title("🧪 Recommendation Backtest")
+st.caption("Replays the linear-trend prediction walk-forward across every date and every stock, "
+           "then measures how each signal actually played out.")
+
+with st.sidebar:
+    st.header("⚙️ Settings")
+    period = st.selectbox("Historical Period", ["1y", "2y", "5y", "10y", "max"], index=2)
+    lookback = st.slider("Trend Window (trading days)", 20, 500, 250,
+                         help="Bars in each regression, ~250 matches the 1y analysis period")
+    predict_days = st.slider("Predict Days Ahead", 7, 90, 30)
+    run_btn = st.button("🧪 RUN BACKTEST", type="primary", use_container_width=True)
+
+symbols = tuple(sorted(set(ALL_STOCKS.values())))
+
+if run_btn:
+    started = time.perf_counter()
+    with st.spinner(f"📊 Backtesting {len(symbols)} stocks..."):
+        summary, equity, loaded = run_backtest(symbols, period, lookback, predict_days)
+    elapsed = time.perf_counter() - started
+
+    st.success(f"✅ Backtested {loaded} stocks in {elapsed:.1f}s")
+
+    st.subheader("📊 Results by Signal")
+    st.dataframe(
+        summary,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Hit Rate %": st.column_config.NumberColumn(format="%.1f%%"),
+            "Avg Forward Return %": st.column_config.NumberColumn(format="%+.2f%%"),
+            "Strategy Return %": st.column_config.NumberColumn(format="%+.1f%%"),
+            "Max Drawdown %": st.column_config.NumberColumn(format="%.1f%%"),
+        },
+    )
+    st.caption(f"Hit: price moved the predicted way after {predict_days} days "
+               "(for HOLD, stayed within ±5%). Strategy: equal-weight daily position "
+               "in every stock carrying the signal, short for SELL.")
+
+    st.subheader("📈 Strategy Equity by Signal")
+    st.line_chart(equity, use_container_width=True)
+else:
+    st.info("👈 Choose the backtest window and click 'RUN BACKTEST'")
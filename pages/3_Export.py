@@ -0,0 +1,57 @@
+import streamlit as st
+
+from export import FORMATS, zip_bytes
+from stocks import ALL_STOCKS, NIFTY_50
+import metrics
+import prefetch
+
+st.set_page_config(page_title="Export · MarketSense AI", page_icon="📈", layout="wide")
+prefetch.ensure_started()
+metrics.ensure_server()
+
+st.title("📦 Bulk Export")
+st.caption("Full price history for a watchlist or the whole universe, "
+           "one CSV or Parquet file per stock inside a zip.")
+
+with st.sidebar:
+    st.header("⚙️ Settings")
+    universe = st.radio("Stocks", ["NIFTY 50", "All Stocks", "Custom Watchlist"])
+    period = st.selectbox("Historical Period", ["1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"], index=5)
+    fmt = st.radio("Format", list(FORMATS), format_func=str.upper, horizontal=True)
+
+if universe == "NIFTY 50":
+    symbols = list(NIFTY_50)
+elif universe == "All Stocks":
+    symbols = list(dict.fromkeys(ALL_STOCKS.values()))
+else:
+    names = st.multiselect("📋 Watchlist", list(ALL_STOCKS.keys()))
+    extra = st.text_input("➕ Extra symbols (comma separated)", placeholder="e.g. ZOMATO.NS, 500325.BO")
+    symbols = [ALL_STOCKS[n] for n in names]
+    symbols += [s.strip().upper() for s in extra.split(",") if s.strip()]
+    symbols = list(dict.fromkeys(symbols))
+
+# Streamlit holds a clicked download in server memory until it is served;
+# beyond this many symbols (or with 10y/max histories) point to the API
+LARGE_EXPORT_SYMBOLS = 100
+
+st.metric("Stocks Selected", len(symbols))
+
+if symbols:
+    # The zip is built only when the button is clicked, with stocks loaded a
+    # batch at a time from the local store
+    st.download_button(
+        f"📥 Download {len(symbols)} × {period} ({fmt.upper()} zip)",
+        lambda: zip_bytes(symbols, period, fmt),
+        f"marketsense_{period}_{fmt}.zip",
+        "application/zip",
+        type="primary",
+        use_container_width=True,
+    )
+    api_hint = ("`python api.py` serves the same archive as a streamed download with flat memory: "
+                f"`/export?universe=all&period={period}&format={fmt}`.")
+    if len(symbols) > LARGE_EXPORT_SYMBOLS or period in ("10y", "max"):
+        st.warning(f"⚠️ This is a large export: the zip is held in memory until it downloads. {api_hint}")
+    else:
+        st.caption(f"For very large exports, {api_hint}")
+else:
+    st.info("👈 Pick at least one stock to export")
@@ -0,0 +1,151 @@
+import time
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from market import (HORIZONS, RS_HORIZON, build_panel, relative_strength, rolling_correlation,
+                    sector_correlation, sector_returns)
+from price_store import load_many
+from stocks import ALL_STOCKS, NIFTY_50, SECTOR_OF
+import alerts
+import metrics
+import prefetch
+
+st.set_page_config(page_title="Market · MarketSense AI", page_icon="📈", layout="wide")
+prefetch.ensure_started()
+metrics.ensure_server()
+
+
+@st.cache_resource(ttl=600)  # Cache for 10 minutes, one read-only panel shared by all sessions
+def load_panel(symbols, period):
+    """Aligned float32 close panel for a tuple of symbols"""
+    return build_panel(load_many(list(symbols), period))
+
+
+def heatmap(df, x_title, y_title, value_title, fmt, scheme="redyellowgreen", domain_mid=0):
+    """Altair heatmap of a DataFrame, rows on y and columns on x"""
+    long = df.rename_axis(index="row", columns="col").stack().rename("value").reset_index()
+    return alt.Chart(long).mark_rect().encode(
+        alt.X("col:N", title=x_title, sort=list(df.columns)),
+        alt.Y("row:N", title=y_title, sort=list(df.index)),
+        alt.Color("value:Q", title=value_title, scale=alt.Scale(scheme=scheme, domainMid=domain_mid)),
+        tooltip=[alt.Tooltip("row:N", title=y_title), alt.Tooltip("col:N", title=x_title),
+                 alt.Tooltip("value:Q", title=value_title, format=fmt)],
+    )
+
+
+st.title("🌐 Market View")
+st.caption("Sector returns, rolling correlations and relative strength across the whole universe, "
+           "from one aligned price panel.")
+
+with st.sidebar:
+    st.header("⚙️ Settings")
+    universe = st.radio("Stocks", ["All Stocks", "NIFTY 50"])
+    period = st.selectbox("Historical Period", ["6mo", "1y", "2y"], index=1)
+    window = st.slider("Correlation Window (trading days)", 20, 250, 60)
+    by_sector = st.toggle("Average correlations by sector", value=True)
+
+if universe == "NIFTY 50":
+    symbols = tuple(NIFTY_50)
+else:
+    symbols = tuple(dict.fromkeys(ALL_STOCKS.values()))
+
+with st.spinner(f"📊 Loading {len(symbols)} stocks..."):
+    panel = load_panel(symbols, period)
+
+if not panel.symbols:
+    st.error("❌ No price data available right now, try again shortly")
+    st.stop()
+
+started = time.perf_counter()
+corr = rolling_correlation(panel, window)
+corr_ms = (time.perf_counter() - started) * 1000
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Stocks", len(panel.symbols))
+with col2:
+    st.metric("Trading Days", len(panel.dates))
+with col3:
+    st.metric("Last Bar", f"{panel.dates[-1]:%d %b %Y}")
+with col4:
+    st.metric("Correlation Update", f"{corr_ms:.1f} ms", f"{len(panel.symbols)}×{len(panel.symbols)}",
+              delta_color="off")
+
+st.divider()
+
+# Sector returns
+st.subheader("🏭 Sector Returns")
+sectors = sector_returns(panel)
+returns_only = sectors[list(HORIZONS)].dropna(axis=1, how="all")
+st.altair_chart(heatmap(returns_only, None, None, "Return %", "+.2f"), use_container_width=True)
+st.dataframe(
+    sectors,
+    use_container_width=True,
+    column_config={h: st.column_config.NumberColumn(format="%+.2f%%") for h in HORIZONS},
+)
+st.caption("Equal-weight average of the stocks in each sector.")
+
+st.divider()
+
+# Correlations
+st.subheader("🔗 Rolling Correlation")
+if by_sector:
+    st.altair_chart(heatmap(sector_correlation(corr, panel.symbols), None, None, "Avg correlation", ".2f",
+                            scheme="blueorange", domain_mid=0), use_container_width=True)
+    st.caption(f"Average pairwise correlation of daily returns over the last {window} trading days; "
+               "the diagonal is the average within each sector.")
+else:
+    order = sorted(range(len(panel.symbols)), key=lambda i: (SECTOR_OF.get(panel.symbols[i], ""), panel.symbols[i]))
+    names = [panel.symbols[i].rsplit(".", 1)[0] for i in order]
+    full = pd.DataFrame(corr[np.ix_(order, order)], index=names, columns=names)
+    chart = heatmap(full, None, None, "Correlation", ".2f", scheme="blueorange").properties(height=900)
+    st.altair_chart(chart.configure_axis(labelFontSize=7), use_container_width=True)
+    st.caption(f"Daily-return correlation over the last {window} trading days, stocks grouped by sector.")
+
+st.divider()
+
+# Relative strength
+st.subheader(f"💪 Relative Strength ({RS_HORIZON})")
+rs = relative_strength(panel)
+rs_config = {
+    f"Return {RS_HORIZON} %": st.column_config.NumberColumn(format="%+.2f%%"),
+    "RS %": st.column_config.NumberColumn(format="%+.2f%%"),
+    "Percentile": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f"),
+}
+if rs.empty:
+    st.info(f"Not enough history for {RS_HORIZON} returns in this period")
+else:
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**🟢 Leaders**")
+        st.dataframe(rs.head(15), use_container_width=True, hide_index=True, column_config=rs_config)
+    with col2:
+        st.markdown("**🔴 Laggards**")
+        st.dataframe(rs.tail(15).iloc[::-1], use_container_width=True, hide_index=True, column_config=rs_config)
+    with st.expander(f"📋 Full ranking ({len(rs)} stocks)"):
+        st.dataframe(rs, use_container_width=True, hide_index=True, column_config=rs_config)
+    st.caption(f"RS: {RS_HORIZON} return relative to the median stock; percentile ranks the whole universe.")
+
+st.divider()
+
+# Alerts raised by the background engine in this server process
+st.subheader("🔔 Alerts")
+if not alerts.ENABLED:
+    st.info("Alerts are off (MARKETSENSE_ALERTS=0)")
+else:
+    engine = alerts.get_engine()
+    recent = [a.to_dict() for a in reversed(engine.recent)]
+    if recent:
+        st.dataframe(pd.DataFrame(recent)[["bar", "symbol", "rule", "value", "threshold"]],
+                     use_container_width=True, hide_index=True)
+    else:
+        st.info("No alerts yet: rules are checked on every background refresh as new bars arrive")
+    with st.expander(f"📜 Rules ({len(engine.rules)})"):
+        st.dataframe(pd.DataFrame({"Rule": engine.rules.names, "Expression": engine.rules.expressions}),
+                     use_container_width=True, hide_index=True)
+        st.caption("Custom rules: MARKETSENSE_ALERT_RULES=rules.txt with 'name = expression' lines, "
+                   f"e.g. 'RSI dip = rsi crosses below 35'. Values: {', '.join(alerts.FEATURES)}. "
+                   "Alerts go to the log and store/alerts.jsonl, and to MARKETSENSE_ALERT_WEBHOOK if set.")
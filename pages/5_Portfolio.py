@@ -0,0 +1,116 @@
+import io
+import time
+
+import altair as alt
+import streamlit as st
+
+from portfolio import VOL_WINDOW, read_holdings, value_portfolio
+import metrics
+import prefetch
+
+st.set_page_config(page_title="Portfolio · MarketSense AI", page_icon="📈", layout="wide")
+prefetch.ensure_started()
+metrics.ensure_server()
+
+SAMPLE_CSV = "symbol,quantity,cost\nTCS.NS,10,3450.50\nINFY,25,1420\nHDFCBANK.NS,40,1585.25\n500325.BO,5,2410\n"
+
+
+@st.cache_data(ttl=600)  # Cache for 10 minutes
+def get_valuation(data, period, predict_days):
+    """Valuation of an uploaded holdings file, cached on its contents"""
+    with metrics.span("portfolio.value"):
+        return value_portfolio(read_holdings(io.BytesIO(data)), period, predict_days)
+
+
+st.title("💼 Portfolio")
+st.caption("Upload your holdings to value every position at once: P&L, weights, risk and the trend "
+           "prediction for each stock.")
+
+with st.sidebar:
+    st.header("⚙️ Settings")
+    period = st.selectbox("Historical Period", ["3mo", "6mo", "1y", "2y", "5y", "10y", "max"], index=2)
+    predict_days = st.slider("Predict Days Ahead", 7, 90, 30)
+    st.download_button("📄 Sample holdings CSV", SAMPLE_CSV, "holdings_sample.csv", "text/csv",
+                       use_container_width=True)
+
+upload = st.file_uploader("📤 Holdings CSV (symbol, quantity, cost)", type=["csv"],
+                          help="Average cost per share. Symbols without .NS / .BO are taken as NSE.")
+
+if upload is None:
+    st.info("👆 Upload a CSV with symbol, quantity and cost columns — download the sample from the sidebar")
+    st.stop()
+
+started = time.perf_counter()
+try:
+    with st.spinner("📊 Valuing holdings..."):
+        valuation = get_valuation(upload.getvalue(), period, predict_days)
+except ValueError as e:
+    st.error(f"❌ {e}")
+    st.stop()
+elapsed = time.perf_counter() - started
+
+table = valuation.holdings
+st.success(f"✅ Valued {len(table)} holdings in {elapsed:.1f}s")
+if valuation.missing:
+    st.warning(f"⚠️ No price data for {len(valuation.missing)} symbols: {', '.join(valuation.missing)}")
+if table.empty:
+    st.stop()
+
+pnl_pct = valuation.pnl / valuation.invested * 100 if valuation.invested else 0.0
+predicted_pct = (valuation.predicted_value / valuation.value - 1) * 100
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    st.metric("Market Value", f"₹{valuation.value:,.0f}",
+              f"₹{valuation.day_change:+,.0f} today")
+with col2:
+    st.metric("Invested", f"₹{valuation.invested:,.0f}")
+with col3:
+    st.metric("P&L", f"₹{valuation.pnl:+,.0f}", f"{pnl_pct:+.2f}%")
+with col4:
+    st.metric("Volatility (annual)", f"{valuation.volatility:.1f}%",
+              help=f"From the covariance of daily returns over the last {VOL_WINDOW} trading days")
+with col5:
+    st.metric(f"Predicted Value ({predict_days}d)", f"₹{valuation.predicted_value:,.0f}",
+              f"{predicted_pct:+.2f}%")
+
+st.divider()
+
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("🥧 Allocation by Sector")
+    sectors = table.groupby("Sector", as_index=False)[["Value", "Weight %"]].sum()
+    st.altair_chart(alt.Chart(sectors).mark_arc(innerRadius=60).encode(
+        alt.Theta("Value:Q"),
+        alt.Color("Sector:N"),
+        tooltip=["Sector", alt.Tooltip("Value:Q", format=",.0f"), alt.Tooltip("Weight %:Q", format=".1f")],
+    ), use_container_width=True)
+with col2:
+    st.subheader("⚖️ Weight vs Risk (top 20)")
+    top = table.head(20).melt(id_vars="Symbol", value_vars=["Weight %", "Risk %"], var_name="Measure")
+    st.altair_chart(alt.Chart(top).mark_bar().encode(
+        alt.X("value:Q", title="%"),
+        alt.Y("Symbol:N", sort=list(table["Symbol"].head(20)), title=None),
+        alt.YOffset("Measure:N"),
+        alt.Color("Measure:N"),
+        tooltip=["Symbol", "Measure", alt.Tooltip("value:Q", format=".2f")],
+    ), use_container_width=True)
+    st.caption("Risk %: each holding's share of portfolio variance, including its correlation with the rest.")
+
+st.subheader("📋 Holdings")
+money = st.column_config.NumberColumn(format="₹%.2f")
+pct = st.column_config.NumberColumn(format="%+.2f%%")
+st.dataframe(
+    table,
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "Avg Cost": money, "Price": money, "Invested": money, "Value": money, "P&L": money,
+        "Predicted Price": money, "Day %": pct, "P&L %": pct, "Predicted %": pct,
+        "Weight %": st.column_config.ProgressColumn(min_value=0, max_value=float(table["Weight %"].max()),
+                                                    format="%.2f%%"),
+        "Volatility %": st.column_config.NumberColumn(format="%.1f%%"),
+        "Risk %": st.column_config.NumberColumn(format="%.2f%%"),
+    },
+)
+st.download_button("📥 Download valuation (CSV)", table.to_csv(index=False),
+                   f"portfolio_valuation_{period}.csv", "text/csv")
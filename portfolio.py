@@ -0,0 +1,149 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from forecast import SIGNALS, fit_trend, right_align, signal_codes
+from market import UNKNOWN_SECTOR, build_panel
+from price_store import load_many
+from stocks import SECTOR_OF
+
+# Portfolio valuation: a holdings file of (symbol, quantity, cost) valued in
+# one batched load, with every per-holding figure computed column-wise.
+
+# Accepted header names for each holdings column (case-insensitive)
+COLUMN_ALIASES = {
+    "Symbol": ("symbol", "ticker", "scrip", "instrument"),
+    "Quantity": ("quantity", "qty", "shares", "units"),
+    "Cost": ("cost", "avg cost", "average cost", "avg price", "buy price"),
+}
+DEFAULT_SUFFIX = ".NS"  # bare symbols are taken as NSE listings
+VOL_WINDOW = 250        # trading days of returns behind the volatility figures
+TRADING_DAYS = 252
+
+PORTFOLIO_COLUMNS = ["Symbol", "Sector", "Quantity", "Avg Cost", "Price", "Day %", "Invested", "Value",
+                     "P&L", "P&L %", "Weight %", "Volatility %", "Risk %", "Predicted Price",
+                     "Predicted %", "Signal"]
+
+
+class Valuation(NamedTuple):
+    """A valued portfolio: one row per priced holding plus the totals"""
+    holdings: pd.DataFrame
+    missing: list             # symbols with no price data
+    value: float
+    invested: float
+    day_change: float
+    volatility: float         # annualised, % of portfolio value
+    predicted_value: float
+
+    @property
+    def pnl(self):
+        return self.value - self.invested
+
+
+def read_holdings(source):
+    """Holdings from a CSV with symbol, quantity and (average) cost columns
+
+    Symbols are upper-cased and given an .NS suffix when they have none;
+    repeated symbols are merged at their quantity-weighted cost. Raises
+    ValueError for missing columns or rows that are not positive numbers.
+    """
+    raw = pd.read_csv(source, dtype=str, skipinitialspace=True)
+    headers = {str(c).strip().lower(): c for c in raw.columns}
+    columns = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        found = next((headers[a] for a in aliases if a in headers), None)
+        if found is None:
+            raise ValueError(f"Missing a {name.lower()} column (one of: {', '.join(aliases)})")
+        columns[name] = raw[found]
+
+    symbol = columns["Symbol"].fillna("").str.strip().str.upper()
+    symbol = symbol.where(symbol.str.contains(".", regex=False) | (symbol == ""), symbol + DEFAULT_SUFFIX)
+    quantity = pd.to_numeric(columns["Quantity"].str.replace(",", ""), errors="coerce")
+    cost = pd.to_numeric(columns["Cost"].str.replace(",", ""), errors="coerce")
+
+    bad = (symbol == "") | ~(quantity > 0) | ~(cost >= 0)
+    if bad.any():
+        lines = (np.flatnonzero(bad.to_numpy()) + 2).tolist()  # +1 header, +1 one-based
+        shown = ", ".join(map(str, lines[:10])) + (" ..." if len(lines) > 10 else "")
+        raise ValueError(f"Invalid symbol, quantity or cost on line {shown}")
+    if symbol.empty:
+        raise ValueError("The holdings file has no rows")
+
+    rows = pd.DataFrame({"Symbol": symbol, "Quantity": quantity, "Spent": quantity * cost})
+    merged = rows.groupby("Symbol", sort=False).sum()
+    merged["Cost"] = merged.pop("Spent") / merged["Quantity"]
+    return merged
+
+
+def value_portfolio(holdings, period="1y", predict_days=30):
+    """Value `holdings` (from `read_holdings`) at the latest stored closes
+
+    Prices come from one batched `load_many`; closes are stacked into a
+    right-aligned matrix so prices, day change and the trend prediction are
+    whole-column operations. Volatility uses the covariance of daily log
+    returns over the last VOL_WINDOW bars of a date-aligned panel; "Risk %"
+    is each holding's share of the portfolio variance.
+    """
+    frames = load_many(list(holdings.index), period)
+    held = holdings[holdings.index.isin(list(frames))]
+    missing = [s for s in holdings.index if s not in frames]
+    symbols = list(held.index)
+    if not symbols:
+        return Valuation(pd.DataFrame(columns=PORTFOLIO_COLUMNS), missing, 0.0, 0.0, 0.0, np.nan, 0.0)
+
+    closes = right_align([frames[s]["Close"].to_numpy(dtype=np.float64) for s in symbols])
+    price = closes[:, -1]
+    previous = closes[:, -2] if closes.shape[1] > 1 else np.full(len(symbols), np.nan)
+    quantity = held["Quantity"].to_numpy(dtype=np.float64)
+    cost = held["Cost"].to_numpy(dtype=np.float64)
+
+    value = quantity * price
+    invested = quantity * cost
+    total = value.sum()
+    weight = value / total
+    predicted = fit_trend(closes).predict(predict_days)
+
+    panel = build_panel({s: frames[s] for s in symbols})
+    returns = panel.returns()[-VOL_WINDOW:].astype(np.float64)
+    if len(returns) > 1:
+        cov = np.atleast_2d(np.cov(returns, rowvar=False)) * TRADING_DAYS
+        marginal = cov @ weight
+        variance = float(weight @ marginal)
+        vol = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            risk = weight * marginal / variance * 100
+    else:
+        variance, vol, risk = np.nan, np.full(len(symbols), np.nan), np.full(len(symbols), np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pred_pct = (predicted / price - 1) * 100
+        table = pd.DataFrame({
+            "Symbol": symbols,
+            "Sector": [SECTOR_OF.get(s, UNKNOWN_SECTOR) for s in symbols],
+            "Quantity": quantity,
+            "Avg Cost": cost,
+            "Price": price,
+            "Day %": (price / previous - 1) * 100,
+            "Invested": invested,
+            "Value": value,
+            "P&L": value - invested,
+            "P&L %": (value / invested - 1) * 100,
+            "Weight %": weight * 100,
+            "Volatility %": vol * 100,
+            "Risk %": risk,
+            "Predicted Price": predicted,
+            "Predicted %": pred_pct,
+            # Code -1 (no prediction) picks the trailing "N/A"
+            "Signal": np.array(SIGNALS + ["N/A"])[signal_codes(pred_pct)],
+        })
+    day_change = np.nansum(quantity * (price - previous))
+    return Valuation(
+        table.sort_values("Value", ascending=False, ignore_index=True),
+        missing,
+        float(total),
+        float(invested.sum()),
+        float(day_change),
+        float(np.sqrt(variance) * 100),
+        float(np.nansum(quantity * predicted)),
+    )
@@ -0,0 +1,156 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+import alerts
+import models
+from price_store import REFRESH_AFTER, load_many
+from stocks import ALL_STOCKS, NIFTY_50
+
+# Background refresh of the popular universe so "ANALYZE & PREDICT" clicks hit
+# a warm store. One scheduler thread per server process, whatever the number
+# of Streamlit sessions.
+
+log = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MARKET_OPEN = (9, 15)
+MARKET_CLOSE = (15, 30)
+TRADING_INTERVAL = timedelta(minutes=5)
+# One last pass after the close picks up the final daily bars
+CLOSING_REFRESH_DELAY = timedelta(minutes=15)
+
+PREFETCH_PERIOD = "1y"
+# With alerts enabled the rest of ALL_STOCKS is refreshed too, but only
+# symbols last checked this long ago: the popular set stays on the
+# trading interval while the wider universe is topped up more slowly
+UNIVERSE_INTERVAL = timedelta(minutes=float(os.environ.get("MARKETSENSE_UNIVERSE_MINUTES", 30)))
+RECENT_HOURS = float(os.environ.get("MARKETSENSE_RECENT_HOURS", 6))
+ENABLED = os.environ.get("MARKETSENSE_PREFETCH", "1") != "0"
+
+_recent = {}
+_recent_lock = threading.Lock()
+
+
+def note_request(symbol):
+    """Remember that a user asked for `symbol` so it is kept warm for a while"""
+    with _recent_lock:
+        _recent[symbol] = time.time()
+
+
+def recent_symbols():
+    cutoff = time.time() - RECENT_HOURS * 3600
+    with _recent_lock:
+        for symbol in [s for s, t in _recent.items() if t < cutoff]:
+            del _recent[symbol]
+        return list(_recent)
+
+
+def _at(day, hm):
+    return datetime(day.year, day.month, day.day, hm[0], hm[1], tzinfo=IST)
+
+
+def market_is_open(now):
+    """True while NSE's regular session is running (holidays not known)"""
+    now = now.astimezone(IST)
+    return now.weekday() < 5 and _at(now, MARKET_OPEN) <= now < _at(now, MARKET_CLOSE)
+
+
+def after_close(now):
+    """True on a weekday once NSE's regular session has ended"""
+    now = now.astimezone(IST)
+    return now.weekday() < 5 and now >= _at(now, MARKET_CLOSE)
+
+
+def next_refresh(now):
+    """When to refresh next: every few minutes while NSE trades, idle otherwise
+
+    Exchange holidays are not known here and are treated as trading days.
+    """
+    now = now.astimezone(IST)
+    if now.weekday() < 5:
+        opens, closes = _at(now, MARKET_OPEN), _at(now, MARKET_CLOSE)
+        if now < opens:
+            return opens
+        if now < closes:
+            return now + TRADING_INTERVAL
+        if now < closes + CLOSING_REFRESH_DELAY:
+            return closes + CLOSING_REFRESH_DELAY
+    day = now + timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return _at(day, MARKET_OPEN)
+
+
+class PrefetchScheduler(threading.Thread):
+    """Daemon thread that refreshes NIFTY_50 plus recently requested symbols
+
+    The first pass after each close also loads the rest of ALL_STOCKS and
+    refits every forecasting model for the whole universe, so next-day
+    predictions are model-cache hits. With
+    alerts enabled every pass also covers the rest of ALL_STOCKS, refreshing
+    those no more often than UNIVERSE_INTERVAL, and feeds the bars to the
+    alert engine, which only re-evaluates symbols that changed.
+    """
+
+    def __init__(self):
+        super().__init__(name="prefetch", daemon=True)
+        self._stop_event = threading.Event()
+        self.last_run = None
+        self.last_count = 0
+        self.last_retrain = None
+
+    def refresh(self, max_age=timedelta(0)):
+        now = datetime.now(IST)
+        retrain = after_close(now) and self.last_retrain != now.date()
+        popular = list(dict.fromkeys(NIFTY_50 + recent_symbols()))
+        # load_many bounds concurrency and goes through the shared rate limiter
+        frames = load_many(popular, PREFETCH_PERIOD, max_age=max_age)
+        if alerts.ENABLED or retrain:
+            # The retraining pass takes every symbol's final bars, whatever
+            # the universe interval
+            rest = [s for s in dict.fromkeys(ALL_STOCKS.values()) if s not in frames and s not in popular]
+            rest_age = max_age if retrain else max(max_age, UNIVERSE_INTERVAL)
+            frames.update(load_many(rest, PREFETCH_PERIOD, max_age=rest_age))
+        self.last_run = now
+        self.last_count = len(frames)
+        if alerts.ENABLED:
+            alerts.get_engine().update(frames)
+        if retrain:
+            # Every model for the whole universe on a process pool; symbols
+            # already fitted on today's final bar are skipped
+            models.retrain(frames, PREFETCH_PERIOD)
+            self.last_retrain = now.date()
+
+    def run(self):
+        # The first pass after a restart only tops up what the store lacks
+        max_age = REFRESH_AFTER
+        while not self._stop_event.is_set():
+            try:
+                self.refresh(max_age)
+                max_age = timedelta(0)
+            except Exception:
+                log.exception("prefetch refresh failed")
+            wait = (next_refresh(datetime.now(IST)) - datetime.now(IST)).total_seconds()
+            self._stop_event.wait(max(wait, 1.0))
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def ensure_started():
+    """Start the process-wide scheduler once; later calls are no-ops"""
+    global _scheduler
+    if not ENABLED:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler()
+            _scheduler.start()
+        return _scheduler
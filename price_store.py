@@ -0,0 +1,525 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+import metrics
+import rollups
+from providers import get_provider
+from upstream import RateLimited, call, flights
+
+# Local OHLCV store: one uncompressed Arrow IPC file per symbol plus a small
+# JSON sidecar recording which date range has already been fetched from
+# Yahoo. Files are memory-mapped, so every session, thread and worker
+# process reading a symbol shares the same page-cache copy of its bars.
+# Weekly and monthly rollups (rollups.py) are stored beside the daily bars
+# and brought up to date on every write.
+STORE_DIR = os.environ.get(
+    "MARKETSENSE_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store"),
+)
+PRICE_DIR = os.path.join(STORE_DIR, "prices")
+
+# How long the newest stored bar is trusted before asking Yahoo for newer bars
+REFRESH_AFTER = timedelta(minutes=10)
+
+# Seconds to wait for a rate-limiter token before serving stored (stale)
+# bars and revalidating in the background instead
+STALE_TIMEOUT = 1.0
+
+# Symbols per batched download request, and how many batches run at once
+BATCH_SIZE = 50
+BATCH_WORKERS = 4
+
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+# Every period the store serves; "max" is all stored history
+PERIODS = (*PERIOD_OFFSETS, "max")
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+_revalidator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="revalidate")
+_revalidating = set()
+
+
+def _lock_for(symbol):
+    with _locks_guard:
+        return _locks.setdefault(symbol, threading.Lock())
+
+
+def _paths(symbol):
+    name = quote(symbol, safe="")
+    return (os.path.join(PRICE_DIR, f"{name}.arrow"),
+            os.path.join(PRICE_DIR, f"{name}.json"))
+
+
+def _level_path(symbol, level):
+    if level == "daily":
+        return _paths(symbol)[0]
+    return os.path.join(PRICE_DIR, f"{quote(symbol, safe='')}.{level}.arrow")
+
+
+def _legacy_path(symbol):
+    return os.path.join(PRICE_DIR, f"{quote(symbol, safe='')}.parquet")
+
+
+class _View(NamedTuple):
+    """A symbol's stored bars as read-only columns over the mapped file"""
+    stamp: tuple        # (inode, mtime_ns) of the file the view maps
+    df: pd.DataFrame
+    mapped: int         # bytes of the file mapped
+    copied: int         # bytes of columns that could not stay zero-copy
+
+
+_views = {}  # (symbol, level) -> _View, one per process
+_views_lock = threading.Lock()
+_migrate_lock = threading.Lock()
+
+
+def _map(path):
+    """Memory-map an Arrow file as a DataFrame whose columns point into the map"""
+    source = pa.memory_map(path, "r")
+    whole = np.frombuffer(source.read_buffer(), dtype=np.uint8)
+    source.seek(0)
+    table = ipc.open_file(source).read_all()
+    # Numeric columns stay in the map; pandas rebuilds the tz-aware date
+    # index itself (8 bytes per bar, once per process)
+    df = table.to_pandas(split_blocks=True)
+    columns = [df[c].to_numpy() for c in df.columns] + [df.index.to_numpy()]
+    copied = sum(a.nbytes for a in columns if not np.may_share_memory(a, whole))
+    return df, whole.nbytes, copied
+
+
+def _view(symbol, level="daily"):
+    """The shared read-only frame for a symbol, re-mapped when the file changes"""
+    data_path = _level_path(symbol, level)
+    key = (symbol, level)
+    try:
+        st = os.stat(data_path)
+    except FileNotFoundError:
+        with _views_lock:
+            _views.pop(key, None)
+        return None
+    stamp = (st.st_ino, st.st_mtime_ns)
+    with _views_lock:
+        view = _views.get(key)
+    if view is not None and view.stamp == stamp:
+        metrics.inc("cache_hits_total", cache="price_views")
+        return view.df
+    metrics.inc("cache_misses_total", cache="price_views")
+    with metrics.span("store.map"):
+        df, mapped, copied = _map(data_path)
+    with _views_lock:
+        _views[key] = _View(stamp, df, mapped, copied)
+    return df
+
+
+# "max" asks for everything since this date (before any NSE/BSE listing)
+MAX_START = pd.Timestamp("1990-01-01")
+
+
+def period_start(period, today=None):
+    """First calendar day covered by a yfinance-style period string"""
+    if period == "max":
+        return MAX_START
+    today = pd.Timestamp(today or datetime.now()).normalize()
+    return today - PERIOD_OFFSETS[period]
+
+
+def read_stored(symbol):
+    """Return (df, meta) for a symbol, or (None, None) if nothing is stored
+
+    `df` is the process-wide read-only view of the stored bars: every caller
+    gets the same object, backed by the memory-mapped file.
+    """
+    data_path, meta_path = _paths(symbol)
+    if not os.path.exists(meta_path):
+        return None, None
+    if not os.path.exists(data_path):
+        legacy = _legacy_path(symbol)
+        if not os.path.exists(legacy):
+            return None, None
+        # Stores written before the Arrow layout are converted on first read
+        with _migrate_lock:
+            if not os.path.exists(data_path):
+                _write_arrow(data_path, pd.read_parquet(legacy))
+                os.remove(legacy)
+    with metrics.span("store.read"):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return _view(symbol), meta
+
+
+def _tmp_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_arrow(path, df):
+    table = pa.Table.from_pandas(df)
+    # Keep NaN as NaN rather than nulls so float columns read back zero-copy
+    for i, name in enumerate(df.columns):
+        if table.column(i).null_count and df[name].dtype.kind == "f":
+            table = table.set_column(i, name, pa.array(df[name].to_numpy(), from_pandas=False))
+    tmp = _tmp_path(path)
+    with pa.OSFile(tmp, "wb") as f:
+        with ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+    # Readers still holding the old mapping keep seeing the old inode
+    os.replace(tmp, path)
+
+
+def _write(symbol, df, meta):
+    """Persist bars and/or meta; returns the shared view of the bars written
+
+    Callers hold `_lock_for(symbol)`.
+    """
+    os.makedirs(PRICE_DIR, exist_ok=True)
+    data_path, meta_path = _paths(symbol)
+    if df is not None:
+        stored = _view(symbol)
+        with metrics.span("store.write"):
+            _write_arrow(data_path, df)
+        with metrics.span("store.rollup"):
+            for level in rollups.ROLLUPS:
+                _write_arrow(_level_path(symbol, level), rollups.extend(_view(symbol, level), stored, df, level))
+    tmp = _tmp_path(meta_path)
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+    return _view(symbol) if df is not None else None
+
+
+_pyramids = {}  # symbol -> rollups.Pyramid over the current views
+
+
+def read_pyramid(symbol):
+    """The stored daily bars and their rollups as a rollups.Pyramid, or None
+
+    Rollups that don't match the daily bars (a store written before they
+    existed, or a write that is still in progress) are rebuilt.
+    """
+    daily = _view(symbol)
+    if daily is None or daily.empty:
+        return None
+    frames = [_view(symbol, level) for level in rollups.ROLLUPS]
+    with _views_lock:
+        pyramid = _pyramids.get(symbol)
+    if pyramid is not None and pyramid.daily is daily and all(
+            a is b for a, b in zip(pyramid.rollups, frames)):
+        return pyramid
+
+    if not all(rollups.matches(frame, daily) for frame in frames):
+        # Under the symbol's lock, so a rebuild can't race a store write
+        with _lock_for(symbol):
+            daily = _view(symbol)
+            if daily is None or daily.empty:
+                return None
+            for i, level in enumerate(rollups.ROLLUPS):
+                frames[i] = _view(symbol, level)
+                if not rollups.matches(frames[i], daily):
+                    metrics.inc("cache_misses_total", cache="rollups")
+                    with metrics.span("store.rollup"):
+                        os.makedirs(PRICE_DIR, exist_ok=True)
+                        _write_arrow(_level_path(symbol, level), rollups.rollup(daily, level))
+                    frames[i] = _view(symbol, level)
+    pyramid = rollups.pyramid(daily, frames)
+    with _views_lock:
+        _pyramids[symbol] = pyramid
+    return pyramid
+
+
+def _fetch(symbol, start, end=None, timeout=10.0):
+    provider = get_provider()
+    return call(("history", symbol, str(start), str(end)),
+                lambda: provider.history(symbol, start=start, end=end),
+                timeout=timeout, limited=provider.rate_limited)
+
+
+def _since(df, start):
+    """Bars from `start` on, as a positional slice (a view, not a copy)"""
+    start = pd.Timestamp(start)
+    if df.index.tz is not None:
+        start = start.tz_localize(df.index.tz)
+    return df.iloc[df.index.searchsorted(start):]
+
+
+def merge_bars(*frames):
+    """Combine bar frames, letting later frames overwrite earlier ones"""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return None
+    df = pd.concat(frames)
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def _overlap_day(df):
+    """The last stored bar that is final: refetching from it detects rewrites"""
+    return df.index[-2 if len(df) > 1 else -1].date()
+
+
+def _adjusted(stored, newer):
+    """Whether `newer` shows a split or dividend that rescales `stored`
+
+    Yahoo adjusts every earlier close for corporate actions, so a refetched
+    bar whose close no longer matches the stored one, or a new nonzero
+    action, means the stored history is out of date. The last stored bar is
+    skipped in the comparison: it may have been a partial (still trading) bar.
+    """
+    if newer is None or newer.empty:
+        return False
+    overlap = newer.index.intersection(stored.index[:-1])
+    if len(overlap) and not np.allclose(newer['Close'].reindex(overlap).to_numpy(dtype=np.float64),
+                                        stored['Close'].reindex(overlap).to_numpy(dtype=np.float64),
+                                        rtol=1e-6, equal_nan=True):
+        return True
+    for column in ("Stock Splits", "Dividends"):
+        if column not in newer:
+            continue
+        actions = newer[column].fillna(0)
+        known = stored[column].reindex(newer.index).fillna(0) if column in stored else 0
+        if ((actions != 0) & (actions != known)).any():
+            return True
+    return False
+
+
+def _revalidate(symbol, period):
+    with _locks_guard:
+        if symbol in _revalidating:
+            return
+        _revalidating.add(symbol)
+
+    def run():
+        try:
+            _load(symbol, period, timeout=None)
+        except Exception:
+            pass
+        finally:
+            with _locks_guard:
+                _revalidating.discard(symbol)
+
+    _revalidator.submit(run)
+
+
+def load_history(symbol, period):
+    """Daily OHLCV for `period`, served from disk and topped up from Yahoo
+
+    Concurrent callers asking for the same symbol and period share one load.
+    """
+    with metrics.span("store.load_history"):
+        return flights.do(("load", symbol, period),
+                          lambda: _load(symbol, period, timeout=STALE_TIMEOUT))
+
+
+def _load(symbol, period, timeout):
+    start = period_start(period)
+    now = datetime.now()
+
+    with _lock_for(symbol):
+        df, meta = read_stored(symbol)
+
+        if df is None or df.empty:
+            df = _fetch(symbol, start.date())
+            if df.empty:
+                return df
+            meta = {"start": start.date().isoformat(), "checked": now.isoformat()}
+            df = _write(symbol, df, meta)
+            return _since(df, start)
+
+        data_changed = False
+        covered_start = pd.Timestamp(meta["start"])
+
+        # Older gap: only the bars before what we already hold
+        if start < covered_start:
+            older = _fetch(symbol, start.date(), covered_start.date())
+            df = merge_bars(older, df)
+            meta["start"] = start.date().isoformat()
+            data_changed = True
+
+        # Newer bars: refetch from the last final stored day so a partial
+        # (still trading) daily bar gets replaced by its final values, and
+        # a split or dividend since then shows up as a changed close
+        if now - datetime.fromisoformat(meta["checked"]) > REFRESH_AFTER:
+            try:
+                newer = _fetch(symbol, _overlap_day(df), timeout=timeout)
+                if _adjusted(df, newer):
+                    # The stored range is no longer what Yahoo serves
+                    metrics.inc("store_refetched_total")
+                    full = _fetch(symbol, start.date(), timeout=timeout)
+                    if not full.empty:
+                        df, newer = None, full
+                        meta["start"] = start.date().isoformat()
+            except RateLimited:
+                # Stale-while-revalidate: serve stored bars now, retry later
+                metrics.inc("store_stale_served_total")
+                newer = None
+                _revalidate(symbol, period)
+            if newer is not None:
+                if not newer.empty:
+                    df = merge_bars(df, newer)
+                    data_changed = True
+                meta["checked"] = now.isoformat()
+                if data_changed:
+                    df = _write(symbol, df, meta)
+                else:
+                    _write(symbol, None, meta)
+            elif data_changed:
+                df = _write(symbol, df, meta)
+        elif data_changed:
+            df = _write(symbol, df, meta)
+
+    return _since(df, start)
+
+
+def _download(symbols, start):
+    """One batched provider request (a single yf.download for Yahoo)"""
+    provider = get_provider()
+    return call(("download", tuple(symbols), str(start)),
+                lambda: provider.download(symbols, start),
+                timeout=30.0, limited=provider.rate_limited)
+
+
+def load_many(symbols, period, max_age=REFRESH_AFTER):
+    """Daily OHLCV for many symbols at once
+
+    Fresh symbols are read from disk; missing ones and those last checked
+    more than `max_age` ago are fetched with batched provider downloads on
+    a bounded thread pool. Symbols Yahoo has no data for are left out of the
+    returned dict.
+    """
+    start = period_start(period)
+    now = datetime.now()
+    symbols = list(dict.fromkeys(symbols))
+
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        stored = dict(zip(symbols, pool.map(read_stored, symbols)))
+
+    cold, stale = [], []
+    for symbol, (df, meta) in stored.items():
+        if df is None or df.empty or start < pd.Timestamp(meta["start"]):
+            cold.append(symbol)
+        elif now - datetime.fromisoformat(meta["checked"]) >= max_age:
+            stale.append(symbol)
+
+    # Jobs are (batch, since, mode): "full" merges the whole window into
+    # what is stored, "update" merges the newer bars, "rebase" replaces the
+    # stored bars of symbols whose history a split or dividend rewrote
+    jobs = []
+    for i in range(0, len(cold), BATCH_SIZE):
+        jobs.append((cold[i:i + BATCH_SIZE], start.date(), "full"))
+    for i in range(0, len(stale), BATCH_SIZE):
+        batch = stale[i:i + BATCH_SIZE]
+        since = min(_overlap_day(stored[s][0]) for s in batch)
+        jobs.append((batch, since, "update"))
+
+    while jobs:
+        rebase = []
+        with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+            futures = [(pool.submit(_download, batch, since), batch, mode) for batch, since, mode in jobs]
+            for future, batch, mode in futures:
+                try:
+                    fetched = future.result()
+                except Exception:
+                    # Keep whatever is on disk for this batch (possibly stale)
+                    metrics.inc("errors_total", where="store.load_many")
+                    continue
+                for symbol in batch:
+                    with _lock_for(symbol):
+                        df, meta = read_stored(symbol)
+                        meta = meta or {"start": start.date().isoformat()}
+                        if mode == "update" and df is not None and _adjusted(df, fetched.get(symbol)):
+                            metrics.inc("store_refetched_total")
+                            rebase.append(symbol)
+                            continue
+                        if mode == "rebase":
+                            df, meta["start"] = None, start.date().isoformat()
+                        elif mode == "full":
+                            meta["start"] = min(pd.Timestamp(meta["start"]), start).date().isoformat()
+                        meta["checked"] = now.isoformat()
+                        df = merge_bars(df, fetched.get(symbol))
+                        if df is None:
+                            continue
+                        stored[symbol] = (_write(symbol, df, meta), meta)
+        jobs = [(rebase[i:i + BATCH_SIZE], start.date(), "rebase") for i in range(0, len(rebase), BATCH_SIZE)]
+
+    frames = {}
+    for symbol, (df, meta) in stored.items():
+        if df is not None and not df.empty:
+            df = _since(df, start)
+            if not df.empty:
+                frames[symbol] = df
+    return frames
+
+
+class SharedFrame(NamedTuple):
+    """Picklable handle to a date range of a symbol's stored bars
+
+    Sent to worker processes instead of the bars themselves; `load()` maps
+    the store in the worker, so no process holds a private copy.
+    """
+    symbol: str
+    first: pd.Timestamp
+    last: pd.Timestamp
+
+    def load(self):
+        df = _view(self.symbol)
+        index = df.index
+        return df.iloc[index.searchsorted(self.first):index.searchsorted(self.last, side="right")]
+
+
+def share(symbol, df):
+    """A SharedFrame for `df` if it is a view of the mapped store, else `df`"""
+    with _views_lock:
+        view = _views.get((symbol, "daily"))
+    if view is None or df.empty or not np.may_share_memory(
+            df['Close'].to_numpy(), view.df['Close'].to_numpy()):
+        return df
+    return SharedFrame(symbol, df.index[0], df.index[-1])
+
+
+def resolve(frame):
+    """The frame behind a `share` result"""
+    return frame.load() if isinstance(frame, SharedFrame) else frame
+
+
+def process_memory():
+    """(resident, shared) bytes of this process, or (None, None) off Linux"""
+    try:
+        with open("/proc/self/statm") as f:
+            _, resident, shared = (int(v) for v in f.read().split()[:3])
+    except (OSError, ValueError):
+        return None, None
+    page = os.sysconf("SC_PAGE_SIZE")
+    return resident * page, shared * page
+
+
+def memory_report():
+    """Rows and bytes of every symbol and rollup level mapped by this process
+
+    Mapped bytes live in the OS page cache and are shared by all sessions
+    and processes; only "Copied KB" (columns that had to be converted) is
+    private to this process.
+    """
+    with _views_lock:
+        views = sorted(_views.items())
+    return pd.DataFrame(
+        [{"Symbol": symbol, "Level": level, "Rows": len(v.df), "Mapped KB": round(v.mapped / 1024, 1),
+          "Copied KB": round(v.copied / 1024, 1)} for (symbol, level), v in views],
+        columns=["Symbol", "Level", "Rows", "Mapped KB", "Copied KB"],
+    )
@@ -0,0 +1,292 @@
+import os
+import re
+import sys
+import json
+import zlib
+import argparse
+import threading
+from datetime import datetime
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from stocks import ALL_STOCKS, SECTOR_OF
+
+# Where bars and company metadata come from. Yahoo is the default; the
+# synthetic and replay providers serve the same frames offline, so the app
+# and the benchmarks (bench.py) can run without the network.
+#
+# MARKETSENSE_PROVIDER=yahoo | synthetic[:seed] | replay:<directory>
+
+TZ = "Asia/Kolkata"
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+
+def _period_start(period, end):
+    """Start of a yfinance-style period ("5d", "3mo", "2y", "max") ending at `end`"""
+    if period == "max":
+        return None
+    match = re.fullmatch(r"(\d+)(d|mo|y)", period)
+    if match is None:
+        raise ValueError(f"Unsupported period '{period}'")
+    n, unit = int(match.group(1)), match.group(2)
+    offset = {"d": pd.DateOffset(days=n), "mo": pd.DateOffset(months=n), "y": pd.DateOffset(years=n)}[unit]
+    return end.normalize() - offset
+
+
+def _window(df, start=None, end=None, period=None):
+    """Rows of a daily frame for the history() arguments, as yfinance reads them"""
+    if period is not None and start is None:
+        start = _period_start(period, pd.Timestamp.now(tz=TZ))
+    if start is not None:
+        start = pd.Timestamp(start)
+        start = start.tz_localize(TZ) if start.tz is None else start
+        df = df.iloc[df.index.searchsorted(start):]
+    if end is not None:
+        end = pd.Timestamp(end)
+        end = end.tz_localize(TZ) if end.tz is None else end
+        df = df.iloc[:df.index.searchsorted(end)]  # end is exclusive
+    return df
+
+
+class Provider:
+    """A source of daily OHLCV bars and company metadata
+
+    `history` mirrors yf.Ticker.history (tz-aware index named "Date",
+    OHLCV_COLUMNS), `download` returns {symbol: frame} for a batch from
+    `start` on (symbols without data are left out), and `info` returns a
+    dict with yfinance's keys. `rate_limited` providers go through the
+    shared upstream limiter.
+    """
+    name = None
+    rate_limited = False
+
+    def history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        raise NotImplementedError
+
+    def download(self, symbols, start):
+        frames = {}
+        for symbol in symbols:
+            df = self.history(symbol, start=start)
+            if not df.empty:
+                frames[symbol] = df
+        return frames
+
+    def info(self, symbol):
+        raise NotImplementedError
+
+
+class YahooProvider(Provider):
+    """Live data from Yahoo Finance via yfinance"""
+    name = "yahoo"
+    rate_limited = True
+
+    def history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        import yfinance as yf
+        kwargs = {k: v for k, v in (("start", start), ("end", end), ("period", period)) if v is not None}
+        return yf.Ticker(symbol).history(interval=interval, **kwargs)
+
+    def download(self, symbols, start):
+        """One batched yf.download request, split back into per-symbol frames"""
+        import yfinance as yf
+        raw = yf.download(list(symbols), start=start, group_by="ticker", actions=True, auto_adjust=True,
+                          ignore_tz=False, threads=False, progress=False)
+        frames = {}
+        if raw is None or raw.empty:
+            return frames
+        tickers = raw.columns.get_level_values(0) if isinstance(raw.columns, pd.MultiIndex) else None
+        for symbol in symbols:
+            if tickers is None:
+                part = raw
+            elif symbol in tickers:
+                part = raw[symbol]
+            else:
+                continue
+            part = part.dropna(subset=["Close"])
+            if not part.empty:
+                part.columns.name = None
+                frames[symbol] = part
+        return frames
+
+    def info(self, symbol):
+        import yfinance as yf
+        return yf.Ticker(symbol).info
+
+
+# Synthetic histories start here (or at a later per-symbol listing date)
+SYNTHETIC_ORIGIN = pd.Timestamp("1996-01-01")
+SYNTHETIC_REVERSION = 0.999  # daily AR(1) coefficient of the price deviation
+
+
+class SyntheticProvider(Provider):
+    """Deterministic random-walk OHLCV for any symbol
+
+    Each symbol's series depends only on (seed, symbol): a bar for a given
+    date is identical whatever range is requested, so stored and freshly
+    generated bars always agree. Some symbols list after SYNTHETIC_ORIGIN,
+    giving ragged histories like the real universe. Daily bars only.
+    """
+    name = "synthetic"
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self._days = (None, None)  # (end, weekdays from SYNTHETIC_ORIGIN to end)
+
+    def _rng(self, symbol):
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+
+    def bars(self, symbol, end=None):
+        """Every daily bar of `symbol` from its listing date through `end` (default today)"""
+        end = pd.Timestamp(end or datetime.now()).normalize()
+        end = end.tz_localize(None) if end.tz is not None else end
+        days = self._weekdays(end)
+        rng = self._rng(symbol)
+        listed = int(rng.integers(0, 4000)) if rng.random() < 0.3 else 0
+        price, drift, vol = rng.uniform(20, 3000), rng.normal(0.0001, 0.0001), rng.uniform(0.01, 0.03)
+        # Draws cover the whole range up to `end`, so prefixes never change
+        shocks = rng.standard_normal((len(days), 4))
+        days, shocks = days[listed:], shocks[listed:]
+        if not len(days):
+            return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], tz=TZ, name="Date"))
+
+        # Log price = trend + AR(1) deviation, so long histories stay in a
+        # plausible price range instead of drifting off like a pure random walk
+        t = np.arange(len(days))
+        decay = SYNTHETIC_REVERSION ** t
+        deviation = decay * np.cumsum(vol * shocks[:, 0] / decay)
+        close = price * np.exp(drift * t + deviation)
+        open_ = np.r_[price, close[:-1]] * np.exp(0.3 * vol * shocks[:, 1])
+        high = np.maximum(open_, close) * (1 + 0.5 * vol * np.abs(shocks[:, 2]))
+        low = np.minimum(open_, close) * (1 - 0.5 * vol * np.abs(shocks[:, 3]))
+        volume = np.round(np.exp(13 + 0.5 * shocks[:, 2] - 0.3 * shocks[:, 0])).astype(np.int64)
+        return pd.DataFrame(
+            {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume,
+             "Dividends": 0.0, "Stock Splits": 0.0},
+            index=days,
+        )
+
+    def _weekdays(self, end):
+        # Shared by every symbol; np.is_busday is far quicker than bdate_range
+        cached_end, days = self._days
+        if cached_end != end:
+            span = np.arange(SYNTHETIC_ORIGIN.to_datetime64(), end.to_datetime64() + np.timedelta64(1, "D"),
+                             dtype="datetime64[D]")
+            days = pd.DatetimeIndex(span[np.is_busday(span)].astype("datetime64[ns]"), name="Date")
+            days = days.tz_localize(TZ)
+            self._days = (end, days)
+        return days
+
+    def history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        if interval != "1d":
+            raise ValueError(f"{self.name} provider only serves daily bars")
+        return _window(self.bars(symbol), start, end, period)
+
+    def info(self, symbol):
+        base = symbol.rsplit(".", 1)[0]
+        exchange = {"NS": "NSI", "BO": "BSE"}.get(symbol.rsplit(".", 1)[-1], "NSI")
+        return {"longName": f"{base} (synthetic)", "shortName": base,
+                "sector": SECTOR_OF.get(symbol, "Other"), "exchange": exchange, "currency": "INR"}
+
+
+class ReplayProvider(Provider):
+    """Serves bars recorded to a directory by `record` (one Parquet per symbol)
+
+    Symbols without a recording have no data, like unknown symbols on
+    Yahoo. Requests are answered from the recorded range only.
+    """
+    name = "replay"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol, ext):
+        return os.path.join(self.directory, f"{quote(symbol, safe='')}.{ext}")
+
+    def bars(self, symbol):
+        with self._lock:
+            df = self._frames.get(symbol)
+        if df is None:
+            try:
+                df = pd.read_parquet(self._path(symbol, "parquet"))
+            except FileNotFoundError:
+                df = pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], tz=TZ, name="Date"))
+            with self._lock:
+                self._frames[symbol] = df
+        return df
+
+    def history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        if interval != "1d":
+            raise ValueError(f"{self.name} provider only serves daily bars")
+        return _window(self.bars(symbol), start, end, period)
+
+    def info(self, symbol):
+        try:
+            with open(self._path(symbol, "json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def record(symbols, directory, period="max", provider=None):
+    """Save each symbol's daily bars and info from `provider` for ReplayProvider"""
+    provider = provider or get_provider()
+    os.makedirs(directory, exist_ok=True)
+    saved = 0
+    for symbol in symbols:
+        df = provider.history(symbol, period=period)
+        if df.empty:
+            continue
+        name = os.path.join(directory, quote(symbol, safe=""))
+        df.to_parquet(f"{name}.parquet")
+        with open(f"{name}.json", "w") as f:
+            json.dump(provider.info(symbol) or {}, f)
+        saved += 1
+    return saved
+
+
+def provider_from_spec(spec):
+    """A provider from a MARKETSENSE_PROVIDER-style spec"""
+    kind, _, arg = (spec or "yahoo").partition(":")
+    if kind == "yahoo":
+        return YahooProvider()
+    if kind == "synthetic":
+        return SyntheticProvider(int(arg or 0))
+    if kind == "replay" and arg:
+        return ReplayProvider(arg)
+    raise ValueError(f"Unknown provider '{spec}' (yahoo, synthetic[:seed] or replay:<directory>)")
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """The process-wide provider, chosen by MARKETSENSE_PROVIDER"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = provider_from_spec(os.environ.get("MARKETSENSE_PROVIDER"))
+        return _provider
+
+
+def set_provider(provider):
+    """Swap the process-wide provider (benchmarks, offline runs)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record daily bars for the replay provider")
+    parser.add_argument("directory")
+    parser.add_argument("symbols", nargs="*", help="defaults to every stock in stocks.py")
+    parser.add_argument("--period", default="max")
+    parser.add_argument("--source", default=os.environ.get("MARKETSENSE_PROVIDER", "yahoo"),
+                        help="provider spec to record from")
+    args = parser.parse_args()
+    symbols = args.symbols or list(dict.fromkeys(ALL_STOCKS.values()))
+    count = record(symbols, args.directory, args.period, provider_from_spec(args.source))
+    print(f"Recorded {count} of {len(symbols)} symbols to {args.directory}", file=sys.stderr)
@@ -0,0 +1,238 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from forecast import TrendFit
+
+# Weekly and monthly rollups of the daily bars, kept next to them in the
+# store. Besides OHLCV each bucket carries its bar count and the sums a
+# least-squares trend needs, so statistics over any window can be added up
+# from whole months, then whole weeks, then the odd days at the edges
+# instead of rescanning every daily bar.
+
+# Coarsest first: a window is covered by the first level whose buckets fit
+ROLLUPS = ("monthly", "weekly")
+ROLLUP_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Bars", "SumClose", "SumClose2", "SumIdxClose"]
+YEAR_WEEKS = 52
+
+
+class Pyramid(NamedTuple):
+    """A symbol's daily bars and their rollups (in ROLLUPS order)
+
+    `arrays` holds each rollup's columns as float arrays, plus "Starts" and
+    "Ends", the daily positions each bucket spans, so queries skip pandas
+    indexing; `daily_arrays` does the same for the daily bars.
+    """
+    daily: pd.DataFrame
+    rollups: tuple
+    arrays: tuple
+    daily_arrays: dict
+
+
+def pyramid(daily, frames):
+    """A Pyramid over `daily` and its rollup frames"""
+    arrays = []
+    for frame in frames:
+        columns = {c: frame[c].to_numpy(dtype=np.float64) for c in ROLLUP_COLUMNS}
+        bars = frame['Bars'].to_numpy()
+        columns["Ends"] = np.cumsum(bars)
+        columns["Starts"] = columns["Ends"] - bars
+        arrays.append(columns)
+    daily_arrays = {c: daily[c].to_numpy(dtype=np.float64) for c in ("High", "Low", "Close", "Volume")}
+    return Pyramid(daily, tuple(frames), tuple(arrays), daily_arrays)
+
+
+def _bucket_ids(index, level):
+    """Week (Monday-Sunday) or month number of each bar's local date"""
+    if level == "weekly":
+        days = index.tz_localize(None).asi8 // 86_400_000_000_000
+        return (days + 3) // 7  # 1970-01-01 was a Thursday
+    return index.year * 12 + index.month
+
+
+def rollup(daily, level):
+    """One row per week or month of `daily`, indexed by the bucket's last bar
+
+    "Bars" counts the daily bars in the bucket; "SumIdxClose" weights each
+    close by its position within the bucket (0 for the first bar).
+    """
+    if daily.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS, index=daily.index[:0])
+    ids = np.asarray(_bucket_ids(daily.index, level))
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)]
+    bars = ends - starts
+    position = np.arange(len(ids)) - np.repeat(starts, bars)
+
+    close = daily['Close'].to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        "Open": daily['Open'].to_numpy(dtype=np.float64)[starts],
+        "High": np.fmax.reduceat(daily['High'].to_numpy(dtype=np.float64), starts),
+        "Low": np.fmin.reduceat(daily['Low'].to_numpy(dtype=np.float64), starts),
+        "Close": close[ends - 1],
+        "Volume": np.add.reduceat(np.nan_to_num(daily['Volume'].to_numpy(dtype=np.float64)), starts),
+        "Bars": bars.astype(np.int64),
+        "SumClose": np.add.reduceat(close, starts),
+        "SumClose2": np.add.reduceat(close * close, starts),
+        "SumIdxClose": np.add.reduceat(position * close, starts),
+    }, index=daily.index[ends - 1])
+
+
+def first_change(stored, daily):
+    """Position of the first bar where `daily` differs from `stored`
+
+    The length of the shorter frame if one is a prefix of the other.
+    """
+    n = min(len(stored), len(daily))
+    differs = np.asarray(stored.index[:n] != daily.index[:n])
+    for column in ("Open", "High", "Low", "Close", "Volume"):
+        a = stored[column].to_numpy(dtype=np.float64)[:n]
+        b = daily[column].to_numpy(dtype=np.float64)[:n]
+        differs |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+    changed = np.flatnonzero(differs)
+    return int(changed[0]) if len(changed) else n
+
+
+def extend(previous, stored, daily, level):
+    """`rollup(daily, level)`, reusing the buckets `previous` holds for `stored`
+
+    Buckets are recomputed from the one holding the first bar where `daily`
+    differs from the `stored` bars onwards: new bars land at the end, but a
+    refetch can also revise earlier ones. A bucket ending right before that
+    bar is recomputed too, as the bar may belong to it. If `previous`
+    doesn't roll up `stored`, everything is rebuilt.
+    """
+    if previous is None or stored is None or not matches(previous, stored):
+        return rollup(daily, level)
+    ends = np.cumsum(previous['Bars'].to_numpy())
+    keep = int(ends.searchsorted(first_change(stored, daily)))
+    cut = int(ends[keep - 1]) if keep else 0
+    return pd.concat([previous.iloc[:keep], rollup(daily.iloc[cut:], level)])
+
+
+def matches(previous, daily):
+    """Whether `previous` rolls up exactly the bars in `daily`"""
+    return (previous is not None and not daily.empty and len(previous) > 0
+            and int(previous['Bars'].sum()) == len(daily)
+            and previous.index[-1] == daily.index[-1]
+            and previous['Close'].iloc[-1] == daily['Close'].iloc[-1])
+
+
+def locate(pyramid, df):
+    """Daily positions [lo, hi) of `df` in the pyramid, or None if it isn't a stored range"""
+    index = pyramid.daily.index
+    if df.empty:
+        return None
+    lo = index.searchsorted(df.index[0])
+    hi = index.searchsorted(df.index[-1], side="right")
+    return (lo, hi) if hi - lo == len(df) else None
+
+
+def cover(pyramid, lo, hi):
+    """Pieces adding up to daily positions [lo, hi): (columns, first row, stop row)
+
+    Whole buckets of the coarsest level that fit come first, with finer
+    levels filling the gaps at either edge, down to daily bars.
+    """
+    def fill(levels, lo, hi):
+        if lo >= hi:
+            return []
+        if not levels:
+            return [(pyramid.daily_arrays, lo, hi)]
+        starts, ends = levels[0]["Starts"], levels[0]["Ends"]
+        first = starts.searchsorted(lo)
+        stop = ends.searchsorted(hi, side="right")
+        if first >= stop:
+            return fill(levels[1:], lo, hi)
+        return (fill(levels[1:], lo, int(starts[first])) + [(levels[0], first, stop)]
+                + fill(levels[1:], int(ends[stop - 1]), hi))
+
+    return fill(list(pyramid.arrays), lo, hi)
+
+
+def _columns(pieces, *names):
+    """Named columns of every piece, concatenated; daily pieces get the sums filled in"""
+    out = {name: [] for name in names}
+    for columns, first, stop in pieces:
+        daily = "Bars" not in columns
+        close = columns["Close"][first:stop]
+        for name in names:
+            if not daily or name in ("High", "Low", "Volume"):
+                values = columns[name][first:stop]
+            elif name == "Bars":
+                values = np.ones(stop - first)
+            elif name == "SumClose":
+                values = close
+            elif name == "SumClose2":
+                values = close * close
+            else:  # SumIdxClose: one bar, position 0
+                values = np.zeros(stop - first)
+            out[name].append(values)
+    return [np.concatenate(out[name]) for name in names]
+
+
+def window_stats(pyramid, lo, hi):
+    """High, low, total volume and bar count over daily positions [lo, hi)"""
+    high, low, volume, bars = _columns(cover(pyramid, lo, hi), "High", "Low", "Volume", "Bars")
+    count = int(bars.sum())
+    return {
+        "high": float(np.nanmax(high)) if count else np.nan,
+        "low": float(np.nanmin(low)) if count else np.nan,
+        "volume": float(np.nansum(volume)),
+        "bars": count,
+    }
+
+
+def year_start(pyramid, lo, hi):
+    """Daily position where the YEAR_WEEKS weeks up to position `hi` begin
+
+    Clamped to `lo`, so the 52-week figures only cover the requested window
+    and don't depend on how much older history the store happens to hold.
+    """
+    index = pyramid.daily.index
+    return max(lo, index.searchsorted(index[hi - 1] - pd.Timedelta(weeks=YEAR_WEEKS), side="right"))
+
+
+def window_trend(pyramid, lo, hi):
+    """The least-squares trend of the closes at daily positions [lo, hi)
+
+    Same fit as forecast.fit_trend on those closes, assembled from
+    per-bucket sums: a bucket starting `s` bars into the window contributes
+    s * SumClose + SumIdxClose to the sum of x * close.
+    """
+    bars, sum_y, sum_y2, sum_jy = _columns(cover(pyramid, lo, hi), "Bars", "SumClose", "SumClose2", "SumIdxClose")
+    offsets = np.cumsum(bars) - bars
+    n = float(bars.sum())
+    sy = sum_y.sum()
+    sxy = (offsets * sum_y).sum() + sum_jy.sum()
+    sx = n * (n - 1) / 2
+    sxx = (n - 1) * n * (2 * n - 1) / 6
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean, y_mean = sx / n, sy / n
+        cxy = sxy - n * x_mean * y_mean
+        cxx = sxx - n * x_mean * x_mean
+        cyy = sum_y2.sum() - n * y_mean * y_mean
+        slope = cxy / cxx
+        stderr = np.sqrt(max(cyy - slope * cxy, 0.0) / (n - 2))
+    return TrendFit(slope, y_mean - slope * x_mean, stderr, int(n))
+
+
+def chart_level(pyramid, lo, hi, min_points):
+    """Coarsest level with at least `min_points` bars in [lo, hi): (name, rows)
+
+    Rows are the stored buckets wholly inside the window, with the partial
+    buckets at either edge rolled up from their daily bars. Falls back to
+    the daily bars themselves.
+    """
+    for name, frame, columns in zip(ROLLUPS, pyramid.rollups, pyramid.arrays):
+        first = columns["Starts"].searchsorted(lo)
+        stop = columns["Ends"].searchsorted(hi, side="right")
+        if stop - first < min_points:
+            continue
+        head = pyramid.daily.iloc[lo:columns["Starts"][first]]
+        tail = pyramid.daily.iloc[columns["Ends"][stop - 1]:hi]
+        parts = [rollup(head, name), frame.iloc[first:stop], rollup(tail, name)]
+        return name, pd.concat([p for p in parts if len(p)])
+    return "daily", pyramid.daily.iloc[lo:hi]
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from forecast import fit_trend, right_align
+from price_store import load_many, read_pyramid
+from rollups import YEAR_WEEKS, locate, window_stats, year_start
+
+SCREENER_COLUMNS = ["Symbol", "Price", "Change %", "52W High", "52W Low",
+                    "vs MA10 %", "vs MA50 %", "Predicted %"]
+
+
+def screen_row(symbol, df):
+    """One screener row computed from a symbol's daily bars"""
+    close = df["Close"].to_numpy(dtype=float)
+    if len(close) < 2:
+        return None
+    current = close[-1]
+    pyramid = read_pyramid(symbol)
+    span = locate(pyramid, df) if pyramid is not None else None
+    if span is None:
+        last_year = df[df.index > df.index[-1] - pd.Timedelta(weeks=YEAR_WEEKS)]
+        high, low = last_year["High"].max(), last_year["Low"].min()
+    else:
+        year = window_stats(pyramid, year_start(pyramid, *span), span[1])
+        high, low = year["high"], year["low"]
+    ma_10 = close[-10:].mean() if len(close) >= 10 else np.nan
+    ma_50 = close[-50:].mean() if len(close) >= 50 else np.nan
+    return {
+        "Symbol": symbol,
+        "Price": current,
+        "Change %": (current / close[-2] - 1) * 100,
+        "52W High": high,
+        "52W Low": low,
+        "vs MA10 %": (current / ma_10 - 1) * 100,
+        "vs MA50 %": (current / ma_50 - 1) * 100,
+    }
+
+
+def screen(symbols, period="1y", predict_days=30):
+    """Screener table for `symbols`, loaded with batched downloads"""
+    frames = load_many(symbols, period)
+    rows = [screen_row(symbol, df) for symbol, df in frames.items()]
+    table = pd.DataFrame([r for r in rows if r is not None], columns=SCREENER_COLUMNS[:-1])
+
+    # One trend fit for the whole universe over a right-aligned close matrix
+    closes = right_align([frames[s]["Close"].to_numpy(dtype=float) for s in table["Symbol"]])
+    trend = fit_trend(closes)
+    table["Predicted %"] = (trend.predict(predict_days) / table["Price"].to_numpy() - 1) * 100
+    return table.sort_values("Predicted %", ascending=False, ignore_index=True)
@@ -0,0 +1,268 @@
+# Comprehensive list of Indian stocks (NSE & BSE)
+# Format: "Company Name" : "SYMBOL.NS"
+ALL_STOCKS = {
+    # Nifty 50 & Popular Stocks
+    "Adani Enterprises Ltd": "ADANIENT.NS",
+    "Adani Ports and Special Economic Zone Ltd": "ADANIPORTS.NS",
+    "Adani Power Ltd": "ADANIPOWER.NS",
+    "Apollo Hospitals Enterprise Ltd": "APOLLOHOSP.NS",
+    "Asian Paints Ltd": "ASIANPAINT.NS",
+    "Axis Bank Ltd": "AXISBANK.NS",
+    "Bajaj Auto Ltd": "BAJAJ-AUTO.NS",
+    "Bajaj Finance Ltd": "BAJFINANCE.NS",
+    "Bajaj Finserv Ltd": "BAJFINSERV.NS",
+    "Bank of Baroda": "BANKBARODA.NS",
+    "Bharat Electronics Ltd": "BEL.NS",
+    "Bharat Petroleum Corporation Ltd": "BPCL.NS",
+    "Bharti Airtel Ltd": "BHARTIARTL.NS",
+    "Britannia Industries Ltd": "BRITANNIA.NS",
+    "Cipla Ltd": "CIPLA.NS",
+    "Coal India Ltd": "COALINDIA.NS",
+    "Dabur India Ltd": "DABUR.NS",
+    "Divi's Laboratories Ltd": "DIVISLAB.NS",
+    "Dr. Reddy's Laboratories Ltd": "DRREDDY.NS",
+    "Eicher Motors Ltd": "EICHERMOT.NS",
+    "Grasim Industries Ltd": "GRASIM.NS",
+    "HCL Technologies Ltd": "HCLTECH.NS",
+    "HDFC Bank Ltd": "HDFCBANK.NS",
+    "HDFC Life Insurance Company Ltd": "HDFCLIFE.NS",
+    "Hero MotoCorp Ltd": "HEROMOTOCO.NS",
+    "Hindalco Industries Ltd": "HINDALCO.NS",
+    "Hindustan Unilever Ltd": "HINDUNILVR.NS",
+    "ICICI Bank Ltd": "ICICIBANK.NS",
+    "Indian Oil Corporation Ltd": "IOC.NS",
+    "IndusInd Bank Ltd": "INDUSINDBK.NS",
+    "Infosys Ltd": "INFY.NS",
+    "ITC Ltd": "ITC.NS",
+    "JSW Steel Ltd": "JSWSTEEL.NS",
+    "Kotak Mahindra Bank Ltd": "KOTAKBANK.NS",
+    "Larsen & Toubro Ltd": "LT.NS",
+    "LTIMindtree Ltd": "LTIM.NS",
+    "Mahindra & Mahindra Ltd": "M&M.NS",
+    "Maruti Suzuki India Ltd": "MARUTI.NS",
+    "Nestle India Ltd": "NESTLEIND.NS",
+    "NTPC Ltd": "NTPC.NS",
+    "Oil & Natural Gas Corporation Ltd": "ONGC.NS",
+    "Power Grid Corporation of India Ltd": "POWERGRID.NS",
+    "Reliance Industries Ltd": "RELIANCE.NS",
+    "SBI Life Insurance Company Ltd": "SBILIFE.NS",
+    "Shriram Finance Ltd": "SHRIRAMFIN.NS",
+    "State Bank of India": "SBIN.NS",
+    "Sun Pharmaceutical Industries Ltd": "SUNPHARMA.NS",
+    "Tata Consultancy Services Ltd": "TCS.NS",
+    "Tata Consumer Products Ltd": "TATACONSUM.NS",
+    "Tata Motors Ltd": "TATAMOTORS.NS",
+    "Tata Steel Ltd": "TATASTEEL.NS",
+    "Tech Mahindra Ltd": "TECHM.NS",
+    "Titan Company Ltd": "TITAN.NS",
+    "UltraTech Cement Ltd": "ULTRACEMCO.NS",
+    "UPL Ltd": "UPL.NS",
+    "Wipro Ltd": "WIPRO.NS",
+    
+    # Additional Popular Stocks (Alphabetically A-Z)
+    "ABB India Ltd": "ABB.NS",
+    "ACC Ltd": "ACC.NS",
+    "Adani Green Energy Ltd": "ADANIGREEN.NS",
+    "Adani Total Gas Ltd": "ATGL.NS",
+    "Adani Transmission Ltd": "ADANITRANS.NS",
+    "Ambuja Cements Ltd": "AMBUJACEM.NS",
+    "Aurobindo Pharma Ltd": "AUROPHARMA.NS",
+    "Avenue Supermarts Ltd (DMart)": "DMART.NS",
+    "Bandhan Bank Ltd": "BANDHANBNK.NS",
+    "Bank of India": "BANKINDIA.NS",
+    "Berger Paints India Ltd": "BERGEPAINT.NS",
+    "Biocon Ltd": "BIOCON.NS",
+    "Canara Bank": "CANBK.NS",
+    "Cholamandalam Investment and Finance Company Ltd": "CHOLAFIN.NS",
+    "Colgate-Palmolive (India) Ltd": "COLPAL.NS",
+    "Container Corporation of India Ltd": "CONCOR.NS",
+    "Coromandel International Ltd": "COROMANDEL.NS",
+    "DLF Ltd": "DLF.NS",
+    "Federal Bank Ltd": "FEDERALBNK.NS",
+    "Gail (India) Ltd": "GAIL.NS",
+    "Godrej Consumer Products Ltd": "GODREJCP.NS",
+    "Godrej Properties Ltd": "GODREJPROP.NS",
+    "Havells India Ltd": "HAVELLS.NS",
+    "HDFC Asset Management Company Ltd": "HDFCAMC.NS",
+    "Indian Railway Finance Corporation Ltd": "IRFC.NS",
+    "InterGlobe Aviation Ltd (IndiGo)": "INDIGO.NS",
+    "Jindal Steel & Power Ltd": "JINDALSTEL.NS",
+    "LIC Housing Finance Ltd": "LICHSGFIN.NS",
+    "Lupin Ltd": "LUPIN.NS",
+    "Marico Ltd": "MARICO.NS",
+    "Max Financial Services Ltd": "MFSL.NS",
+    "Muthoot Finance Ltd": "MUTHOOTFIN.NS",
+    "Persistent Systems Ltd": "PERSISTENT.NS",
+    "Petronet LNG Ltd": "PETRONET.NS",
+    "Pidilite Industries Ltd": "PIDILITIND.NS",
+    "Punjab National Bank": "PNB.NS",
+    "SBI Cards and Payment Services Ltd": "SBICARD.NS",
+    "Shree Cement Ltd": "SHREECEM.NS",
+    "Siemens Ltd": "SIEMENS.NS",
+    "SRF Ltd": "SRF.NS",
+    "Sundaram Finance Ltd": "SUNDARMFIN.NS",
+    "Suzlon Energy Ltd": "SUZLON.NS",
+    "Tata Power Company Ltd": "TATAPOWER.NS",
+    "TVS Motor Company Ltd": "TVSMOTOR.NS",
+    "Union Bank of India": "UNIONBANK.NS",
+    "United Spirits Ltd": "MCDOWELL-N.NS",
+    "Vedanta Ltd": "VEDL.NS",
+    "Voltas Ltd": "VOLTAS.NS",
+    "Yes Bank Ltd": "YESBANK.NS",
+    "Zomato Ltd": "ZOMATO.NS",
+    "Zydus Lifesciences Ltd": "ZYDUSLIFE.NS",
+    
+    # Mid-cap & Small-cap (Additional)
+    "Aarti Industries Ltd": "AARTIIND.NS",
+    "Aditya Birla Fashion and Retail Ltd": "ABFRL.NS",
+    "Ashok Leyland Ltd": "ASHOKLEY.NS",
+    "Atul Ltd": "ATUL.NS",
+    "BEML Ltd": "BEML.NS",
+    "BSE Ltd": "BSE.NS",
+    "Cummins India Ltd": "CUMMINSIND.NS",
+    "Dixon Technologies (India) Ltd": "DIXON.NS",
+    "Escorts Kubota Ltd": "ESCORTS.NS",
+    "Exide Industries Ltd": "EXIDEIND.NS",
+    "Fortis Healthcare Ltd": "FORTIS.NS",
+    "Gujarat Gas Ltd": "GUJGASLTD.NS",
+    "ICICI Lombard General Insurance Company Ltd": "ICICIGI.NS",
+    "ICICI Prudential Life Insurance Company Ltd": "ICICIPRULI.NS",
+    "IDFC First Bank Ltd": "IDFCFIRSTB.NS",
+    "Indian Bank": "INDIANB.NS",
+    "Indian Railway Catering and Tourism Corporation Ltd": "IRCTC.NS",
+    "Indraprastha Gas Ltd": "IGL.NS",
+    "Jubilant Foodworks Ltd": "JUBLFOOD.NS",
+    "L&T Technology Services Ltd": "LTTS.NS",
+    "Laurus Labs Ltd": "LAURUSLABS.NS",
+    "Linde India Ltd": "LINDEINDIA.NS",
+    "Mankind Pharma Ltd": "MANKIND.NS",
+    "Max Healthcare Institute Ltd": "MAXHEALTH.NS",
+    "NHPC Ltd": "NHPC.NS",
+    "Oberoi Realty Ltd": "OBEROIRLTY.NS",
+    "Oracle Financial Services Software Ltd": "OFSS.NS",
+    "Page Industries Ltd": "PAGEIND.NS",
+    "Paytm (One 97 Communications Ltd)": "PAYTM.NS",
+    "Phoenix Mills Ltd": "PHOENIXLTD.NS",
+    "PI Industries Ltd": "PIIND.NS",
+    "Polycab India Ltd": "POLYCAB.NS",
+    "Prestige Estates Projects Ltd": "PRESTIGE.NS",
+    "REC Ltd": "RECLTD.NS",
+    "Schaeffler India Ltd": "SCHAEFFLER.NS",
+    "Shoppers Stop Ltd": "SHOPERSTOP.NS",
+    "Tata Communications Ltd": "TATACOMM.NS",
+    "Tata Chemicals Ltd": "TATACHEM.NS",
+    "Thermax Ltd": "THERMAX.NS",
+    "Torrent Power Ltd": "TORNTPOWER.NS",
+    "Trent Ltd": "TRENT.NS",
+    "Triveni Turbine Ltd": "TRITURBINE.NS",
+    "Varun Beverages Ltd": "VBL.NS",
+    "Whirlpool of India Ltd": "WHIRLPOOL.NS",
+    
+    # Tech & IT
+    "Coforge Ltd": "COFORGE.NS",
+    "eClerx Services Ltd": "ECLERX.NS",
+    "Happiest Minds Technologies Ltd": "HAPPSTMNDS.NS",
+    "Hexaware Technologies Ltd": "HEXAWARE.NS",
+    "Mphasis Ltd": "MPHASIS.NS",
+    "Tata Elxsi Ltd": "TATAELXSI.NS",
+    
+    # Pharma
+    "Alkem Laboratories Ltd": "ALKEM.NS",
+    "Glenmark Pharmaceuticals Ltd": "GLENMARK.NS",
+    "Granules India Ltd": "GRANULES.NS",
+    "Ipca Laboratories Ltd": "IPCALAB.NS",
+    "Natco Pharma Ltd": "NATCOPHARM.NS",
+    "Sanofi India Ltd": "SANOFI.NS",
+    "Strides Pharma Science Ltd": "STAR.NS",
+    "Torrent Pharmaceuticals Ltd": "TORNTPHARM.NS",
+    
+    # Auto & Components
+    "Apollo Tyres Ltd": "APOLLOTYRE.NS",
+    "Balkrishna Industries Ltd": "BALKRISIND.NS",
+    "Bharat Forge Ltd": "BHARATFORG.NS",
+    "Bosch Ltd": "BOSCHLTD.NS",
+    "CEAT Ltd": "CEATLTD.NS",
+    "MRF Ltd": "MRF.NS",
+    "Samvardhana Motherson International Ltd": "MOTHERSON.NS",
+    "Sona BLW Precision Forgings Ltd": "SONACOMS.NS",
+    "Tube Investments of India Ltd": "TIINDIA.NS",
+}
+
+# The "Nifty 50 & Popular Stocks" block above, kept warm by the prefetcher
+NIFTY_50 = [
+    "ADANIENT.NS", "ADANIPORTS.NS", "ADANIPOWER.NS", "APOLLOHOSP.NS", "ASIANPAINT.NS",
+    "AXISBANK.NS", "BAJAJ-AUTO.NS", "BAJFINANCE.NS", "BAJFINSERV.NS", "BANKBARODA.NS",
+    "BEL.NS", "BPCL.NS", "BHARTIARTL.NS", "BRITANNIA.NS", "CIPLA.NS", "COALINDIA.NS",
+    "DABUR.NS", "DIVISLAB.NS", "DRREDDY.NS", "EICHERMOT.NS", "GRASIM.NS", "HCLTECH.NS",
+    "HDFCBANK.NS", "HDFCLIFE.NS", "HEROMOTOCO.NS", "HINDALCO.NS", "HINDUNILVR.NS",
+    "ICICIBANK.NS", "IOC.NS", "INDUSINDBK.NS", "INFY.NS", "ITC.NS", "JSWSTEEL.NS",
+    "KOTAKBANK.NS", "LT.NS", "LTIM.NS", "M&M.NS", "MARUTI.NS", "NESTLEIND.NS",
+    "NTPC.NS", "ONGC.NS", "POWERGRID.NS", "RELIANCE.NS", "SBILIFE.NS", "SHRIRAMFIN.NS",
+    "SBIN.NS", "SUNPHARMA.NS", "TCS.NS", "TATACONSUM.NS", "TATAMOTORS.NS",
+    "TATASTEEL.NS", "TECHM.NS", "TITAN.NS", "ULTRACEMCO.NS", "UPL.NS", "WIPRO.NS",
+]
+
+# Coarse NSE sector of every stock above, for the market view
+SECTORS = {
+    "Banks": [
+        "AXISBANK.NS", "BANKBARODA.NS", "HDFCBANK.NS", "ICICIBANK.NS", "INDUSINDBK.NS",
+        "KOTAKBANK.NS", "SBIN.NS", "BANDHANBNK.NS", "BANKINDIA.NS", "CANBK.NS",
+        "FEDERALBNK.NS", "PNB.NS", "UNIONBANK.NS", "YESBANK.NS", "IDFCFIRSTB.NS", "INDIANB.NS",
+    ],
+    "Financial Services": [
+        "BAJFINANCE.NS", "BAJFINSERV.NS", "HDFCLIFE.NS", "SBILIFE.NS", "SHRIRAMFIN.NS",
+        "CHOLAFIN.NS", "HDFCAMC.NS", "IRFC.NS", "LICHSGFIN.NS", "MFSL.NS", "MUTHOOTFIN.NS",
+        "SBICARD.NS", "SUNDARMFIN.NS", "BSE.NS", "ICICIGI.NS", "ICICIPRULI.NS", "RECLTD.NS",
+        "PAYTM.NS",
+    ],
+    "IT": [
+        "HCLTECH.NS", "INFY.NS", "LTIM.NS", "TCS.NS", "TECHM.NS", "WIPRO.NS", "PERSISTENT.NS",
+        "LTTS.NS", "OFSS.NS", "COFORGE.NS", "ECLERX.NS", "HAPPSTMNDS.NS", "HEXAWARE.NS",
+        "MPHASIS.NS", "TATAELXSI.NS",
+    ],
+    "Pharma & Healthcare": [
+        "APOLLOHOSP.NS", "CIPLA.NS", "DIVISLAB.NS", "DRREDDY.NS", "SUNPHARMA.NS",
+        "AUROPHARMA.NS", "BIOCON.NS", "LUPIN.NS", "ZYDUSLIFE.NS", "FORTIS.NS",
+        "LAURUSLABS.NS", "MANKIND.NS", "MAXHEALTH.NS", "ALKEM.NS", "GLENMARK.NS",
+        "GRANULES.NS", "IPCALAB.NS", "NATCOPHARM.NS", "SANOFI.NS", "STAR.NS", "TORNTPHARM.NS",
+    ],
+    "Auto & Components": [
+        "BAJAJ-AUTO.NS", "EICHERMOT.NS", "HEROMOTOCO.NS", "M&M.NS", "MARUTI.NS",
+        "TATAMOTORS.NS", "TVSMOTOR.NS", "ASHOKLEY.NS", "ESCORTS.NS", "EXIDEIND.NS",
+        "APOLLOTYRE.NS", "BALKRISIND.NS", "BHARATFORG.NS", "BOSCHLTD.NS", "CEATLTD.NS",
+        "MRF.NS", "MOTHERSON.NS", "SONACOMS.NS", "TIINDIA.NS", "SCHAEFFLER.NS",
+    ],
+    "FMCG": [
+        "BRITANNIA.NS", "DABUR.NS", "HINDUNILVR.NS", "ITC.NS", "NESTLEIND.NS", "TATACONSUM.NS",
+        "COLPAL.NS", "GODREJCP.NS", "MARICO.NS", "MCDOWELL-N.NS", "VBL.NS", "JUBLFOOD.NS",
+    ],
+    "Consumer & Retail": [
+        "ASIANPAINT.NS", "TITAN.NS", "DMART.NS", "BERGEPAINT.NS", "HAVELLS.NS", "VOLTAS.NS",
+        "ZOMATO.NS", "ABFRL.NS", "DIXON.NS", "PAGEIND.NS", "SHOPERSTOP.NS", "TRENT.NS",
+        "WHIRLPOOL.NS",
+    ],
+    "Oil & Gas": [
+        "BPCL.NS", "IOC.NS", "ONGC.NS", "RELIANCE.NS", "GAIL.NS", "PETRONET.NS", "ATGL.NS",
+        "GUJGASLTD.NS", "IGL.NS",
+    ],
+    "Power": [
+        "ADANIPOWER.NS", "NTPC.NS", "POWERGRID.NS", "ADANIGREEN.NS", "ADANITRANS.NS",
+        "TATAPOWER.NS", "SUZLON.NS", "NHPC.NS", "TORNTPOWER.NS",
+    ],
+    "Metals & Mining": [
+        "HINDALCO.NS", "JSWSTEEL.NS", "TATASTEEL.NS", "JINDALSTEL.NS", "VEDL.NS", "COALINDIA.NS",
+    ],
+    "Capital Goods": [
+        "ADANIENT.NS", "BEL.NS", "LT.NS", "ABB.NS", "SIEMENS.NS", "BEML.NS", "CUMMINSIND.NS",
+        "POLYCAB.NS", "THERMAX.NS", "TRITURBINE.NS",
+    ],
+    "Cement & Materials": ["GRASIM.NS", "ULTRACEMCO.NS", "ACC.NS", "AMBUJACEM.NS", "SHREECEM.NS"],
+    "Chemicals": [
+        "UPL.NS", "COROMANDEL.NS", "PIDILITIND.NS", "SRF.NS", "AARTIIND.NS", "ATUL.NS",
+        "LINDEINDIA.NS", "PIIND.NS", "TATACHEM.NS",
+    ],
+    "Realty": ["DLF.NS", "GODREJPROP.NS", "OBEROIRLTY.NS", "PHOENIXLTD.NS", "PRESTIGE.NS"],
+    "Transport & Logistics": ["ADANIPORTS.NS", "CONCOR.NS", "INDIGO.NS", "IRCTC.NS"],
+    "Telecom": ["BHARTIARTL.NS", "TATACOMM.NS"],
+}
+SECTOR_OF = {symbol: sector for sector, symbols in SECTORS.items() for symbol in symbols}
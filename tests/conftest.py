@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Tests run offline against a throwaway store: set before any module reads them
+os.environ["MARKETSENSE_STORE"] = tempfile.mkdtemp()
+os.environ["MARKETSENSE_PROVIDER"] = "synthetic"
+os.environ["MARKETSENSE_PREFETCH"] = "0"
+os.environ["MARKETSENSE_CATALOG_FETCH"] = "0"
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from alerts import AlertEngine, RuleSet, load_rules
+
+DAYS = pd.bdate_range("2026-01-05", periods=60, tz="Asia/Kolkata", name="Date")
+
+
+def frame(closes):
+    closes = np.asarray(closes, dtype=np.float64)
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes,
+                         "Volume": 1000}, index=DAYS[:len(closes)])
+
+
+@pytest.fixture
+def evaluated(monkeypatch):
+    """An engine factory whose engines record the symbols each update evaluates"""
+    def make(rules):
+        engine = AlertEngine(rules, sinks=[])
+        engine.evaluated = []
+        evaluate = engine.rules.evaluate
+
+        def spy(current, previous):
+            engine.evaluated.append(len(current))
+            return evaluate(current, previous)
+
+        monkeypatch.setattr(engine.rules, "evaluate", spy)
+        return engine
+    return make
+
+
+def fired(alerts):
+    return [(a.symbol, a.rule, a.bar) for a in alerts]
+
+
+def test_rules_parse():
+    rules = RuleSet({"a": "Close  Crosses   ABOVE ma50", "b": "pred_pct >= 5%", "c": "rsi < 30"})
+    assert list(rules.left) == [0, 5, 4]
+    assert list(rules.op) == [4, 2, 1]
+    assert list(rules.right) == [3, -1, -1]
+    assert rules.const[1] == 5.0 and rules.const[2] == 30.0
+    assert list(rules.is_cross) == [True, False, False]
+
+
+@pytest.mark.parametrize("expression", ["5 > close", "close ~ 5", "close > volume", "close crosses 5", ""])
+def test_bad_rules_are_rejected(expression):
+    with pytest.raises(ValueError):
+        RuleSet({"bad": expression})
+
+
+def test_load_rules(tmp_path):
+    path = tmp_path / "rules.txt"
+    path.write_text("# comment\nBreakout = close crosses above 100  # trailing\n\nDip = change_pct < -3\n")
+    assert load_rules(str(path)) == {"Breakout": "close crosses above 100", "Dip": "change_pct < -3"}
+    path.write_text("close > 5\n")
+    with pytest.raises(ValueError):
+        load_rules(str(path))
+
+
+def test_cross_fires_once_per_bar(evaluated):
+    engine = evaluated({"up": "close crosses above 100"})
+    closes = [90.0, 95.0]
+    assert engine.update({"X": frame(closes)}) == []  # first sight only records state
+
+    closes.append(105.0)
+    assert fired(engine.update({"X": frame(closes)})) == [("X", "up", DAYS[2])]
+
+    # The same bar revised but still above: no second alert for it
+    closes[-1] = 106.0
+    assert engine.update({"X": frame(closes)}) == []
+
+    # Staying above is not a new cross; dipping and crossing again is
+    closes.append(110.0)
+    assert engine.update({"X": frame(closes)}) == []
+    closes += [99.0, 101.0]
+    assert engine.update({"X": frame(closes[:-1])}) == []
+    assert fired(engine.update({"X": frame(closes)})) == [("X", "up", DAYS[5])]
+
+
+def test_unchanged_symbols_are_skipped(evaluated):
+    engine = evaluated({"up": "close crosses above 100"})
+    frames = {"X": frame([90.0, 95.0]), "Y": frame([100.0, 90.0, 80.0])}
+    engine.update(frames)
+    assert engine.evaluated == [2]
+
+    assert engine.update(frames) == []
+    assert engine.evaluated == [2]  # nothing new: no evaluation at all
+
+    frames["Y"] = frame([100.0, 90.0, 80.0, 120.0])
+    assert fired(engine.update(frames)) == [("Y", "up", DAYS[3])]
+    assert engine.evaluated == [2, 1]
+
+
+def test_level_rule_fires_when_it_turns_true(evaluated):
+    engine = evaluated({"high": "close > 100"})
+    closes = [90.0, 95.0]
+    engine.update({"X": frame(closes)})
+    results = []
+    for close in (105.0, 110.0, 95.0, 101.0, 102.0):
+        closes.append(close)
+        results.append(len(engine.update({"X": frame(closes)})))
+    assert results == [1, 0, 0, 1, 0]
+
+
+def test_symbols_are_evaluated_together(evaluated):
+    engine = evaluated({"up": "close crosses above ma10", "down": "close crosses below 50"})
+    flat = [60.0] * 12
+    engine.update({"A": frame(flat), "B": frame(flat[:11]), "C": frame(flat)})
+    alerts = engine.update({"A": frame(flat + [70.0]), "B": frame(flat[:11] + [40.0]), "C": frame(flat + [60.0])})
+    assert sorted(fired(alerts)) == [("A", "up", DAYS[12]), ("B", "down", DAYS[11])]
+    assert engine.evaluated == [3, 3]
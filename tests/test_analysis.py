@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import analysis
+import price_store
+from rollups import YEAR_WEEKS
+from screener import screen_row
+
+SYMBOL = "TCS.NS"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A fresh store per call, with the analysis cache emptied"""
+    def fresh(name):
+        monkeypatch.setattr(price_store, "PRICE_DIR", str(tmp_path / name))
+        monkeypatch.setattr(analysis, "cache", analysis.StageCache())
+    return fresh
+
+
+def year_figures(symbol, period):
+    df = price_store.load_history(symbol, period)
+    a = analysis.analyze(symbol, period, df)
+    assert a["span"] is not None
+    row = screen_row(symbol, df)
+    return (a["high_52w"], a["low_52w"], a["avg_vol"]), (row["52W High"], row["52W Low"])
+
+
+@pytest.mark.parametrize("period", ["1mo", "1y", "2y"])
+def test_52_weeks_do_not_depend_on_load_order(store, period):
+    store("short-first")
+    alone = year_figures(SYMBOL, period)
+    store("max-first")
+    price_store.load_history(SYMBOL, "max")
+    after_max = year_figures(SYMBOL, period)
+    assert alone == after_max
+
+
+@pytest.mark.parametrize("period", ["1mo", "2y"])
+def test_52_weeks_cover_the_window_only(store, period):
+    store("window")
+    df = price_store.load_history(SYMBOL, period)
+    (high, low, _), (row_high, row_low) = year_figures(SYMBOL, period)
+    last_year = df[df.index > df.index[-1] - pd.Timedelta(weeks=YEAR_WEEKS)]
+    assert high == row_high == last_year["High"].max()
+    assert low == row_low == last_year["Low"].min()
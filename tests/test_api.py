@@ -0,0 +1,131 @@
+import io
+import asyncio
+import zipfile
+
+import pandas as pd
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from api import MAX_BATCH_SYMBOLS, create_app
+from montecarlo import PERCENTILES
+from providers import SyntheticProvider
+
+SYMBOLS = ["TCS.NS", "INFY.NS"]
+
+
+class Stubs:
+    """Offline loaders serving synthetic bars for SYMBOLS only"""
+
+    def __init__(self):
+        provider = SyntheticProvider(seed=0)
+        self.frames = {s: provider.history(s, period="1y") for s in SYMBOLS}
+        self.info_calls = []
+
+    def load_history(self, symbol, period):
+        return self.frames.get(symbol, pd.DataFrame())
+
+    def load_many(self, symbols, period):
+        return {s: self.frames[s] for s in symbols if s in self.frames}
+
+    def company_info(self, symbol):
+        self.info_calls.append(symbol)
+        return {"longName": f"{symbol} Ltd"}
+
+
+@pytest.fixture
+def stubs():
+    return Stubs()
+
+
+def fetch(stubs, method, path, **kwargs):
+    """(status, parsed JSON or raw bytes) of one request to a stubbed app"""
+    async def go():
+        app = create_app(stubs.load_history, stubs.load_many, stubs.company_info)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.request(method, path, **kwargs)
+            if response.content_type == "application/json":
+                return response.status, await response.json()
+            return response.status, await response.read()
+    return asyncio.run(go())
+
+
+def test_analyze(stubs):
+    status, body = fetch(stubs, "GET", "/analyze?symbol=tcs.ns&period=1y&predict_days=10")
+    assert status == 200
+    assert body["symbol"] == "TCS.NS"
+    assert body["bars"] == len(stubs.frames["TCS.NS"])
+    assert body["company"] == {"longName": "TCS.NS Ltd"}
+    assert body["prediction"]["predict_days"] == 10
+    assert set(body["forecast_bands"]) == {f"p{p}" for p in PERCENTILES}
+    assert all(len(band) == 10 for band in body["forecast_bands"].values())
+
+
+@pytest.mark.parametrize("query, status", [
+    ("", 400),
+    ("symbol=TCS.NS&period=7y", 400),
+    ("symbol=TCS.NS&predict_days=0", 400),
+    ("symbol=TCS.NS&predict_days=soon", 400),
+    ("symbol=TCS.NS&model=guess", 400),
+    ("symbol=NOPE.NS", 404),
+])
+def test_analyze_rejects(stubs, query, status):
+    assert fetch(stubs, "GET", f"/analyze?{query}")[0] == status
+
+
+def test_batch_get(stubs):
+    status, body = fetch(stubs, "GET", "/batch?symbols=TCS.NS,NOPE.NS,INFY.NS&predict_days=5")
+    assert status == 200
+    results = {r["symbol"]: r for r in body["results"]}
+    assert list(results) == ["TCS.NS", "NOPE.NS", "INFY.NS"]
+    assert results["NOPE.NS"] == {"symbol": "NOPE.NS", "error": "no data"}
+    assert results["TCS.NS"]["company"] == {}
+    assert stubs.info_calls == []
+
+
+def test_batch_info_opt_in(stubs):
+    status, body = fetch(stubs, "GET", "/batch?symbols=TCS.NS&info=1")
+    assert status == 200
+    assert body["results"][0]["company"] == {"longName": "TCS.NS Ltd"}
+    assert stubs.info_calls == ["TCS.NS"]
+
+
+def test_batch_post(stubs):
+    status, body = fetch(stubs, "POST", "/batch",
+                         json={"symbols": SYMBOLS, "period": "6mo", "model": "holt", "info": True})
+    assert status == 200
+    assert body["period"] == "6mo" and body["model"] == "holt"
+    assert [r["symbol"] for r in body["results"]] == SYMBOLS
+    assert all("error" not in r for r in body["results"])
+    assert sorted(stubs.info_calls) == sorted(SYMBOLS)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"data": "not json"},
+    {"json": ["TCS.NS"]},
+    {"json": {"symbols": "TCS.NS"}},
+    {"json": {"symbols": ["TCS.NS", 5]}},
+    {"json": {"symbols": []}},
+    {"json": {"symbols": [f"S{i}.NS" for i in range(MAX_BATCH_SYMBOLS + 1)]}},
+])
+def test_batch_post_rejects(stubs, kwargs):
+    assert fetch(stubs, "POST", "/batch", **kwargs)[0] == 400
+
+
+def test_export(stubs):
+    status, body = fetch(stubs, "GET", "/export?symbols=TCS.NS,NOPE.NS,INFY.NS&period=1y&format=csv")
+    assert status == 200
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        assert sorted(zf.namelist()) == ["INFY.NS.csv", "TCS.NS.csv"]
+        df = pd.read_csv(zf.open("TCS.NS.csv"))
+    assert len(df) == len(stubs.frames["TCS.NS"])
+
+
+def test_export_rejects(stubs):
+    assert fetch(stubs, "GET", "/export?symbols=TCS.NS&format=xlsx")[0] == 400
+    assert fetch(stubs, "GET", "/export?period=1y")[0] == 400
+
+
+def test_health_and_metrics(stubs):
+    assert fetch(stubs, "GET", "/health") == (200, {"status": "ok"})
+    status, body = fetch(stubs, "GET", "/metrics")
+    assert status == 200 and b"# TYPE" in body
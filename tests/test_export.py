@@ -0,0 +1,26 @@
+import io
+import zipfile
+
+import pandas as pd
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from export import FORMATS, frame_bytes, zip_bytes
+from price_store import load_history
+
+SYMBOLS = ["TCS.NS", "INFY.NS"]
+
+
+def test_zip_bytes_is_accepted_by_download_button():
+    # What st.download_button does with the value its deferred callable returns
+    data, _ = convert_data_to_bytes_and_infer_mime(zip_bytes(SYMBOLS, "1y", "csv"), ValueError("unsupported"))
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert sorted(zf.namelist()) == sorted(f"{s}.csv" for s in SYMBOLS)
+        df = pd.read_csv(zf.open("TCS.NS.csv"))
+    assert len(df) == len(load_history("TCS.NS", "1y"))
+
+
+def test_frame_bytes_is_accepted_by_download_button():
+    df = load_history("TCS.NS", "6mo")
+    for fmt in FORMATS:
+        data, _ = convert_data_to_bytes_and_infer_mime(frame_bytes(df, fmt), ValueError("unsupported"))
+        assert data
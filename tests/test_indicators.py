@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+import analysis
+import indicators
+import price_store
+from indicators import IndicatorState, compute_indicators, latest_indicators
+from providers import SyntheticProvider
+
+DAILY = SyntheticProvider(seed=0).history("TCS.NS", period="2y")
+
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    """Count full rebuilds of indicator state"""
+    calls = []
+    from_history = IndicatorState.from_history.__func__
+
+    def counted(cls, df):
+        calls.append(len(df))
+        return from_history(cls, df)
+
+    monkeypatch.setattr(IndicatorState, "from_history", classmethod(counted))
+    monkeypatch.setattr(indicators, "_states", type(indicators._states)())
+    return calls
+
+
+def assert_matches(values, df):
+    expected = compute_indicators(df).iloc[-1]
+    for name in expected.index:
+        assert values[name] == pytest.approx(expected[name], rel=1e-9, nan_ok=True)
+
+
+def test_new_bars_update_without_rebuilding(rebuilds):
+    for end in range(len(DAILY) - 20, len(DAILY) + 1):
+        assert_matches(latest_indicators("k", DAILY.iloc[:end]), DAILY.iloc[:end])
+    assert rebuilds == [len(DAILY) - 20]
+
+
+def test_revised_last_bar(rebuilds):
+    latest_indicators("k", DAILY)
+    revised = DAILY.copy()
+    revised.iloc[-1, revised.columns.get_loc("Close")] *= 1.05
+    assert_matches(latest_indicators("k", revised), revised)
+    assert len(rebuilds) == 1
+
+
+def test_moved_first_bar_rebuilds(rebuilds):
+    latest_indicators("k", DAILY.iloc[:-5])
+    assert_matches(latest_indicators("k", DAILY.iloc[30:]), DAILY.iloc[30:])
+    assert len(rebuilds) == 2
+
+
+def test_states_are_bounded(rebuilds, monkeypatch):
+    monkeypatch.setattr(indicators, "MAX_STATES", 3)
+    for key in range(5):
+        latest_indicators(key, DAILY.iloc[:100])
+    assert list(indicators._states) == [2, 3, 4]
+
+
+def test_analysis_uses_the_stored_history(rebuilds, tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "PRICE_DIR", str(tmp_path))
+    monkeypatch.setattr(analysis, "cache", analysis.StageCache())
+    price_store.load_history("TCS.NS", "2y")
+    stored = price_store._view("TCS.NS")
+    for period in ("1mo", "1y", "2y"):
+        a = analysis.analyze("TCS.NS", period, price_store.load_history("TCS.NS", period))
+        assert_matches(a["indicators"], stored)
+    # One state per symbol, whatever the period
+    assert rebuilds == [len(stored)]
+    assert np.isfinite(a["indicators"]["MA50"])
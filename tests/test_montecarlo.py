@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from montecarlo import METHODS, PERCENTILES, fan_chart, percentile_rows
+from providers import SyntheticProvider
+
+CLOSE = SyntheticProvider(seed=0).history("TCS.NS", period="2y")["Close"].to_numpy()
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_same_seed_same_fan(method):
+    a = fan_chart(CLOSE, 30, n_paths=2000, method=method, seed=7)
+    b = fan_chart(CLOSE, 30, n_paths=2000, method=method, seed=7)
+    np.testing.assert_array_equal(a.bands, b.bands)
+    assert a.prob_up == b.prob_up
+    c = fan_chart(CLOSE, 30, n_paths=2000, method=method, seed=8)
+    assert not np.array_equal(a.bands, c.bands)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_bands_are_ordered(method):
+    fan = fan_chart(CLOSE, 60, n_paths=2000, method=method, seed=0)
+    assert fan.bands.shape == (len(PERCENTILES), 60)
+    assert np.all(np.diff(fan.bands, axis=0) >= 0)
+    assert 0.0 <= fan.prob_up <= 1.0
+    assert fan.last_price == CLOSE[-1]
+
+
+def test_percentile_rows_matches_numpy():
+    values = np.random.default_rng(0).standard_normal((12, 501))
+    np.testing.assert_allclose(percentile_rows(values), np.percentile(values, PERCENTILES, axis=1))
+
+
+def test_short_history_is_flat():
+    fan = fan_chart(CLOSE[:2], 5, seed=0)
+    assert np.all(fan.bands == CLOSE[1])
+    assert np.isnan(fan.prob_up)
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+import price_store
+import providers
+from providers import Provider, SyntheticProvider
+
+SYMBOL = "TCS.NS"
+SYMBOLS = ["TCS.NS", "INFY.NS"]
+
+
+class Scripted(Provider):
+    """Synthetic bars with the newest `hidden` bars held back, prices divided
+    by `factor` and extra `actions` (for the `adjusted` symbols, default
+    all), recording every request"""
+    name = "scripted"
+
+    def __init__(self):
+        self.base = SyntheticProvider(seed=0)
+        self.hidden = 0
+        self.factor = 1.0
+        self.actions = {}  # (column, day index from the end) -> value
+        self.adjusted = None
+        self.calls = []
+
+    def bars(self, symbol, start=None, end=None):
+        full = self.base.history(symbol)
+        df = self.base.history(symbol, start=start, end=end).copy()
+        df = df[df.index <= full.index[-1 - self.hidden]]
+        if self.adjusted is not None and symbol not in self.adjusted:
+            return df
+        df[["Open", "High", "Low", "Close"]] /= self.factor
+        for (column, back), value in self.actions.items():
+            if full.index[-back] in df.index:
+                df.loc[full.index[-back], column] = value
+        return df
+
+    def history(self, symbol, start=None, end=None, period=None, interval="1d"):
+        self.calls.append(("history", symbol, str(start), str(end)))
+        return self.bars(symbol, start, end)
+
+    def download(self, symbols, start):
+        self.calls.append(("download", tuple(symbols), str(start)))
+        frames = {s: self.bars(s, start) for s in symbols}
+        return {s: df for s, df in frames.items() if not df.empty}
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "PRICE_DIR", str(tmp_path))
+    scripted = Scripted()
+    previous = providers.get_provider()
+    providers.set_provider(scripted)
+    yield scripted
+    providers.set_provider(previous)
+
+
+def start_of(period):
+    return str(price_store.period_start(period).date())
+
+
+def fresh(monkeypatch):
+    monkeypatch.setattr(price_store, "REFRESH_AFTER", timedelta(days=1))
+
+
+def stale(monkeypatch):
+    monkeypatch.setattr(price_store, "REFRESH_AFTER", timedelta(seconds=-1))
+
+
+def expected(provider, symbol, period):
+    return provider.bars(symbol, price_store.period_start(period).date())
+
+
+def test_only_missing_ranges_are_fetched(provider, monkeypatch):
+    fresh(monkeypatch)
+    provider.hidden = 3
+    price_store.load_history(SYMBOL, "1y")
+    assert provider.calls == [("history", SYMBOL, start_of("1y"), "None")]
+
+    # A longer period asks for the older gap only
+    provider.calls.clear()
+    df = price_store.load_history(SYMBOL, "2y")
+    assert provider.calls == [("history", SYMBOL, start_of("2y"), start_of("1y"))]
+    assert df.equals(expected(provider, SYMBOL, "2y"))
+
+    # Once stale, newer bars are asked for from the last final stored bar
+    stale(monkeypatch)
+    provider.calls.clear()
+    provider.hidden = 0
+    overlap = str(df.index[-2].date())
+    df = price_store.load_history(SYMBOL, "2y")
+    assert provider.calls == [("history", SYMBOL, overlap, "None")]
+    assert df.equals(expected(provider, SYMBOL, "2y"))
+
+
+@pytest.mark.parametrize("change", ["close", "split", "dividend"])
+def test_load_history_refetches_after_corporate_actions(provider, monkeypatch, change):
+    fresh(monkeypatch)
+    provider.hidden = 3
+    df = price_store.load_history(SYMBOL, "2y")
+    overlap = str(df.index[-2].date())
+
+    stale(monkeypatch)
+    provider.calls.clear()
+    provider.hidden = 0
+    if change == "close":
+        provider.factor = 2.0  # every earlier close rescaled, as Yahoo adjusts
+    elif change == "split":
+        provider.actions[("Stock Splits", 2)] = 2.0
+    else:
+        provider.actions[("Dividends", 1)] = 12.5
+    df = price_store.load_history(SYMBOL, "2y")
+    assert provider.calls == [("history", SYMBOL, overlap, "None"),
+                              ("history", SYMBOL, start_of("2y"), "None")]
+    assert df.equals(expected(provider, SYMBOL, "2y"))
+
+    # The refetched actions are stored, so they don't trigger again
+    provider.calls.clear()
+    price_store.load_history(SYMBOL, "2y")
+    assert provider.calls == [("history", SYMBOL, str(df.index[-2].date()), "None")]
+
+
+def test_unchanged_history_is_not_refetched(provider, monkeypatch):
+    fresh(monkeypatch)
+    provider.hidden = 3
+    price_store.load_history(SYMBOL, "1y")
+    stale(monkeypatch)
+    provider.calls.clear()
+    provider.hidden = 0
+    price_store.load_history(SYMBOL, "1y")
+    assert len(provider.calls) == 1
+
+
+def test_load_many_refetches_only_adjusted_symbols(provider, monkeypatch):
+    provider.hidden = 3
+    frames = price_store.load_many(SYMBOLS, "1y")
+    assert provider.calls == [("download", tuple(SYMBOLS), start_of("1y"))]
+    overlap = str(min(df.index[-2] for df in frames.values()).date())
+
+    provider.calls.clear()
+    provider.hidden = 0
+    provider.adjusted = {"INFY.NS"}
+    provider.actions[("Dividends", 1)] = 8.0
+    frames = price_store.load_many(SYMBOLS, "1y", max_age=timedelta(0))
+    assert provider.calls == [("download", tuple(SYMBOLS), overlap),
+                              ("download", ("INFY.NS",), start_of("1y"))]
+    for symbol in SYMBOLS:
+        assert frames[symbol].equals(expected(provider, symbol, "1y"))
+
+    # Nothing changed since: one incremental download, no refetch
+    provider.calls.clear()
+    frames = price_store.load_many(SYMBOLS, "1y", max_age=timedelta(0))
+    assert [call[0] for call in provider.calls] == ["download"]
+    for symbol in SYMBOLS:
+        assert np.array_equal(frames[symbol]["Close"], expected(provider, symbol, "1y")["Close"])
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+import price_store
+import rollups
+from forecast import fit_trend
+from providers import SyntheticProvider
+
+DAILY = SyntheticProvider(seed=0).history("TCS.NS", period="5y")
+# Windows ending on the last bar and in the middle, short and long
+WINDOWS = [(0, None), (3, None), (-400, None), (-21, None), (100, 700), (5, 9)]
+
+
+def stored_pyramid(stored, daily):
+    """A pyramid over `daily` whose rollups were extended from `stored`'s"""
+    frames = [rollups.extend(rollups.rollup(stored, level), stored, daily, level) for level in rollups.ROLLUPS]
+    return rollups.pyramid(daily, frames)
+
+
+def assert_exact(pyramid):
+    daily = pyramid.daily
+    for frame, level in zip(pyramid.rollups, rollups.ROLLUPS):
+        full = rollups.rollup(daily, level)
+        assert frame.index.equals(full.index)
+        np.testing.assert_allclose(frame.to_numpy(dtype=float), full.to_numpy(dtype=float), rtol=1e-12)
+    for lo, hi in WINDOWS:
+        lo, hi, _ = slice(lo, hi).indices(len(daily))
+        stats = rollups.window_stats(pyramid, lo, hi)
+        window = daily.iloc[lo:hi]
+        assert stats["high"] == window["High"].max()
+        assert stats["low"] == window["Low"].min()
+        assert stats["bars"] == hi - lo
+        assert stats["volume"] == pytest.approx(window["Volume"].sum(), rel=1e-12)
+
+        trend = rollups.window_trend(pyramid, lo, hi)
+        expected = fit_trend(window["Close"].to_numpy())
+        assert trend.n == expected.n
+        np.testing.assert_allclose([trend.slope, trend.intercept, trend.stderr],
+                                   [expected.slope, expected.intercept, expected.stderr], rtol=1e-8)
+
+
+@pytest.mark.parametrize("new_bars", [1, 3, 7, 40])
+def test_extend_after_appending_bars(new_bars):
+    assert_exact(stored_pyramid(DAILY.iloc[:-new_bars], DAILY))
+
+
+@pytest.mark.parametrize("position", [0, 250, 600, -6, -2])
+def test_extend_after_revising_an_interior_bar(position):
+    revised = DAILY.copy()
+    column = revised.columns.get_loc("Close")
+    revised.iloc[position, column] *= 1.07
+    revised.iloc[position, revised.columns.get_loc("High")] = revised.iloc[position, column] * 1.01
+    assert_exact(stored_pyramid(DAILY.iloc[:-3], revised))
+
+
+def test_extend_after_history_shrinks():
+    assert_exact(stored_pyramid(DAILY, DAILY.iloc[:300]))
+
+
+def test_first_change():
+    revised = DAILY.copy()
+    revised.iloc[321, revised.columns.get_loc("Volume")] += 1
+    assert rollups.first_change(DAILY, revised) == 321
+    assert rollups.first_change(DAILY, DAILY.iloc[:50]) == 50
+    assert rollups.first_change(DAILY.iloc[:50], DAILY) == 50
+
+
+def test_read_pyramid_rebuilds_stale_rollups(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, "PRICE_DIR", str(tmp_path))
+    symbol = "TCS.NS"
+    price_store.load_history(symbol, "5y")
+    # Rollups of an older, shorter history, as a store written before the
+    # last daily write finished would have
+    for level in rollups.ROLLUPS:
+        price_store._write_arrow(price_store._level_path(symbol, level),
+                                 rollups.rollup(price_store._view(symbol).iloc[:-10], level))
+    stale = [price_store._view(symbol, level) for level in rollups.ROLLUPS]
+    assert not any(rollups.matches(frame, price_store._view(symbol)) for frame in stale)
+
+    pyramid = price_store.read_pyramid(symbol)
+    assert_exact(pyramid)
+    assert all(rollups.matches(price_store._view(symbol, level), pyramid.daily) for level in rollups.ROLLUPS)
+    assert price_store.read_pyramid(symbol) is pyramid
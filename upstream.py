@@ -0,0 +1,148 @@
+import os
+import sys
+import time
+import threading
+from concurrent.futures import Future
+
+import metrics
+
+# Process-wide guard for calls to Yahoo. Every Streamlit session runs in the
+# same process and imports this module once, so the limiter and the in-flight
+# table below are shared by all of them.
+
+class RateLimited(Exception):
+    """Raised when the shared limiter can't grant a request in time"""
+
+
+class TokenBucket:
+    """Token bucket that allows bursts and backs off on HTTP 429
+
+    Each 429 halves the refill rate and pauses all requests for an
+    exponentially growing backoff; successes restore the rate gradually.
+    """
+
+    def __init__(self, rate, capacity, min_rate=0.1, max_backoff=120.0):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_backoff = max_backoff
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._backoff = 1.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting at most `timeout` seconds (None = forever)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def penalize(self):
+        """Record a 429: halve the rate and pause for the current backoff"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._blocked_until = time.monotonic() + self._backoff
+            self._backoff = min(self.max_backoff, self._backoff * 2)
+            self._tokens = 0.0
+
+    def reward(self):
+        """Record a success: additive recovery towards the base rate"""
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+            self._backoff = 1.0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+limiter = TokenBucket(
+    rate=float(os.environ.get("MARKETSENSE_RATE", 2.0)),
+    capacity=int(os.environ.get("MARKETSENSE_BURST", 5)),
+)
+flights = SingleFlight()
+
+
+def is_rate_limit_error(e):
+    # yfinance is imported lazily by the Yahoo provider; if it isn't loaded,
+    # `e` can't be one of its exceptions (older versions have no such class)
+    exceptions = sys.modules.get("yfinance.exceptions")
+    rate_limit_error = getattr(exceptions, "YFRateLimitError", None)
+    if rate_limit_error is not None and isinstance(e, rate_limit_error):
+        return True
+    text = str(e)
+    return "Too Many Requests" in text or "Rate limited" in text or "429" in text
+
+
+def call(key, fn, timeout=10.0, limited=True):
+    """Run an upstream Yahoo call through the shared limiter
+
+    Identical concurrent calls (same `key`) share a single request. Raises
+    RateLimited if no token is available within `timeout` seconds or Yahoo
+    answers with a 429. `limited=False` (offline providers) skips the
+    limiter but keeps the coalescing and the counters.
+    """
+    kind = key[0]
+
+    def run():
+        if limited:
+            with metrics.span("upstream.wait"):
+                granted = limiter.acquire(timeout)
+            if not granted:
+                metrics.inc("upstream_rate_limited_total", kind=kind, reason="limiter")
+                raise RateLimited("Rate limited: too many requests to Yahoo, try again shortly")
+        metrics.inc("upstream_calls_total", kind=kind)
+        try:
+            with metrics.span(f"upstream.{kind}"):
+                result = fn()
+        except Exception as e:
+            if is_rate_limit_error(e):
+                metrics.inc("upstream_rate_limited_total", kind=kind, reason="429")
+                limiter.penalize()
+                raise RateLimited(str(e)) from e
+            metrics.inc("errors_total", where=f"upstream.{kind}")
+            raise
+        if limited:
+            limiter.reward()
+        return result
+
+    return flights.do(key, run)